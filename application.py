@@ -1,59 +1,228 @@
-from tkinter.constants import BOTH
+import argparse
 import package.automat.automat as at
-import tkinter as tk
-import tkinter.ttk as ttk
-from typing import Callable
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Iterable
 
-class AutomatHandler():
-    """Connects the GUI with an Automat object by handling all
-    GUI events."""
+#tkinter is imported by load_tkinter only when the GUI is shown, so the
+#handler runs headless on machines without Tk
+tk = None
+ttk = None
+
+def load_tkinter() -> None:
+    """Imports tkinter for the GUI classes."""
+    global tk, ttk
+    import tkinter
+    import tkinter.ttk
+    tk = tkinter
+    ttk = tkinter.ttk
+
+class InvalidScriptException(Exception):
+    """Raised when a line of an input script can't be parsed."""
+    def __init__(self, lineNumber: int, line: str) -> None:
+        super().__init__(f"Invalid script line {lineNumber}: {line}")
+
+class View:
+    """What AutomatHandler shows to the customer. This view shows nothing,
+    so the handler can run without a display."""
+    def set_number_text(self, text: str) -> None:
+        pass
+
+    def set_coin_text(self, text: str) -> None:
+        pass
+
+    def shows_affordable_text(self) -> bool:
+        """Returns whether items the coins are enough for are shown, they
+        aren't looked up otherwise."""
+        return False
+
+    def set_affordable_text(self, text: str) -> None:
+        pass
+
+    def display_popup(self, text: str) -> None:
+        pass
+
+class ConsoleView(View):
+    """Headless view printing popup texts."""
+    def display_popup(self, text: str) -> None:
+        print(' '.join(text.split()))
+
+class BufferedView(View):
+    """View that can be updated from any thread. Updates are only collected,
+    the GUI thread takes them with take_updates and gets the latest text of
+    every field, so a burst of updates is drawn once. A popup replaces the
+    one not shown yet."""
     def __init__(self) -> None:
-        self.automat = at.Automat(5)
-        self.numberText: tk.StringVar
-        self.coinText: tk.StringVar
-        self.item_number_text = ''
+        self.__lock = threading.Lock()
+        self.__texts: "dict[str, str]" = {}
+        self.__popup: "str | None" = None
+
+    def __set(self, field: str, text: str) -> None:
+        with self.__lock:
+            self.__texts[field] = text
+
+    def set_number_text(self, text: str) -> None:
+        self.__set('number', text)
+
+    def set_coin_text(self, text: str) -> None:
+        self.__set('coin', text)
+
+    def shows_affordable_text(self) -> bool:
+        return True
+
+    def set_affordable_text(self, text: str) -> None:
+        self.__set('affordable', text)
 
     def display_popup(self, text: str) -> None:
+        with self.__lock:
+            self.__popup = text
+
+    def take_updates(self) -> "tuple[dict[str, str], str | None]":
+        """Returns texts of the fields changed since the last call ('number',
+        'coin' and 'affordable') and the popup to show, if any."""
+        with self.__lock:
+            texts, popup = self.__texts, self.__popup
+            self.__texts = {}
+            self.__popup = None
+        return texts, popup
+
+class TkView(BufferedView):
+    """View showing texts in tkinter variables and popups in a window that
+    is created once and reused. Updates are polled every 'pollInterval'
+    milliseconds with after(), so they can come from the handler's worker
+    thread. Create it after load_tkinter."""
+    def __init__(self, master: "tk.Tk", pollInterval: int = 20) -> None:
+        super().__init__()
+        self.master = master
+        self.numberText = tk.StringVar()
+        self.coinText = tk.StringVar()
+        self.affordableText = tk.StringVar()
+        self.__variables = { 'number':self.numberText, 'coin':self.coinText, 'affordable':self.affordableText }
+        self.__poll_interval = pollInterval
+        self.__popup: "tk.Toplevel | None" = None
+        self.__popup_label: "tk.Label | None" = None
+        self.master.after(pollInterval, self.poll)
+
+    def poll(self) -> None:
+        """Draws the collected updates and schedules the next poll."""
+        texts, popup = self.take_updates()
+        for field, text in texts.items():
+            self.__variables[field].set(text)
+        if popup is not None:
+            self.show_popup(popup)
+        self.master.after(self.__poll_interval, self.poll)
+
+    def show_popup(self, text: str) -> None:
         """Displays a popup window with information string provided by 'text'
-        variable."""
-        popup = tk.Toplevel()
-        popup.geometry('200x120+400+400')
-        popup.wm_title("Info")
-        popup.grid_columnconfigure(0, pad=3, weight=1)
-        popup.grid_rowconfigure(0, pad=3, weight=1)
-        popup.grid_rowconfigure(1, pad=3, weight=1)
+        variable. The window is hidden, not destroyed, when closed."""
+        if self.__popup is None:
+            popup = tk.Toplevel(self.master)
+            popup.geometry('200x120+400+400')
+            popup.wm_title("Info")
+            popup.grid_columnconfigure(0, pad=3, weight=1)
+            popup.grid_rowconfigure(0, pad=3, weight=1)
+            popup.grid_rowconfigure(1, pad=3, weight=1)
+            popup.protocol('WM_DELETE_WINDOW', popup.withdraw)
 
-        #create label with info
-        label = tk.Label(popup, text=text)
-        label.grid(row=0, column=0, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
+            #create label with info
+            self.__popup_label = tk.Label(popup)
+            self.__popup_label.grid(row=0, column=0, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
 
-        #create OK button
-        b = ttk.Button(popup, text="OK", command=popup.destroy)
-        b.grid(row=1, column=0, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
+            #create OK button
+            b = ttk.Button(popup, text="OK", command=popup.withdraw)
+            b.grid(row=1, column=0, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
+            self.__popup = popup
+        self.__popup_label.configure(text=text)
+        self.__popup.deiconify()
+        self.__popup.lift()
+
+class HandlerWorker:
+    """Runs handler callbacks in a background thread, one at a time in the
+    order they were submitted, so automat calls don't block the GUI."""
+    def __init__(self) -> None:
+        self.__queue: "queue.Queue[tuple[Callable, tuple] | None]" = queue.Queue()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def __run(self) -> None:
+        while True:
+            task = self.__queue.get()
+            try:
+                if task is None:
+                    return
+                callback, args = task
+                callback(*args)
+            except Exception:
+                #keep serving the GUI after a failed callback
+                traceback.print_exc()
+            finally:
+                self.__queue.task_done()
+
+    def submit(self, callback: Callable, *args) -> None:
+        """Queues a call of the callback."""
+        self.__queue.put((callback, args))
+
+    def wait(self) -> None:
+        """Blocks until all queued calls are done."""
+        self.__queue.join()
+
+    def close(self) -> None:
+        """Finishes the queued calls and stops the thread."""
+        self.__queue.put(None)
+        self.__thread.join()
+
+class AutomatHandler():
+    """Connects a view with an Automat object by handling all
+    GUI events. Events can be written to a script (see 'recorder') and
+    replayed with replay_script."""
+    def __init__(self, automat: "at.Automat | None" = None, view: "View | None" = None) -> None:
+        self.automat = automat if automat is not None else at.Automat(5)
+        self.view = view if view is not None else View()
+        self.recorder: "Callable[[str], None] | None" = None
+        self.item_number_text = ''
+
+    def display_popup(self, text: str) -> None:
+        """Displays a popup with information string provided by 'text'
+        variable."""
+        self.view.display_popup(text)
 
     def check_item(self) -> None:
         """Checks if item of the given number exists and tries to buy it.
         Displays apropriate info when the item is not available, the number is
         incorrect, etc."""
         itemNumber = int(self.item_number_text)
-        try:
-            #get item info
-            name, price, amount = self.automat.get_item_details(itemNumber)
-        except at.InvalidItemNumberException:
+        #get item info
+        details = self.automat.lookup(itemNumber)
+        if details.status == at.PurchaseStatus.INVALID_ITEM_NUMBER:
+            if len(self.item_number_text) >= self.automat.get_item_number_length():
+                #no valid number starts with these digits, start over
+                self.item_number_text = ''
+                self.update_number_text()
             return
+        exactChangeOnly = details.amount > 0 and self.automat.is_exact_change_only(itemNumber)
         try:
+            if exactChangeOnly and self.automat.get_inserted_coins_value() >= details.price:
+                #the change can't be given, no need to try buying
+                self.display_popup('Exact change only!')
+                return
             #try to buy item
-            change, item = self.automat.pay_for_item(itemNumber)
-            for c in change:
-                self.automat.insert_coin(c)
-            self.update_coins_text()
-            self.display_popup(f'Bought item: {item.get_name()}\n\nChange was added\nback to your coins')
-        except at.NotEnoughMoneyException:
-            self.display_popup(f'Selected item: {name}\nPrice: {price}\nAmount: {amount}')
-        except at.ExactChangeOnlyException:
-            self.display_popup(f'Exact change only!')
-        except at.NoItemsLeftException:
-            self.display_popup('Item not available')
+            result = self.automat.try_pay(itemNumber)
+            if result.status == at.PurchaseStatus.OK:
+                for c in result.change:
+                    self.automat.insert_coin(c)
+                self.update_coins_text()
+                self.display_popup(f'Bought item: {result.item.get_name()}\n\nChange was added\nback to your coins')
+            elif result.status == at.PurchaseStatus.NOT_ENOUGH_MONEY:
+                warning = '\nExact change only!' if exactChangeOnly else ''
+                self.display_popup(f'Selected item: {details.name}\nPrice: {at.format_money(details.price)}zl\nAmount: {details.amount}{warning}')
+            elif result.status == at.PurchaseStatus.EXACT_CHANGE_ONLY:
+                self.display_popup(f'Exact change only!')
+            elif result.status == at.PurchaseStatus.NO_ITEMS_LEFT:
+                self.display_popup('Item not available')
         finally:
             #clear item number text
             self.item_number_text = ''
@@ -62,92 +231,211 @@ class AutomatHandler():
     def update_coins_text(self) -> None:
         """Sets coins display based on the coins inserted into the machine."""
         amount = self.automat.get_inserted_coins_value()
-        self.coinText.set(f'{amount}')
+        self.view.set_coin_text(at.format_money(amount))
+        self.update_affordable_text()
+
+    def update_affordable_text(self, limit: int = 8) -> None:
+        """Shows numbers of items in stock that the inserted coins are enough
+        for, at most 'limit' of them."""
+        if not self.view.shows_affordable_text():
+            return
+        if self.automat.get_inserted_coins_value() == 0:
+            self.view.set_affordable_text('')
+            return
+        numbers = self.automat.get_affordable_items()
+        text = ', '.join(f'{n}' for n in numbers[:limit])
+        if len(numbers) > limit:
+            text += ', ...'
+        self.view.set_affordable_text(f'You can buy: {text}' if numbers else 'Not enough coins for any item')
 
     def update_number_text(self) -> None:
         """Sets number text from 'item_number_text' string."""
-        self.numberText.set(self.item_number_text)
+        self.view.set_number_text(self.item_number_text)
 
-    def on_coin_btn_click(self, value: float) -> None:
-        """Callback for clicking a coin button."""
+    def on_coin_btn_click(self, value: int) -> None:
+        """Callback for clicking a coin button. Value is in grosze."""
+        if self.recorder is not None:
+            self.recorder(f'coin {value}')
         self.automat.insert_coin(at.Coin(value))
         self.update_coins_text()
 
     def on_number_btn_click(self, value: int) -> None:
         """Callback for clicking a number button."""
+        if self.recorder is not None:
+            self.recorder(f'key {value}')
         self.item_number_text += f'{value}' #append new digit to the number string
         self.update_number_text()
         self.check_item()
 
     def on_clear_number_btn_click(self) -> None:
         """Clears the entered number."""
+        if self.recorder is not None:
+            self.recorder('clear_number')
         self.item_number_text = ''
         self.update_number_text()
 
     def on_clear_coins_btn_click(self) -> None:
         """Clears the entered coins. In reality it would
         return the coins to the customer."""
+        if self.recorder is not None:
+            self.recorder('clear_coins')
         amount = at.get_coins_value(self.automat.return_inserted_coins())
         self.update_coins_text()
-        self.display_popup(f"Returned {amount}zl")
+        self.display_popup(f"Returned {at.format_money(amount)}zl")
+
+def parse_script(lines: "Iterable[str]", denominations: "Iterable[int]" = at.coin_values) -> "list[tuple[str, int | None]]":
+    """Parses an input script into (event, value) pairs. Every line is one of
+    'key <digits>' (number buttons, one per digit), 'coin <values>' (coin
+    buttons, values in grosze, one of 'denominations'), 'clear_number' or
+    'clear_coins'; empty lines and lines starting with '#' are skipped."""
+    denominations = set(denominations)
+    events = []
+    for lineNumber, line in enumerate(lines, 1):
+        words = line.split()
+        if not words or words[0].startswith('#'):
+            continue
+        command, args = words[0], words[1:]
+        try:
+            if command == 'key' and args:
+                events.extend(('key', int(d)) for arg in args for d in arg)
+            elif command == 'coin' and args:
+                for arg in args:
+                    value = int(arg)
+                    if value not in denominations:
+                        raise ValueError(value)
+                    events.append(('coin', value))
+            elif command in ['clear_number', 'clear_coins'] and not args:
+                events.append((command, None))
+            else:
+                raise ValueError(command)
+        except ValueError:
+            raise InvalidScriptException(lineNumber, line.rstrip('\n'))
+    return events
+
+def replay_script(handler: AutomatHandler, events: "list[tuple[str, int | None]]", repeat: int = 1) -> int:
+    """Feeds parsed script events to the handler as fast as it takes them,
+    'repeat' times. Returns the number of events replayed."""
+    callbacks = {
+        'key': handler.on_number_btn_click,
+        'coin': handler.on_coin_btn_click,
+        'clear_number': lambda _: handler.on_clear_number_btn_click(),
+        'clear_coins': lambda _: handler.on_clear_coins_btn_click(),
+    }
+    calls = [(callbacks[event], value) for event, value in events]
+    for _ in range(0, repeat):
+        for callback, value in calls:
+            callback(value)
+    return len(calls) * repeat
 
-class Application(tk.Frame):
-    """Main application tkinter frame."""
-    def __init__(self, master: tk.Tk) -> None:
-        super().__init__(master)
+class Application:
+    """Main application window, widgets are placed in a tkinter frame.
+    Create it after load_tkinter."""
+    def __init__(self, master: "tk.Tk", automat: "at.Automat | None" = None) -> None:
+        self.frame = tk.Frame(master)
         self.master = master
         self.master.title('Vending machine')
-        self.master.geometry('400x300+300+300')
-        self.handler = AutomatHandler()
+        self.master.geometry('400x330+300+300')
+        self.view = TkView(master)
+        self.handler = AutomatHandler(automat, self.view)
+        #button callbacks only queue the work for the handler
+        self.worker = HandlerWorker()
         self.create_widgets()
 
+    def mainloop(self) -> None:
+        self.frame.mainloop()
+        self.worker.close()
+
+    def on_click(self, callback: Callable) -> Callable:
+        """Returns a button command running the handler callback in the
+        worker thread."""
+        return lambda *args: self.worker.submit(callback, *args)
+
     def create_widgets(self) -> None:
         """Creates GUI elements."""
         ttk.Style().configure('TButton', padding=(4, 4, 4, 4))
         #create grid layout
         for i in range(0, 6):
-            self.grid_columnconfigure(i, pad=3, weight=1)
+            self.frame.grid_columnconfigure(i, pad=3, weight=1)
 
-        self.grid_rowconfigure(0, pad=3, weight=0)
-        self.grid_rowconfigure(1, pad=3, weight=0)
+        self.frame.grid_rowconfigure(0, pad=3, weight=0)
+        self.frame.grid_rowconfigure(1, pad=3, weight=0)
         for i in range(2, 6):
-            self.grid_rowconfigure(i, pad=3, weight=1)
+            self.frame.grid_rowconfigure(i, pad=3, weight=1)
+        self.frame.grid_rowconfigure(6, pad=3, weight=0)
 
         #create item number display
-        label = tk.Label(self, text="Item number:")
+        label = tk.Label(self.frame, text="Item number:")
         label.grid(row=0, columnspan=3, rowspan=1, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
-        self.handler.numberText = tk.StringVar()
-        numberText = tk.Entry(self, justify='right', state=tk.DISABLED, textvariable=self.handler.numberText)
+        numberText = tk.Entry(self.frame, justify='right', state=tk.DISABLED, textvariable=self.view.numberText)
         numberText.grid(row=1, column=0, columnspan=3, rowspan=1, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
         
         #create coins display
-        label = tk.Label(self, text="Coins:")
+        label = tk.Label(self.frame, text="Coins:")
         label.grid(row=0, column=3, columnspan=3, rowspan=1, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
-        self.handler.coinText = tk.StringVar()
-        coinText = tk.Entry(self, justify='right', state=tk.DISABLED, textvariable=self.handler.coinText)
+        coinText = tk.Entry(self.frame, justify='right', state=tk.DISABLED, textvariable=self.view.coinText)
         coinText.grid(row=1, column=3, columnspan=3, rowspan=1, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
 
         #create buttons
-        self.create_keypad(2, 0, self.handler.on_number_btn_click, [i for i in range(1, 10)], True)
-        self.create_keypad(2, 3, self.handler.on_coin_btn_click, at.coin_values, False)
-        button = tk.Button(self, text='CLEAR NUMBER', command=self.handler.on_clear_number_btn_click)
+        self.create_keypad(2, 0, self.on_click(self.handler.on_number_btn_click), [i for i in range(1, 10)], True)
+        denominations = self.handler.automat.get_denominations()[-9:]
+        self.create_keypad(2, 3, self.on_click(self.handler.on_coin_btn_click), denominations, False, [at.format_money(v) for v in denominations])
+        button = tk.Button(self.frame, text='CLEAR NUMBER', command=self.on_click(self.handler.on_clear_number_btn_click))
         button.grid(row=5, column=1, columnspan=2, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
-        button = tk.Button(self, text='CLEAR COINS', command=self.handler.on_clear_coins_btn_click)
+        button = tk.Button(self.frame, text='CLEAR COINS', command=self.on_click(self.handler.on_clear_coins_btn_click))
         button.grid(row=5, column=3, columnspan=3, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
 
-        self.pack(fill="both", expand=True)
+        #create display of items the inserted coins are enough for
+        label = tk.Label(self.frame, textvariable=self.view.affordableText, anchor=tk.W)
+        label.grid(row=6, column=0, columnspan=6, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
+
+        self.frame.pack(fill="both", expand=True)
 
-    def create_keypad(self, n_row: int, n_column: int, func: Callable, values: list, add_zero: bool) -> None:
-        """Creates a 0-9 keypad with specified values and button callback."""
+    def create_keypad(self, n_row: int, n_column: int, func: Callable, values: list, add_zero: bool, labels: "list[str] | None" = None) -> None:
+        """Creates a 0-9 keypad with specified values (at most 9) and button
+        callback. Button texts are taken from 'labels' if provided."""
+        if labels is None:
+            labels = [f'{v}' for v in values]
         start_row = n_row + 2
-        for i in range(0, 9):
-            button = tk.Button(self, text=f'{values[i]}', command=lambda value = values[i]: func(value))
+        for i in range(0, len(values)):
+            button = tk.Button(self.frame, text=labels[i], command=lambda value = values[i]: func(value))
             button.grid(row=start_row - (i // 3), column=i % 3 + n_column, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
         if add_zero:
-            button = tk.Button(self, text='0', command=lambda: func(0))
+            button = tk.Button(self.frame, text='0', command=lambda: func(0))
             button.grid(row=n_row + 3, column=n_column, sticky=tk.W+tk.E+tk.N+tk.S, padx=2, pady=2)
 
-if __name__ == '__main__':
+def main(argv: "list[str] | None" = None) -> int:
+    parser = argparse.ArgumentParser(description="Vending machine.")
+    parser.add_argument('catalog', nargs='?', help="catalog file to load items from")
+    parser.add_argument('--headless', metavar='SCRIPT', help="replay an input script without the GUI")
+    parser.add_argument('--repeat', type=int, default=1, help="how many times the script is replayed")
+    parser.add_argument('--record', metavar='SCRIPT', help="write GUI input to a script")
+    parser.add_argument('--seed', type=int, help="seed of random item prices")
+    parser.add_argument('--verbose', action='store_true', help="print popups of the headless run")
+    args = parser.parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+    automat = at.Automat.from_catalog(args.catalog) if args.catalog else None
+    if args.headless:
+        handler = AutomatHandler(automat, ConsoleView() if args.verbose else None)
+        with open(args.headless, encoding='utf-8') as f:
+            events = parse_script(f, handler.automat.get_denominations())
+        start = time.perf_counter()
+        count = replay_script(handler, events, args.repeat)
+        elapsed = time.perf_counter() - start
+        print(f"{count} events in {elapsed:.3f}s ({count / max(elapsed, 1e-9):.0f} events/s)")
+        print(f"inserted: {at.format_money(handler.automat.get_inserted_coins_value())}zl,"
+            f" stored: {at.format_money(handler.automat.get_stored_coins_value())}zl")
+        return 0
+    load_tkinter()
     root = tk.Tk()
-    app = Application(root)
-    app.mainloop()
\ No newline at end of file
+    app = Application(root, automat)
+    if args.record:
+        with open(args.record, 'w', encoding='utf-8') as f:
+            app.handler.recorder = lambda line: print(line, file=f, flush=True)
+            app.mainloop()
+    else:
+        app.mainloop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -1,5 +1,27 @@
+import contextlib
+import heapq
+import itertools
 import random
+import threading
+import time
+import weakref
+from typing import Hashable, Iterable
+from .money import *
 from .coin import *
+from .coin_store import *
+from .denominations import *
+from .change import *
+from .feasibility import *
+from .escrow import *
+from .result import *
+from .state import *
+from .journal import *
+from .item_index import *
+from .metrics import *
+from .snapshot import *
+from .reservation import *
+from .ledger import *
+from .shared import *
 from .item import *
 
 class InvalidItemNumberException(Exception):
@@ -8,116 +30,814 @@ class InvalidItemNumberException(Exception):
         super().__init__("Item number is invalid.")
 
 class NotEnoughMoneyException(Exception):
-    """Raised when not enough money is supplied for purchase."""
-    def __init__(self, provided: float, required: float) -> None:
-        super().__init__(f"Not enough money (provided: {provided}, required: {required}).")
+    """Raised when not enough money is supplied for purchase. Amounts are
+    in grosze."""
+    def __init__(self, provided: int, required: int) -> None:
+        self.provided = provided
+        self.required = required
+        super().__init__(f"Not enough money (provided: {format_money(provided)}, required: {format_money(required)}).")
 
 class ExactChangeOnlyException(Exception):
-    """Raised when the automat is not able to gice the change."""
-    def __init__(self, amount: float) -> None:
-        super().__init__(f"Exact change only (left: {amount}")
+    """Raised when the automat is not able to gice the change. Amount is
+    in grosze."""
+    def __init__(self, amount: int) -> None:
+        self.amount = amount
+        super().__init__(f"Exact change only (left: {format_money(amount)})")
 
-def get_random_price() -> float:
-    """Returns random price inc range of 1.50zl to 7zl."""
-    return random.randint(150, 700) / 100
+class ReservationExpiredException(Exception):
+    """Raised when a reservation is confirmed after it expired, was
+    cancelled or was already confirmed."""
+    def __init__(self) -> None:
+        super().__init__("Reservation expired.")
+
+def raise_for_status(status: PurchaseStatus, provided: int = 0, required: int = 0) -> None:
+    """Raises the exception matching a failed status. 'provided' and
+    'required' are the inserted and required amounts in grosze."""
+    if status == PurchaseStatus.INVALID_ITEM_NUMBER:
+        raise InvalidItemNumberException()
+    if status == PurchaseStatus.NOT_ENOUGH_MONEY:
+        raise NotEnoughMoneyException(provided, required)
+    if status == PurchaseStatus.NO_ITEMS_LEFT:
+        raise NoItemsLeftException()
+    if status == PurchaseStatus.EXACT_CHANGE_ONLY:
+        raise ExactChangeOnlyException(provided - required)
+    if status == PurchaseStatus.RESERVATION_EXPIRED:
+        raise ReservationExpiredException()
 
-def get_coins_value(coins) -> float:
-    """Returns value of the coins in a list."""
-    sum = 0
-    for c in coins:
-        sum = round(sum + c.get_value(), 2)
-    return sum
+def get_random_price() -> int:
+    """Returns random price in range of 150gr to 700gr."""
+    return random.randint(150, 700)
+
+def get_coins_value(coins) -> int:
+    """Returns value of the coins in a list in grosze."""
+    return sum(c.get_value() for c in coins)
 
 class Automat:
-    """Represents a vending machine."""
-    def __init__(self, amountOfEachItem: int) -> None:
+    """Represents a vending machine. Each customer session has its own
+    escrow for inserted coins (see open_session), methods use the default
+    session when none is given. With 'threadSafe' set, sessions can be
+    driven from several threads at once: stock of each item is guarded by
+    its own lock and the coin float by a short critical section."""
+    def __init__(self, amountOfEachItem: int, changeEngine: "ChangeEngine | None" = None, threadSafe: bool = False, denominations: "Iterable[int]" = coin_values) -> None:
         if amountOfEachItem < 1:
-            raise InvalidItemAmountException()
+            raise InvalidItemAmountException(amountOfEachItem)
         #create items and coins dictionaries
-        self.__items = { n:ItemInfo(get_random_price(), amountOfEachItem, Item(f"Item {n}")) for n in range(30, 51) }
-        self.__coins = { amount:[Coin(amount) for _ in range(0,10)] for amount in coin_values }
-        self.__inserted_coins: "list[Coin]" = []
-
-    def __fetch_item(self, itemNumber: int) -> Item:
-        """Returns the requested item or raises an exception if it's not 
-        available."""
-        try:
-            item = self.__items[itemNumber].fetch_item()
-            return item
-        except NoItemsLeftException as e:
-            raise e
-        except KeyError:
-            raise InvalidItemNumberException()
+        items = Catalog((n, ItemInfo(get_random_price(), amountOfEachItem, Item(f"Item {n}"))) for n in range(30, 51))
+        self.__setup(items, CoinStore(DenominationSet.get(denominations).get_values(), 10), changeEngine, threadSafe)
+
+    def __setup(self, items: Catalog, coins: CoinStore, changeEngine: "ChangeEngine | None", threadSafe: bool, shared: "SharedInventory | None" = None) -> None:
+        """Initializes the automat with the given items and coins. Coins and
+        items of a 'shared' automat are kept in the inventory's memory. The
+        change engine suited for the coins' denominations is used unless one
+        is given."""
+        self.__items = items
+        self.__denominations = DenominationSet.get(coins.get_denominations())
+        self.__index = ItemIndex(items, threadSafe)
+        self.__coins = coins
+        self.__escrow = Escrow(self.__coins.get_denominations())
+        self.__change_engine = changeEngine if changeEngine is not None else self.__denominations.get_change_engine()
+        self.__feasibility = ChangeFeasibilityIndex(self.__coins.get_denominations(), self.__coins.get_counts())
+        #locks are only created in thread safe mode, see __item_lock
+        self.__no_lock = contextlib.nullcontext()
+        self.__coins_lock = threading.Lock() if threadSafe else self.__no_lock
+        self.__item_locks = { n:threading.Lock() for n in self.__items } if threadSafe else {}
+        self.__shared = shared
+        self.__stock_version = 0
+        if shared is not None:
+            #other processes change the same memory, so locks are shared too
+            self.__coins_lock = shared.coins_lock
+            self.__item_locks = { n:shared.items_lock for n in self.__items }
+            self.__stock_version = shared.get_stock_version()
+        self.__journal: "Journal | None" = None
+        self.__journal_lock = contextlib.nullcontext()
+        self.__metrics: "Metrics | None" = None
+        self.__ledger: "SalesLedger | None" = None
+        #writes save old values for snapshots under this lock, it is taken
+        #after all the others
+        self.__state_lock = threading.Lock() if threadSafe else self.__no_lock
+        self.__generation: "weakref.ref[SnapshotGeneration] | None" = None
+        #reservations by ID and their (deadline, ID) in a heap, see reserve
+        self.__reservations: "dict[int, Reservation]" = {}
+        self.__deadlines: "list[tuple[float, int]]" = []
+        self.__reservations_lock = threading.Lock() if threadSafe else self.__no_lock
+        self.__reservation_ids = itertools.count(1)
+        self.__held_items: "dict[int, int]" = {}
+        self.__held_coins = [0] * len(self.__coins.get_denominations())
+        self.__reaper: "ReservationReaper | None" = None
+        self.__thread_safe = threadSafe
+
+    @classmethod
+    def from_state(cls, state: AutomatState, changeEngine: "ChangeEngine | None" = None, threadSafe: bool = False) -> "Automat":
+        """Creates an automat from a saved state."""
+        automat = cls.__new__(cls)
+        items = Catalog((n, ItemInfo(price, amount, Item(name))) for n, name, price, amount in state.items)
+        coins = CoinStore(state.denominations)
+        coins.add_counts(state.coinCounts)
+        automat.__setup(items, coins, changeEngine, threadSafe)
+        for value in state.insertedCoins:
+            automat.__escrow.insert(Coin(value))
+        return automat
+
+    @classmethod
+    def from_catalog(cls, catalog: "Catalog | str", amountOfEachCoin: int = 10, changeEngine: "ChangeEngine | None" = None, threadSafe: bool = False, denominations: "Iterable[int]" = coin_values) -> "Automat":
+        """Creates an automat selling items from a catalog or a catalog file
+        (see read_catalog)."""
+        if isinstance(catalog, str):
+            catalog = load_catalog(catalog)
+        automat = cls.__new__(cls)
+        automat.__setup(catalog, CoinStore(DenominationSet.get(denominations).get_values(), amountOfEachCoin), changeEngine, threadSafe)
+        return automat
+
+    @classmethod
+    def from_shared(cls, inventory: SharedInventory, catalog: "Catalog | str", changeEngine: "ChangeEngine | None" = None) -> "Automat":
+        """Creates an automat serving the machine whose coins and stock are
+        kept in 'inventory'; names and prices come from the catalog (or a
+        catalog file), amounts in it are ignored. Automats of several
+        processes can serve the same inventory at once, each is thread safe."""
+        if isinstance(catalog, str):
+            catalog = load_catalog(catalog)
+        items = Catalog((n, SharedItemInfo(catalog[n].get_price(), catalog[n].get_item(), inventory, i))
+            for i, n in enumerate(inventory.get_item_numbers()))
+        coins = CoinStore(inventory.get_denominations(), counts=inventory.get_coin_counts())
+        automat = cls.__new__(cls)
+        automat.__setup(items, coins, changeEngine, True, inventory)
+        return automat
+
+    @classmethod
+    def open_journaled(cls, directory: str, amountOfEachItem: int = 5, changeEngine: "ChangeEngine | None" = None, threadSafe: bool = False, syncEvery: int = 64, snapshotEvery: int = 10000) -> "Automat":
+        """Opens an automat whose state is kept in 'directory': the latest
+        snapshot is loaded and the journal tail replayed. A new automat is
+        created if nothing was saved there yet. Every change is recorded in
+        the journal from then on, see Journal."""
+        loaded = load_state(directory)
+        if loaded is None:
+            automat = cls(amountOfEachItem, changeEngine, threadSafe)
+            sequence = 0
+        else:
+            state, sequence = loaded
+            automat = cls.from_state(state, changeEngine, threadSafe)
+        journal = Journal(directory, automat.__coins.get_denominations(), sequence, syncEvery, snapshotEvery)
+        automat.attach_journal(journal)
+        return automat
+
+    def attach_journal(self, journal: Journal) -> None:
+        """Starts recording changes in the journal. A snapshot of the current
+        state is written first."""
+        with journal.lock:
+            journal.set_state_source(self.export_state)
+            journal.write_snapshot(self.export_state())
+            self.__journal_lock = journal.lock
+            self.__journal = journal
+
+    def get_shared_inventory(self) -> "SharedInventory | None":
+        """Returns the inventory of an automat created with from_shared."""
+        return self.__shared
+
+    def __sync_shared(self) -> None:
+        """Catches up with coin and stock changes made by other processes.
+        Does nothing unless the automat is shared."""
+        if self.__shared is None:
+            return
+        with self.__coins_lock:
+            self.__feasibility.update(self.__coins.get_counts())
+        version = self.__shared.get_stock_version()
+        if version != self.__stock_version:
+            self.__stock_version = version
+            self.__index.rebuild()
+
+    def __read_state(self, key: Hashable) -> object:
+        """Returns the current value of a part of the state: 'coins' (coin
+        counts), 'inserted' (values of coins inserted in the default
+        session), ('amount', item number) or ('price', item number)."""
+        if key == 'coins':
+            return tuple(self.__coins.get_counts())
+        if key == 'inserted':
+            return tuple(c.get_value() for c in self.__escrow.get_coins())
+        field, itemNumber = key
+        info = self.__items[itemNumber]
+        return info.get_amount() if field == 'amount' else info.get_price()
+
+    def __save(self, *keys: Hashable) -> None:
+        """Saves the current values of parts of the state (see __read_state)
+        for snapshots. Call with the state lock held, before changing them,
+        and only if there is a generation: writes check that themselves to
+        cost nothing while there are no snapshots."""
+        generation = self.__generation()
+        if generation is None:
+            #no snapshot is left
+            self.__generation = None
+            return
+        saved = generation.saved
+        for key in keys:
+            if key not in saved:
+                saved[key] = self.__read_state(key)
+
+    def snapshot(self) -> AutomatSnapshot:
+        """Returns a consistent, immutable view of stock, prices, coins and
+        the coins inserted in the default session. Taking it is O(1): state
+        is shared with the automat and the next write of every part saves
+        its old value first. Snapshots can be read from any thread without
+        blocking purchases. Snapshots of a shared automat are copies, since
+        other processes don't save old values."""
+        if self.__shared is not None:
+            generation = SnapshotGeneration()
+            with contextlib.ExitStack() as locks:
+                locks.enter_context(self.__shared.items_lock)
+                locks.enter_context(self.__coins_lock)
+                keys = ['coins', 'inserted'] + [(field, n) for n in self.__items for field in ['amount', 'price']]
+                for key in keys:
+                    generation.saved[key] = self.__read_state(key)
+            return AutomatSnapshot(generation, self.__read_state, self.__items, self.__denominations.get_values())
+        with self.__state_lock:
+            generation = self.__generation() if self.__generation is not None else None
+            if generation is None or generation.saved:
+                #nothing was written since the last snapshot is only possible
+                #for the newest generation, otherwise start a new one
+                newest = SnapshotGeneration()
+                if generation is not None:
+                    generation.next = newest
+                generation = newest
+                self.__generation = weakref.ref(newest)
+        return AutomatSnapshot(generation, self.__read_state, self.__items, self.__denominations.get_values())
+
+    def get_journal(self) -> "Journal | None":
+        """Returns the attached journal, if any."""
+        return self.__journal
+
+    def enable_metrics(self, metrics: "Metrics | None" = None) -> Metrics:
+        """Starts counting outcomes and measuring latency of coin insertion,
+        payments, change computation, fetching items and returning coins.
+        Instrumented methods are swapped in for this automat only, so nothing
+        is measured (or paid for) while metrics are disabled."""
+        if metrics is None:
+            metrics = Metrics(self.__coins_lock is not self.__no_lock)
+        self.disable_metrics()
+        status = lambda result: result.status.name.lower()
+        found = lambda result: 'ok' if result is not None else 'none'
+        for name, operation, outcome in [('insert_coin', 'insert_coin', None),
+                ('try_pay', 'try_pay', status),
+                ('pay_for_item', 'pay_for_item', None),
+                ('return_inserted_coins', 'return_inserted_coins', None),
+                ('_Automat__get_change', 'get_change', found)]:
+            setattr(self, name, instrument(metrics, operation, getattr(self, name), outcome))
+        #fetch_item goes through try_fetch_item, so only the latter is wrapped
+        itemInfoClasses = {}
+        for info in self.__items.values():
+            cls = type(info)
+            if cls not in itemInfoClasses:
+                itemInfoClasses[cls] = instrument_class(cls, metrics, {
+                    'try_fetch_item': ('fetch_item', lambda item: 'ok' if item is not None else 'no_items_left') })
+            info.__class__ = itemInfoClasses[cls]
+        self.__metrics = metrics
+        return metrics
+
+    def disable_metrics(self) -> None:
+        """Stops collecting metrics and restores the plain methods."""
+        if self.__metrics is None:
+            return
+        for name in ['insert_coin', 'try_pay', 'pay_for_item', 'return_inserted_coins', '_Automat__get_change']:
+            self.__dict__.pop(name, None)
+        for info in self.__items.values():
+            #instrumented classes derive from the plain one
+            info.__class__ = type(info).__bases__[0]
+        self.__metrics = None
+
+    def get_metrics(self) -> "Metrics | None":
+        """Returns the metrics being collected, if enabled."""
+        return self.__metrics
+
+    def enable_ledger(self, ledger: "SalesLedger | None" = None) -> SalesLedger:
+        """Starts recording the outcome of every purchase attempt, batch
+        order, confirmed and expired reservation in a sales ledger (a new
+        in-memory one if none is given)."""
+        if ledger is None:
+            ledger = SalesLedger(self.__denominations.get_values())
+        self.__ledger = ledger
+        return ledger
+
+    def disable_ledger(self) -> None:
+        """Stops recording outcomes, the ledger keeps what it has."""
+        self.__ledger = None
+
+    def get_ledger(self) -> "SalesLedger | None":
+        """Returns the sales ledger being written, if enabled."""
+        return self.__ledger
+
+    def __refused(self, itemNumber: int, result: "PurchaseResult | ReservationResult") -> "PurchaseResult | ReservationResult":
+        """Records a refused purchase in the ledger and returns its result."""
+        if self.__ledger is not None:
+            self.__ledger.record(itemNumber, result.required, result.status)
+        return result
+
+    def export_state(self) -> AutomatState:
+        """Returns a plain copy of the state. Inserted coins are only saved
+        for the default session. Reservations aren't saved: items, change and
+        inserted coins they hold are counted as not held."""
+        held = self.__held_items
+        return AutomatState(self.__coins.get_denominations(), [n + k for n, k in zip(self.__coins.get_counts(), self.__held_coins)],
+            [c.get_value() for c in self.__get_default_inserted()],
+            [(n, info.get_name(), info.get_price(), info.get_amount() + held.get(n, 0)) for n, info in self.__items.items()])
+
+    def __get_default_inserted(self) -> "list[Coin]":
+        """Returns coins inserted in the default session in the order they
+        were inserted, including the ones its reservations hold."""
+        with self.__reservations_lock:
+            held = [c for r in self.__reservations.values() if r.escrow is self.__escrow for c in r.coins]
+        return held + self.__escrow.get_coins() if held else self.__escrow.get_coins()
+
+    def __record_default_inserted(self) -> None:
+        """Journals the coins of the default session again, the ones its
+        reservations hold included, after some of them were sold, refunded
+        or released. Call in a journal batch."""
+        self.__journal.record_refund()
+        for coin in self.__get_default_inserted():
+            self.__journal.record_insert(coin.get_value())
+
+    def __item_lock(self, itemNumber: int) -> "threading.Lock | contextlib.nullcontext":
+        """Returns the lock guarding stock of an item."""
+        return self.__item_locks.get(itemNumber, self.__no_lock)
+
+    def __is_default_session_locked(self) -> bool:
+        """Checks whether changes of the default session need locks: they are
+        journaled or snapshots may be taken from other threads."""
+        return self.__journal is not None or self.__state_lock is not self.__no_lock
+
+    def __session(self, session: "Escrow | None") -> Escrow:
+        """Returns escrow of the session or the default one."""
+        return self.__escrow if session is None else session
 
-    def get_items_list(self) -> "list[tuple[int, str]]":
-        """Returns item numbers and names."""
-        return [(k, v.get_name()) for k, v in self.__items.items()]
+    def open_session(self) -> Escrow:
+        """Starts a new customer session with its own inserted coins. Pass
+        the returned session to the coin and payment methods. A session
+        should only be used by one thread at a time."""
+        return Escrow(self.__coins.get_denominations())
 
-    def get_item_details(self, itemNumber: int) -> "tuple[str, float, int]":
-        """Returns name, price and amount of an item."""
-        try:
-            itemInfo = self.__items[itemNumber]
-        except KeyError:
+    def get_denominations(self) -> "tuple[int, ...]":
+        """Returns values of the coins the automat accepts, ascending."""
+        return self.__denominations.get_values()
+
+    def get_items_list(self) -> ItemsListView:
+        """Returns a read-only view of item numbers and names."""
+        return ItemsListView(self.__items)
+
+    def get_items_by_price(self, low: int, high: int) -> "list[int]":
+        """Returns numbers of items priced from 'low' to 'high' grosze
+        inclusive, cheapest first."""
+        self.__sync_shared()
+        return self.__index.get_by_price(low, high)
+
+    def get_in_stock_items(self) -> "list[int]":
+        """Returns numbers of items that have copies left, cheapest first."""
+        self.__sync_shared()
+        return self.__index.get_in_stock()
+
+    def get_affordable_items(self, session: "Escrow | None" = None) -> "list[int]":
+        """Returns numbers of items in stock that the coins inserted in the
+        session are enough for, cheapest first. Change is not checked."""
+        self.__sync_shared()
+        return self.__index.get_in_stock(self.__session(session).get_value())
+
+    def get_item_number_length(self) -> int:
+        """Returns how many digits the longest item number has."""
+        return self.__items.get_number_length()
+
+    def lookup(self, itemNumber: int) -> LookupResult:
+        """Returns details of an item. An invalid number is reported in the
+        status of the result instead of raising."""
+        itemInfo = self.__items.get(itemNumber)
+        if itemInfo is None:
+            return LookupResult(PurchaseStatus.INVALID_ITEM_NUMBER, '', 0, 0)
+        return LookupResult(PurchaseStatus.OK, itemInfo.get_name(), itemInfo.get_price(), itemInfo.get_amount())
+
+    def get_item_details(self, itemNumber: int) -> "tuple[str, int, int]":
+        """Returns name, price (in grosze) and amount of an item."""
+        itemInfo = self.__items.get(itemNumber)
+        if itemInfo is None:
             raise InvalidItemNumberException()
         return itemInfo.get_name(), itemInfo.get_price(), itemInfo.get_amount()
 
-    def insert_coin(self, coin: Coin) -> None:
+    def insert_coin(self, coin: Coin, session: "Escrow | None" = None) -> None:
         """Insert a coin from the customer."""
-        self.__inserted_coins.append(coin)
+        if session is None and self.__is_default_session_locked():
+            with self.__journal_lock, self.__state_lock:
+                if self.__generation is not None:
+                    self.__save('inserted')
+                self.__escrow.insert(coin)
+                if self.__journal is not None:
+                    self.__journal.record_insert(coin.get_value())
+            return
+        if session is None and self.__generation is not None:
+            self.__save('inserted')
+        self.__session(session).insert(coin)
+
+    def return_inserted_coins(self, session: "Escrow | None" = None) -> "list[Coin]":
+        """Returns coins back to the client. The list of inserted coins is
+        handed over as is, coins are immutable so nothing is copied."""
+        if session is None and self.__is_default_session_locked():
+            with self.__journal_lock, self.__state_lock:
+                if self.__generation is not None:
+                    self.__save('inserted')
+                coins = self.__escrow.take_coins()
+                if self.__journal is not None:
+                    if self.__reservations:
+                        #coins held by reservations stay inserted
+                        with self.__journal.batch():
+                            self.__record_default_inserted()
+                    else:
+                        self.__journal.record_refund()
+                return coins
+        if session is None and self.__generation is not None:
+            self.__save('inserted')
+        return self.__session(session).take_coins()
 
-    def return_inserted_coins(self) -> None:
-        """Returns coins back to the client."""
-        coins = copy.deepcopy(self.__inserted_coins)
-        self.__inserted_coins.clear()
-        return coins
+    def get_inserted_coins_value(self, session: "Escrow | None" = None) -> int:
+        """Returns value of the inserted coins in grosze."""
+        return self.__session(session).get_value()
 
-    def get_inserted_coins_value(self) -> float:
-        """Returns value of the inserted coins."""
-        return get_coins_value(self.__inserted_coins)
+    def get_stored_coins_value(self) -> int:
+        """Returns value of automat's coins in grosze."""
+        return self.__coins.get_value()
 
     def add_coins(self, coins: "list[Coin]") -> None:
         """Adds coins from the list to automat's coins."""
+        counts = self.__coins.count_coins(coins)
         #add coins to the machine
-        for c in coins:
-            self.__coins[c.get_value()].append(c)
+        with self.__coins_lock, self.__journal_lock, self.__state_lock:
+            if self.__generation is not None:
+                self.__save('coins')
+            self.__coins.add_counts(counts)
+            self.__feasibility.update(self.__coins.get_counts())
+            if self.__journal is not None:
+                self.__journal.record_add_coins(counts)
         coins.clear() #clear the list of coins passed to the machine
 
-    def __get_change(self, coinsValue: float, price: float) -> "list[Coin]":
-        """Adds coins from the list to automat's coins and returns change 
-        to match the amount of money required."""
-        amount = coinsValue - price #amount of change left
-        coins = []
-        for cv in coin_values[::-1]:
-            required_coin_count = amount // cv
-            available_coin_count = len(self.__coins[cv])
-            coin_count = int(min(required_coin_count, available_coin_count))
-            #fetch required amount of coins from the automat
-            for _ in range(0, coin_count):
-                coins.append(self.__coins[cv].pop())
-            amount = round(amount - coin_count * cv, 2)
-        if amount > 0:
-            raise ExactChangeOnlyException(amount)
-        return coins
-
-    def pay_for_item(self, itemNumber: int) -> "tuple[list[Coin], Item]":
-        """Tries to pay for item with the inserted coins. Returns a tuple 
-        of change and item if succeeded."""
-        coinsValue = self.get_inserted_coins_value()
+    def restock(self, itemNumber: int, amount: int) -> None:
+        """Adds 'amount' copies of an item."""
+        itemInfo = self.__items.get(itemNumber)
+        if itemInfo is None:
+            raise InvalidItemNumberException()
+        if amount < 0:
+            raise InvalidItemAmountException(amount)
+        with self.__item_lock(itemNumber), self.__journal_lock, self.__state_lock:
+            if self.__generation is not None:
+                self.__save(('amount', itemNumber))
+            itemInfo.set_amount(itemInfo.get_amount() + amount)
+            if self.__journal is not None:
+                self.__journal.record_restock(itemNumber, itemInfo.get_amount() + self.__held_items.get(itemNumber, 0))
+
+    def __can_give_change(self, amount: int, insertedCounts: "list[int]") -> bool:
+        """Checks whether change of 'amount' grosze can be given with
+        automat's coins and the inserted ones."""
+        if amount <= self.__feasibility.get_max_amount():
+            return self.__feasibility.is_reachable(amount, insertedCounts)
+        available = [n + k for n, k in zip(self.__coins.get_counts(), insertedCounts)]
+        return self.__change_engine.make_change(amount, self.__coins.get_denominations(), available) is not None
+
+    def can_give_change(self, amount: int, session: "Escrow | None" = None) -> bool:
+        """Checks whether change of 'amount' grosze can be given right now.
+        The inserted coins count as available for change."""
+        self.__sync_shared()
+        return self.__can_give_change(amount, self.__session(session).get_counts())
+
+    def __can_change_top_up(self, reachable: int) -> bool:
+        """Checks whether any overpayment smaller than the largest coin can be
+        given back as change. 'reachable' is a bitset of payable amounts."""
+        mask = self.__denominations.get_top_up_mask()
+        return reachable & mask == mask
+
+    def __is_exact_change_only(self, price: int, escrow: Escrow, reachable: int, topUpOk: bool) -> bool:
+        """Checks whether an item of the given price can only be bought with
+        the exact amount. 'topUpOk' is the result of __can_change_top_up."""
+        coinsValue = escrow.get_value()
+        if coinsValue < price:
+            return not topUpOk
+        if coinsValue - price > self.__feasibility.get_max_amount():
+            return not self.__can_give_change(coinsValue - price, escrow.get_counts())
+        return (reachable >> (coinsValue - price)) & 1 == 0
+
+    def is_exact_change_only(self, itemNumber: int, session: "Escrow | None" = None) -> bool:
+        """Checks whether the item can only be bought with the exact amount
+        given the coins inserted so far: either the change for the current
+        credit can't be given, or the credit is still too low and some
+        overpayment smaller than the largest coin couldn't be given back."""
         itemName, itemPrice, itemAmount = self.get_item_details(itemNumber)
-        if coinsValue == itemPrice:
-            #exact amount of money
-            try:
-                item = self.__fetch_item(itemNumber)
-                self.add_coins(self.__inserted_coins)
-                return [], item
-            except NoItemsLeftException as e:
-                raise e
-        elif coinsValue >= itemPrice:
-            #too much money
-            self.add_coins(self.__inserted_coins)
-            #get change first in case ExactChangeOnlyException is raised
-            change = self.__get_change(coinsValue, itemPrice)
-            return change, self.__fetch_item(itemNumber)
-        else:
+        self.__sync_shared()
+        escrow = self.__session(session)
+        reachable = self.__feasibility.get_reachable(escrow.get_counts())
+        return self.__is_exact_change_only(itemPrice, escrow, reachable, self.__can_change_top_up(reachable))
+
+    def get_exact_change_only_items(self, session: "Escrow | None" = None) -> "list[int]":
+        """Returns numbers of items in stock that can only be bought with the
+        exact amount right now (see is_exact_change_only)."""
+        self.__sync_shared()
+        escrow = self.__session(session)
+        reachable = self.__feasibility.get_reachable(escrow.get_counts())
+        topUpOk = self.__can_change_top_up(reachable)
+        return [n for n, info in self.__items.items()
+            if info.get_amount() > 0 and self.__is_exact_change_only(info.get_price(), escrow, reachable, topUpOk)]
+
+    def __get_change(self, coinsValue: int, price: int, insertedCounts: "list[int]") -> "list[int] | None":
+        """Returns counts of coins to give as change or None if the change
+        can't be given. The inserted coins can be given back as change too.
+        Nothing is taken from automat's coins."""
+        amount = coinsValue - price #amount of change
+        available = [n + k for n, k in zip(self.__coins.get_counts(), insertedCounts)]
+        return self.__change_engine.make_change(amount, self.__coins.get_denominations(), available)
+
+    def try_pay(self, itemNumber: int, session: "Escrow | None" = None) -> PurchaseResult:
+        """Tries to pay for item with the inserted coins. Expected failures
+        are reported in the status of the result instead of raising.
+        Automat's coins, inserted coins and items are left untouched unless
+        the purchase succeeds."""
+        if self.__deadlines and self.__reaper is None:
+            self.__expire_reservations()
+        escrow = self.__session(session)
+        coinsValue = escrow.get_value()
+        itemInfo = self.__items.get(itemNumber)
+        if itemInfo is None:
+            return self.__refused(itemNumber, PurchaseResult(PurchaseStatus.INVALID_ITEM_NUMBER, None, [], coinsValue, 0))
+        itemPrice = itemInfo.get_price()
+        if coinsValue < itemPrice:
             #not enough money
-            raise NotEnoughMoneyException(coinsValue, itemPrice)
+            return self.__refused(itemNumber, PurchaseResult(PurchaseStatus.NOT_ENOUGH_MONEY, None, [], coinsValue, itemPrice))
+        insertedCounts = escrow.get_counts()
+        with self.__item_lock(itemNumber):
+            if itemInfo.get_amount() == 0:
+                return self.__refused(itemNumber, PurchaseResult(PurchaseStatus.NO_ITEMS_LEFT, None, [], coinsValue, itemPrice))
+            while True:
+                #get change first in case it can't be given, it is computed
+                #outside of the coins lock and only committed if the coins it
+                #uses are still there
+                change = self.__get_change(coinsValue, itemPrice, insertedCounts)
+                if change is None:
+                    if self.__journal is not None:
+                        with self.__journal_lock:
+                            self.__journal.record_no_change(itemNumber, itemPrice, insertedCounts)
+                    return self.__refused(itemNumber, PurchaseResult(PurchaseStatus.EXACT_CHANGE_ONLY, None, [], coinsValue, itemPrice))
+                with self.__coins_lock, self.__journal_lock, self.__state_lock:
+                    if self.__generation is not None:
+                        self.__save('coins', ('amount', itemNumber), 'inserted')
+                    if self.__coins.exchange(insertedCounts, change):
+                        #commit the purchase, nothing below can fail
+                        self.__feasibility.update(self.__coins.get_counts())
+                        item = itemInfo.try_fetch_item()
+                        escrow.clear()
+                        if self.__journal is not None:
+                            if escrow is self.__escrow and self.__reservations:
+                                #coins held by reservations stay inserted
+                                with self.__journal.batch():
+                                    self.__journal.record_sale(itemNumber, insertedCounts, change, False)
+                                    self.__record_default_inserted()
+                            else:
+                                self.__journal.record_sale(itemNumber, insertedCounts, change, escrow is self.__escrow)
+                        break
+        if self.__ledger is not None:
+            self.__ledger.record(itemNumber, itemPrice, PurchaseStatus.OK, insertedCounts, change)
+        return PurchaseResult(PurchaseStatus.OK, item, self.__coins.make_coins(change), coinsValue, itemPrice)
+
+    def pay_for_item(self, itemNumber: int, session: "Escrow | None" = None) -> "tuple[list[Coin], Item]":
+        """Tries to pay for item with the inserted coins. Returns a tuple 
+        of change and item if succeeded. Automat's coins, inserted coins and
+        items are left untouched when an exception is raised."""
+        result = self.try_pay(itemNumber, session)
+        if result.status != PurchaseStatus.OK:
+            raise_for_status(result.status, result.provided, result.required)
+        return result.change, result.item
+
+    def pay_for_items(self, orders: "list[tuple[int, list[Coin]]]") -> "list[OrderResult]":
+        """Processes a batch of orders, each being an item number and the
+        coins tendered for it. Orders are checked one after another as if
+        they were bought separately (change of an order can use coins
+        tendered in earlier ones), but nothing is raised: every order gets an
+        OrderResult; orders with coins of other denominations than the
+        automat's get INVALID_COIN. Stock and coins are updated once for the
+        whole batch.
+        Inserted coins of the sessions are not touched."""
+        if self.__deadlines and self.__reaper is None:
+            self.__expire_reservations()
+        denominations = self.__coins.get_denominations()
+        itemNumbers = sorted({ n for n, _ in orders if n in self.__items })
+        with contextlib.ExitStack() as locks:
+            #item locks are taken in order so batches can't deadlock, items
+            #of a shared automat all have the same lock
+            entered = set()
+            for n in itemNumbers:
+                lock = self.__item_lock(n)
+                if id(lock) not in entered:
+                    entered.add(id(lock))
+                    locks.enter_context(lock)
+            locks.enter_context(self.__coins_lock)
+            locks.enter_context(self.__journal_lock)
+            locks.enter_context(self.__state_lock)
+            available = self.__coins.get_counts()
+            stock = { n:self.__items[n].get_amount() for n in itemNumbers }
+            added = [0] * len(denominations)
+            removed = [0] * len(denominations)
+            results = []
+            sales = []
+            for itemNumber, coins in orders:
+                try:
+                    tendered = self.__coins.count_coins(coins)
+                except InvalidCoinValueException:
+                    #a coin the automat doesn't take, only this order fails
+                    results.append(OrderResult(PurchaseStatus.INVALID_COIN, None, coins))
+                    continue
+                credit = sum(v * n for v, n in zip(denominations, tendered))
+                info = self.__items.get(itemNumber)
+                if info is None:
+                    results.append(OrderResult(PurchaseStatus.INVALID_ITEM_NUMBER, None, coins))
+                    continue
+                price = info.get_price()
+                if credit < price:
+                    results.append(OrderResult(PurchaseStatus.NOT_ENOUGH_MONEY, None, coins))
+                    continue
+                if stock[itemNumber] == 0:
+                    results.append(OrderResult(PurchaseStatus.NO_ITEMS_LEFT, None, coins))
+                    continue
+                withTendered = [n + k for n, k in zip(available, tendered)]
+                change = self.__change_engine.make_change(credit - price, denominations, withTendered)
+                if change is None:
+                    results.append(OrderResult(PurchaseStatus.EXACT_CHANGE_ONLY, None, coins))
+                    continue
+                for i in range(0, len(denominations)):
+                    available[i] = withTendered[i] - change[i]
+                    added[i] += tendered[i]
+                    removed[i] += change[i]
+                stock[itemNumber] -= 1
+                sales.append((itemNumber, tendered, change))
+                results.append(OrderResult(PurchaseStatus.OK, info.get_item(), self.__coins.make_coins(change)))
+            #commit the whole batch
+            if self.__generation is not None:
+                self.__save('coins', *[('amount', n) for n in stock])
+            self.__coins.exchange(added, removed)
+            self.__feasibility.update(self.__coins.get_counts())
+            for n, amount in stock.items():
+                self.__items[n].set_amount(amount)
+            if self.__journal is not None:
+                with self.__journal.batch():
+                    sold = iter(sales)
+                    for (itemNumber, coins), result in zip(orders, results):
+                        if result.status == PurchaseStatus.OK:
+                            _, tendered, change = next(sold)
+                            self.__journal.record_sale(itemNumber, tendered, change, False)
+                        elif result.status == PurchaseStatus.EXACT_CHANGE_ONLY:
+                            self.__journal.record_no_change(itemNumber, self.__items[itemNumber].get_price(), self.__coins.count_coins(coins))
+        if self.__ledger is not None:
+            sold = iter(sales)
+            for (itemNumber, _), result in zip(orders, results):
+                info = self.__items.get(itemNumber)
+                price = info.get_price() if info is not None else 0
+                if result.status == PurchaseStatus.OK:
+                    _, tendered, change = next(sold)
+                    self.__ledger.record(itemNumber, price, result.status, tendered, change)
+                else:
+                    self.__ledger.record(itemNumber, price, result.status)
+        return results
+
+    def reserve(self, itemNumber: int, session: "Escrow | None" = None, timeout: float = 30.0) -> ReservationResult:
+        """First phase of a purchase: checks the item like try_pay does and
+        holds a unit of it, the inserted coins and the change for 'timeout'
+        seconds. The held item can't be sold to anyone else and the held
+        change can't be given to anyone else. The purchase is completed with
+        confirm or given up with cancel; reservations that are neither are
+        cancelled when they expire, by a background thread in thread safe
+        mode and by the next purchase otherwise. Expired coins go back to the
+        session, so a session shouldn't be used by another thread while its
+        reservation is held."""
+        if self.__deadlines and self.__reaper is None:
+            self.__expire_reservations()
+        escrow = self.__session(session)
+        coinsValue = escrow.get_value()
+        itemInfo = self.__items.get(itemNumber)
+        if itemInfo is None:
+            return self.__refused(itemNumber, ReservationResult(PurchaseStatus.INVALID_ITEM_NUMBER, 0, 0.0, coinsValue, 0))
+        itemPrice = itemInfo.get_price()
+        if coinsValue < itemPrice:
+            return self.__refused(itemNumber, ReservationResult(PurchaseStatus.NOT_ENOUGH_MONEY, 0, 0.0, coinsValue, itemPrice))
+        insertedCounts = escrow.get_counts()
+        with self.__item_lock(itemNumber):
+            if itemInfo.get_amount() == 0:
+                return self.__refused(itemNumber, ReservationResult(PurchaseStatus.NO_ITEMS_LEFT, 0, 0.0, coinsValue, itemPrice))
+            while True:
+                change = self.__get_change(coinsValue, itemPrice, insertedCounts)
+                if change is None:
+                    if self.__journal is not None:
+                        with self.__journal_lock:
+                            self.__journal.record_no_change(itemNumber, itemPrice, insertedCounts)
+                    return self.__refused(itemNumber, ReservationResult(PurchaseStatus.EXACT_CHANGE_ONLY, 0, 0.0, coinsValue, itemPrice))
+                deadline = time.monotonic() + timeout
+                with self.__coins_lock, self.__journal_lock, self.__state_lock:
+                    if self.__generation is not None:
+                        self.__save('coins', ('amount', itemNumber), 'inserted')
+                    reservation = Reservation(next(self.__reservation_ids), itemNumber, None, itemPrice, escrow, [], insertedCounts, change, deadline)
+                    if not self.__coins.exchange([0] * len(change), reservation.fromFloat):
+                        #the coins were given to someone else meanwhile
+                        continue
+                    self.__feasibility.update(self.__coins.get_counts())
+                    #nothing is journaled, held things are saved as not held
+                    reservation.item = itemInfo.try_fetch_item()
+                    reservation.coins = escrow.take_coins()
+                    self.__held_items[itemNumber] = self.__held_items.get(itemNumber, 0) + 1
+                    for i, n in enumerate(reservation.fromFloat):
+                        self.__held_coins[i] += n
+                    with self.__reservations_lock:
+                        self.__reservations[reservation.id] = reservation
+                        earliest = not self.__deadlines or deadline < self.__deadlines[0][0]
+                        heapq.heappush(self.__deadlines, (deadline, reservation.id))
+                    break
+        if self.__thread_safe:
+            if self.__reaper is None:
+                self.__reaper = ReservationReaper(self.__expire_reservations)
+            elif earliest:
+                self.__reaper.wake()
+        return ReservationResult(PurchaseStatus.OK, reservation.id, deadline, coinsValue, itemPrice)
+
+    def confirm(self, reservationId: int) -> PurchaseResult:
+        """Completes a reserved purchase: the held coins go to automat's
+        coins and the item and change to the customer. Nothing is computed,
+        so the locks are only held for a few assignments. The status is
+        RESERVATION_EXPIRED if the reservation is not held any more or its
+        deadline has passed; it is then cancelled if it wasn't already."""
+        with self.__reservations_lock:
+            reservation = self.__reservations.pop(reservationId, None)
+        if reservation is None:
+            return PurchaseResult(PurchaseStatus.RESERVATION_EXPIRED, None, [], 0, 0)
+        if reservation.deadline <= time.monotonic():
+            #the reaper hasn't got to it yet or there is none
+            self.__expire(reservation)
+            return PurchaseResult(PurchaseStatus.RESERVATION_EXPIRED, None, [], get_coins_value(reservation.coins), reservation.price)
+        with self.__item_lock(reservation.itemNumber), self.__coins_lock, self.__journal_lock, self.__state_lock:
+            if self.__generation is not None:
+                self.__save('coins')
+            self.__coins.add_counts(reservation.get_float_income())
+            self.__feasibility.update(self.__coins.get_counts())
+            self.__held_items[reservation.itemNumber] -= 1
+            for i, n in enumerate(reservation.fromFloat):
+                self.__held_coins[i] -= n
+            if self.__journal is not None:
+                with self.__journal.batch():
+                    self.__journal.record_sale(reservation.itemNumber, reservation.insertedCounts, reservation.change, False)
+                    if reservation.escrow is self.__escrow:
+                        self.__record_default_inserted()
+        if self.__ledger is not None:
+            self.__ledger.record(reservation.itemNumber, reservation.price, PurchaseStatus.OK, reservation.insertedCounts, reservation.change)
+        return PurchaseResult(PurchaseStatus.OK, reservation.item, self.__coins.make_coins(reservation.change), get_coins_value(reservation.coins), reservation.price)
+
+    def cancel(self, reservationId: int) -> bool:
+        """Gives up a reserved purchase: the item and change coins are
+        released and the inserted coins go back to the session. Returns
+        False if the reservation is not held any more."""
+        with self.__reservations_lock:
+            reservation = self.__reservations.pop(reservationId, None)
+        if reservation is None:
+            return False
+        self.__release(reservation)
+        return True
+
+    def __release(self, reservation: Reservation) -> None:
+        """Puts back what a cancelled or expired reservation held."""
+        itemInfo = self.__items[reservation.itemNumber]
+        escrow = reservation.escrow
+        with self.__item_lock(reservation.itemNumber), self.__coins_lock, self.__journal_lock, self.__state_lock:
+            if self.__generation is not None:
+                self.__save('coins', ('amount', reservation.itemNumber), 'inserted')
+            itemInfo.set_amount(itemInfo.get_amount() + 1)
+            self.__coins.add_counts(reservation.fromFloat)
+            self.__feasibility.update(self.__coins.get_counts())
+            self.__held_items[reservation.itemNumber] -= 1
+            for i, n in enumerate(reservation.fromFloat):
+                self.__held_coins[i] -= n
+            for coin in reservation.coins:
+                escrow.insert(coin)
+            if self.__journal is not None and escrow is self.__escrow:
+                #the coins were journaled as inserted all along, but they are
+                #after the ones inserted since now
+                with self.__journal.batch():
+                    self.__record_default_inserted()
+
+    def __expire(self, reservation: Reservation) -> None:
+        """Releases a reservation past its deadline."""
+        self.__release(reservation)
+        if self.__ledger is not None:
+            self.__ledger.record(reservation.itemNumber, reservation.price, PurchaseStatus.RESERVATION_EXPIRED)
+
+    def __expire_reservations(self) -> "float | None":
+        """Cancels reservations past their deadline. Returns seconds until
+        the next deadline, None if no reservation is held."""
+        now = time.monotonic()
+        expired = []
+        with self.__reservations_lock:
+            while self.__deadlines and self.__deadlines[0][0] <= now:
+                _, reservationId = heapq.heappop(self.__deadlines)
+                #confirmed and cancelled reservations are only removed here
+                reservation = self.__reservations.pop(reservationId, None)
+                if reservation is not None:
+                    expired.append(reservation)
+            delay = self.__deadlines[0][0] - now if self.__deadlines else None
+        for reservation in expired:
+            self.__expire(reservation)
+        return delay
+
+    def get_reserved_items(self) -> "dict[int, int]":
+        """Returns how many units of each item are held by reservations."""
+        return { n:k for n, k in self.__held_items.items() if k > 0 }
@@ -0,0 +1,171 @@
+import csv
+import json
+from typing import Iterator, Sequence
+from .item import *
+
+class InvalidCatalogException(Exception):
+    """Raised when a catalog file can't be read."""
+    def __init__(self, path: str, line: int, reason: str) -> None:
+        super().__init__(f"Invalid catalog {path}, line {line}: {reason}")
+
+class DuplicateItemNumberException(Exception):
+    """Raised when two catalog entries have the same item number."""
+    def __init__(self, itemNumber: int) -> None:
+        super().__init__(f"Duplicate item number: {itemNumber}")
+
+def parse_catalog_row(row: dict) -> "tuple[int, str, int, int]":
+    """Returns the number, name, price and stock of a catalog row. Raises
+    ValueError for prices below 1gr and negative stock."""
+    item = int(row['number']), str(row['name']), int(row['price']), int(row['stock'])
+    if item[2] < 1:
+        raise ValueError(f"price below 1gr: {item[2]}")
+    if item[3] < 0:
+        raise ValueError(f"negative stock: {item[3]}")
+    return item
+
+def read_catalog(path: str) -> "Iterator[tuple[int, str, int, int]]":
+    """Streams item definitions (number, name, price in grosze, stock) from a
+    CSV file with a 'number,name,price,stock' header or from a JSON lines
+    file ('.jsonl') with objects having the same keys. Errors report the
+    line of the file, blank lines included."""
+    with open(path, newline='', encoding='utf-8') as f:
+        line = 1
+        try:
+            if path.endswith('.jsonl'):
+                for line, text in enumerate(f, 1):
+                    if text.strip():
+                        yield parse_catalog_row(json.loads(text))
+            else:
+                rows = csv.DictReader(f)
+                for row in rows:
+                    line = rows.line_num
+                    yield parse_catalog_row(row)
+        except (ValueError, KeyError, TypeError) as e:
+            raise InvalidCatalogException(path, line, repr(e))
+
+class ItemsListView(Sequence):
+    """Read-only view of item numbers and names in a catalog. Entries are
+    built on access, nothing is copied up front."""
+    def __init__(self, catalog: "Catalog") -> None:
+        self.__catalog = catalog
+
+    def __len__(self) -> int:
+        return len(self.__catalog)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = self.__catalog.get_number_at(index)
+        return n, self.__catalog[n].get_name()
+
+    def __iter__(self) -> "Iterator[tuple[int, str]]":
+        for n, info in self.__catalog.items():
+            yield n, info.get_name()
+
+class Catalog:
+    """Table of items keyed by item number. When item numbers are mostly
+    contiguous the items are kept in a dense list indexed by number minus
+    the lowest number, otherwise in a dictionary."""
+    #dense storage is used when at least this share of the number range is used
+    DENSITY = 0.5
+
+    def __init__(self, items: "Iterator[tuple[int, ItemInfo]] | None" = None) -> None:
+        self.__numbers: "list[int]" = []
+        self.__dict: "dict[int, ItemInfo] | None" = {}
+        self.__dense: "list[ItemInfo | None]" = []
+        self.__first = 0
+        self.__max_number = 0
+        if items is not None:
+            for n, info in items:
+                self.add(n, info)
+            self.compact()
+
+    def add(self, itemNumber: int, info: ItemInfo) -> None:
+        """Adds an item. Call compact after adding many items."""
+        if itemNumber in self:
+            raise DuplicateItemNumberException(itemNumber)
+        self.__numbers.append(itemNumber)
+        self.__max_number = itemNumber if len(self.__numbers) == 1 else max(self.__max_number, itemNumber)
+        if self.__dict is None:
+            first = min(self.__first, itemNumber)
+            if len(self.__numbers) < (self.__max_number - first + 1) * Catalog.DENSITY:
+                #the number is too far away, switch to the dictionary
+                self.__dict = { n:self.__dense[n - self.__first] for n in self.__numbers[:-1] }
+                self.__dense = []
+        if self.__dict is not None:
+            self.__dict[itemNumber] = info
+            return
+        if itemNumber < self.__first:
+            self.__dense[0:0] = [None] * (self.__first - itemNumber)
+            self.__first = itemNumber
+        index = itemNumber - self.__first
+        if index >= len(self.__dense):
+            self.__dense.extend([None] * (index + 1 - len(self.__dense)))
+        self.__dense[index] = info
+
+    def compact(self) -> None:
+        """Picks dense or dictionary storage for the current item numbers."""
+        if not self.__numbers:
+            return
+        first, last = min(self.__numbers), max(self.__numbers)
+        dense = len(self.__numbers) >= (last - first + 1) * Catalog.DENSITY
+        if dense and self.__dict is not None:
+            self.__first = first
+            self.__dense = [None] * (last - first + 1)
+            for n, info in self.__dict.items():
+                self.__dense[n - first] = info
+            self.__dict = None
+        elif not dense and self.__dict is None:
+            self.__dict = { n:self.__dense[n - self.__first] for n in self.__numbers }
+            self.__dense = []
+
+    def is_dense(self) -> bool:
+        """Returns whether the items are kept in the dense list."""
+        return self.__dict is None
+
+    def get(self, itemNumber: int, default: "ItemInfo | None" = None) -> "ItemInfo | None":
+        """Returns item info for the number or 'default'."""
+        if self.__dict is not None:
+            return self.__dict.get(itemNumber, default)
+        index = itemNumber - self.__first
+        if 0 <= index < len(self.__dense):
+            info = self.__dense[index]
+            return default if info is None else info
+        return default
+
+    def __getitem__(self, itemNumber: int) -> ItemInfo:
+        info = self.get(itemNumber)
+        if info is None:
+            raise KeyError(itemNumber)
+        return info
+
+    def __contains__(self, itemNumber: object) -> bool:
+        return isinstance(itemNumber, int) and self.get(itemNumber) is not None
+
+    def __len__(self) -> int:
+        return len(self.__numbers)
+
+    def __iter__(self) -> "Iterator[int]":
+        return iter(self.__numbers)
+
+    def get_number_at(self, index: int) -> int:
+        """Returns the item number at a position in insertion order."""
+        return self.__numbers[index]
+
+    def get_number_length(self) -> int:
+        """Returns the number of digits of the longest item number."""
+        return len(str(self.__max_number)) if self.__numbers else 0
+
+    def items(self) -> "Iterator[tuple[int, ItemInfo]]":
+        """Iterates over item numbers and infos in insertion order."""
+        for n in self.__numbers:
+            yield n, self[n]
+
+    def values(self) -> "Iterator[ItemInfo]":
+        """Iterates over item infos in insertion order."""
+        for n in self.__numbers:
+            yield self[n]
+
+def load_catalog(path: str) -> Catalog:
+    """Reads a catalog file (see read_catalog)."""
+    return Catalog((n, ItemInfo(price, stock, Item(name))) for n, name, price, stock in read_catalog(path))
@@ -0,0 +1,168 @@
+import abc
+import collections
+import functools
+import math
+import threading
+
+class ChangeEngine(abc.ABC):
+    """Base class for change-making algorithms. Engines only compute the
+    change, they never modify the coins they are given."""
+    @abc.abstractmethod
+    def make_change(self, amount: int, denominations: "tuple[int, ...]", available: "list[int]") -> "list[int] | None":
+        """Returns counts of coins (indexed like 'denominations', which are
+        sorted in ascending order) that add up to 'amount' using at most
+        'available' coins of each denomination. Returns None if the amount
+        can't be paid."""
+
+def greedy_change(amount: int, denominations: "tuple[int, ...]", available: "list[int]") -> "tuple[list[int], int, bool]":
+    """Takes the largest coins first. Returns coin counts, amount left
+    unpaid and whether the supply of any denomination limited the result."""
+    change = [0] * len(denominations)
+    limited = False
+    for i in range(len(denominations) - 1, -1, -1):
+        required = amount // denominations[i]
+        if required > available[i]:
+            required = available[i]
+            limited = True
+        change[i] = required
+        amount -= required * denominations[i]
+    return change, amount, limited
+
+@functools.lru_cache(maxsize=None)
+def is_greedy_canonical(denominations: "tuple[int, ...]") -> bool:
+    """Checks whether greedy change-making is optimal for the coin system
+    when the supply of coins is unlimited. Uses the Kozen-Zaks bound: the
+    smallest counterexample, if any, is lower than the sum of the two
+    largest denominations. Systems without a 1gr coin are checked in units
+    of their greatest common divisor (only its multiples can be paid)."""
+    if len(denominations) == 0:
+        return False
+    unit = functools.reduce(math.gcd, denominations)
+    if unit > 1:
+        return is_greedy_canonical(tuple(v // unit for v in denominations))
+    if denominations[0] != 1:
+        return False
+    if len(denominations) < 3:
+        return True
+    limit = denominations[-1] + denominations[-2]
+    #minimal coin counts for every amount below the limit
+    best = [0] * limit
+    for a in range(1, limit):
+        best[a] = 1 + min(best[a - v] for v in denominations if v <= a)
+    for a in range(denominations[2] + 1, limit):
+        change, _, _ = greedy_change(a, denominations, [a] * len(denominations))
+        if sum(change) > best[a]:
+            return False
+    return True
+
+class GreedyChangeEngine(ChangeEngine):
+    """Pays the largest coins first. Fast, but may fail or use more coins
+    than needed when the supply of coins is limited."""
+    def make_change(self, amount: int, denominations: "tuple[int, ...]", available: "list[int]") -> "list[int] | None":
+        change, left, _ = greedy_change(amount, denominations, available)
+        return change if left == 0 else None
+
+class OptimalChangeEngine(ChangeEngine):
+    """Finds change with the smallest number of coins using a bounded-coin
+    dynamic programming solver. Greedy is used instead when it is provably
+    optimal: the coin system is canonical and the greedy result was not
+    limited by the supply of any denomination. An engine used for a single
+    coin system can be told whether it is canonical ('greedyCanonical'), so
+    that it isn't looked up on every call and greedy isn't even tried for
+    non-canonical systems."""
+    def __init__(self, greedyCanonical: "bool | None" = None) -> None:
+        self.__greedy_canonical = greedyCanonical
+        #tables are kept between calls, one set per thread, and only grow
+        #when a larger amount is requested
+        self.__tables = threading.local()
+
+    def __reduce__(self) -> tuple:
+        #tables are only a cache, copies start with empty ones
+        return (OptimalChangeEngine, (self.__greedy_canonical, ))
+
+    def make_change(self, amount: int, denominations: "tuple[int, ...]", available: "list[int]") -> "list[int] | None":
+        if amount == 0:
+            return [0] * len(denominations)
+        canonical = self.__greedy_canonical
+        if canonical is None:
+            canonical = is_greedy_canonical(denominations)
+        if canonical:
+            change, left, limited = greedy_change(amount, denominations, available)
+            if not limited:
+                #with enough coins greedy only fails for amounts that can't
+                #be paid at all
+                return change if left == 0 else None
+        return self.__solve(amount, denominations, available)
+
+    def __get_tables(self, amount: int, denominationCount: int) -> "tuple[list[int], list[int], list[list[int]]]":
+        """Returns tables of the current thread that can hold all amounts up
+        to 'amount': two rows of coin counts and a row of taken coins for
+        each denomination."""
+        tables = self.__tables
+        size = amount + 1
+        if not hasattr(tables, 'take'):
+            tables.best, tables.next, tables.take = [], [], []
+        if len(tables.best) < size:
+            tables.best = [0] * size
+            tables.next = [0] * size
+            tables.take = [row + [0] * (size - len(row)) for row in tables.take]
+        while len(tables.take) < denominationCount:
+            tables.take.append([0] * len(tables.best))
+        return tables.best, tables.next, tables.take
+
+    def __solve(self, amount: int, denominations: "tuple[int, ...]", available: "list[int]") -> "list[int] | None":
+        """Bounded-coin change-making. For every denomination the minimum over
+        the allowed coin counts is computed with a monotone queue per residue
+        class, so the cost is O(amount * number of denominations)."""
+        best, nxt, takeRows = self.__get_tables(amount, len(denominations))
+        unreachable = amount + 1
+        best[0] = 0
+        for a in range(1, amount + 1):
+            best[a] = unreachable
+        used = [False] * len(denominations)
+        for i, v in enumerate(denominations):
+            limit = available[i]
+            if limit == 0 or v > amount:
+                continue
+            used[i] = True
+            take = takeRows[i]
+            if limit >= amount // v:
+                #the supply can't run out, a single pass is enough
+                for a in range(0, v):
+                    nxt[a] = best[a]
+                    take[a] = 0
+                for a in range(v, amount + 1):
+                    withCoin = nxt[a - v] + 1
+                    if withCoin < best[a]:
+                        nxt[a] = withCoin
+                        take[a] = take[a - v] + 1
+                    else:
+                        nxt[a] = best[a]
+                        take[a] = 0
+                best, nxt = nxt, best
+                continue
+            for r in range(0, v):
+                window = collections.deque()
+                j = 0
+                for a in range(r, amount + 1, v):
+                    key = best[a] - j
+                    while window and best[r + window[-1] * v] - window[-1] >= key:
+                        window.pop()
+                    window.append(j)
+                    if window[0] < j - limit:
+                        window.popleft()
+                    t = window[0]
+                    nxt[a] = best[r + t * v] - t + j
+                    take[a] = j - t
+                    j += 1
+            best, nxt = nxt, best
+        if best[amount] >= unreachable:
+            return None
+        #walk back through the tables to get coin counts
+        change = [0] * len(denominations)
+        a = amount
+        for i in range(len(denominations) - 1, -1, -1):
+            if used[i]:
+                change[i] = takeRows[i][a]
+                a -= change[i] * denominations[i]
+        return change
@@ -1,21 +1,52 @@
-#allowed coin values
-coin_values = [0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5]
+from typing import Iterable
+
+#allowed coin values in grosze
+coin_values = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+#values coins can be created with: the default ones and those of every
+#denomination set in use, which automats check on their own
+known_coin_values = set(coin_values)
+
+def register_coin_values(values: "Iterable[int]") -> None:
+    """Allows creating coins of the values."""
+    known_coin_values.update(values)
 
 class InvalidCoinValueException(Exception):
     """Signals that the coin had an invalid value passed in the constructor."""
-    def __init__(self, value: float) -> None:
+    def __init__(self, value: int) -> None:
         super().__init__(f"Invalid coin value: {value}")
 
 class Coin:
-    """Represents a coin for use with Automats."""
-    def __init__(self, value: float) -> None:
-        if value in coin_values:
-            self.__value = value
-        else:
-            raise InvalidCoinValueException(value)
-    def get_value(self) -> float:
-        """Returns the value of a coin."""
+    """Represents a coin for use with Automats. Coins are immutable and there
+    is only one shared instance for each value."""
+    __slots__ = ('_Coin__value',)
+    __instances: "dict[int, Coin]" = {}
+
+    def __new__(cls, value: int) -> "Coin":
+        coin = cls.__instances.get(value)
+        if coin is None:
+            if value not in known_coin_values:
+                raise InvalidCoinValueException(value)
+            coin = super().__new__(cls)
+            object.__setattr__(coin, '_Coin__value', value)
+            cls.__instances[value] = coin
+        return coin
+    def get_value(self) -> int:
+        """Returns the value of a coin in grosze."""
         return self.__value
     def __eq__(self, other: object) -> bool:
         """Compares coin values."""
-        return isinstance(other, Coin) and self.__value == other._Coin__value
\ No newline at end of file
+        return isinstance(other, Coin) and self.__value == other._Coin__value
+    def __hash__(self) -> int:
+        return hash(self.__value)
+    def __repr__(self) -> str:
+        return f"Coin({self.__value})"
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Coin is immutable")
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Coin is immutable")
+    def __copy__(self) -> "Coin":
+        return self
+    def __deepcopy__(self, memo: dict) -> "Coin":
+        return self
+    def __reduce__(self) -> tuple:
+        return (Coin, (self.__value,))
@@ -0,0 +1,114 @@
+from typing import MutableSequence
+from .coin import *
+
+class InvalidCoinAmountException(Exception):
+    """Raised when a negative amount of coins is added or removed."""
+    def __init__(self, amount: int) -> None:
+        super().__init__(f"Incorrect amount of coins: {amount}")
+
+class NotEnoughCoinsException(Exception):
+    """Raised when more coins of a denomination are removed than stored."""
+    def __init__(self, value: int, required: int, available: int) -> None:
+        super().__init__(f"Not enough {value}gr coins (required: {required}, available: {available})")
+
+class CoinStore:
+    """Keeps the amount of coins of each denomination. Coins are stored as
+    counts in a list indexed by denomination, so the memory used does not
+    depend on how many coins are stored. Another mutable sequence of
+    integers can be passed as 'counts' to keep the counts in, e.g. a view of
+    shared memory; it is used as it is and 'amountOfEach' is ignored."""
+    def __init__(self, denominations: "list[int]" = coin_values, amountOfEach: int = 0, counts: "MutableSequence[int] | None" = None) -> None:
+        if amountOfEach < 0:
+            raise InvalidCoinAmountException(amountOfEach)
+        self.__denominations = tuple(sorted(denominations))
+        self.__indices = { v:i for i, v in enumerate(self.__denominations) }
+        self.__counts = [amountOfEach] * len(self.__denominations) if counts is None else counts
+
+    def __index(self, value: int) -> int:
+        """Returns index of the denomination or raises an exception if the
+        value is not a valid denomination."""
+        try:
+            return self.__indices[value]
+        except KeyError:
+            raise InvalidCoinValueException(value)
+
+    def get_denominations(self) -> "tuple[int, ...]":
+        """Returns stored denominations in ascending order."""
+        return self.__denominations
+
+    def get_count(self, value: int) -> int:
+        """Returns how many coins of the given value are stored."""
+        return self.__counts[self.__index(value)]
+
+    def get_counts(self) -> "list[int]":
+        """Returns a copy of coin counts indexed like get_denominations."""
+        return list(self.__counts)
+
+    def get_value(self) -> int:
+        """Returns value of all stored coins in grosze."""
+        return sum(v * n for v, n in zip(self.__denominations, self.__counts))
+
+    def clear(self) -> None:
+        """Removes all coins."""
+        for i in range(0, len(self.__counts)):
+            self.__counts[i] = 0
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Adds 'count' coins of the given value."""
+        if count < 0:
+            raise InvalidCoinAmountException(count)
+        self.__counts[self.__index(value)] += count
+
+    def remove(self, value: int, count: int = 1) -> None:
+        """Removes 'count' coins of the given value."""
+        if count < 0:
+            raise InvalidCoinAmountException(count)
+        i = self.__index(value)
+        if self.__counts[i] < count:
+            raise NotEnoughCoinsException(value, count, self.__counts[i])
+        self.__counts[i] -= count
+
+    def add_counts(self, counts: "list[int]") -> None:
+        """Adds coins in bulk. 'counts' is indexed like get_denominations."""
+        for n in counts:
+            if n < 0:
+                raise InvalidCoinAmountException(n)
+        for i, n in enumerate(counts):
+            self.__counts[i] += n
+
+    def remove_counts(self, counts: "list[int]") -> None:
+        """Removes coins in bulk. 'counts' is indexed like get_denominations.
+        Nothing is removed if any of the denominations is short."""
+        for i, n in enumerate(counts):
+            if n < 0:
+                raise InvalidCoinAmountException(n)
+            if self.__counts[i] < n:
+                raise NotEnoughCoinsException(self.__denominations[i], n, self.__counts[i])
+        for i, n in enumerate(counts):
+            self.__counts[i] -= n
+
+    def exchange(self, addCounts: "list[int]", removeCounts: "list[int]") -> bool:
+        """Adds and removes coins in bulk in one step. Returns False and
+        changes nothing if the store would be short of any denomination."""
+        for i, n in enumerate(removeCounts):
+            if self.__counts[i] + addCounts[i] < n:
+                return False
+        for i, n in enumerate(addCounts):
+            self.__counts[i] += n - removeCounts[i]
+        return True
+
+    def count_coins(self, coins: "list[Coin]") -> "list[int]":
+        """Returns counts of the coins in a list indexed like
+        get_denominations."""
+        counts = [0] * len(self.__denominations)
+        for c in coins:
+            counts[self.__index(c.get_value())] += 1
+        return counts
+
+    def make_coins(self, counts: "list[int]") -> "list[Coin]":
+        """Returns a list of coins matching the counts, largest coins first."""
+        coins = []
+        for i in range(len(self.__denominations) - 1, -1, -1):
+            if counts[i] > 0:
+                coins += [Coin(self.__denominations[i]) for _ in range(0, counts[i])]
+        return coins
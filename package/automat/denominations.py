@@ -0,0 +1,78 @@
+import functools
+import math
+from typing import Iterable
+from .coin import *
+from .change import *
+
+class InvalidDenominationsException(Exception):
+    """Raised when a set of coin values can't be used by an automat."""
+    def __init__(self, values: "tuple[int, ...]") -> None:
+        super().__init__(f"Invalid denominations: {values}")
+
+class DenominationSet:
+    """Coin values an automat accepts, sorted in ascending order. Everything
+    that only depends on the coin system is worked out once here: whether
+    greedy change is optimal for it, the change engine suited for it and the
+    unit all amounts it can pay are multiples of. Use DenominationSet.get
+    to share one instance per coin system."""
+    __instances: "dict[tuple[int, ...], DenominationSet]" = {}
+
+    def __init__(self, values: "tuple[int, ...]") -> None:
+        if len(values) == 0 or len(set(values)) != len(values) or any(not isinstance(v, int) or v <= 0 for v in values):
+            raise InvalidDenominationsException(values)
+        self.__values = tuple(sorted(values))
+        self.__indices = { v:i for i, v in enumerate(self.__values) }
+        self.__unit = functools.reduce(math.gcd, self.__values)
+        self.__greedy_canonical = is_greedy_canonical(self.__values)
+        self.__change_engine = OptimalChangeEngine(self.__greedy_canonical)
+        self.__top_up_mask = sum(1 << a for a in range(0, self.__values[-1], self.__unit))
+        register_coin_values(self.__values)
+
+    @classmethod
+    def get(cls, values: "Iterable[int]") -> "DenominationSet":
+        """Returns the shared instance for the coin values."""
+        key = tuple(sorted(values))
+        instance = cls.__instances.get(key)
+        if instance is None:
+            instance = cls.__instances.setdefault(key, cls(key))
+        return instance
+
+    def __contains__(self, value: int) -> bool:
+        return value in self.__indices
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def __repr__(self) -> str:
+        return f"DenominationSet({self.__values})"
+
+    def get_values(self) -> "tuple[int, ...]":
+        """Returns the coin values in ascending order."""
+        return self.__values
+
+    def get_index(self, value: int) -> int:
+        """Returns index of the value in get_values. Raises
+        InvalidCoinValueException for values not in the set."""
+        try:
+            return self.__indices[value]
+        except KeyError:
+            raise InvalidCoinValueException(value)
+
+    def get_unit(self) -> int:
+        """Returns the greatest common divisor of the values, amounts that
+        aren't its multiples can't be paid."""
+        return self.__unit
+
+    def get_top_up_mask(self) -> int:
+        """Returns a bitset of the payable amounts below the largest coin,
+        i.e. the overpayments change may be needed for."""
+        return self.__top_up_mask
+
+    def is_greedy_canonical(self) -> bool:
+        """Returns whether greedy change is optimal for the coin system."""
+        return self.__greedy_canonical
+
+    def get_change_engine(self) -> OptimalChangeEngine:
+        """Returns the change engine for the coin system. It is shared by all
+        automats using the set, and so are its tables."""
+        return self.__change_engine
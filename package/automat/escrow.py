@@ -0,0 +1,41 @@
+from .coin_store import *
+
+class Escrow:
+    """Holds coins inserted by a customer until they are used to pay for an
+    item or returned. Keeps a running total and per-denomination counts so
+    reading the credit doesn't walk the list of coins."""
+    def __init__(self, denominations: "tuple[int, ...]" = tuple(coin_values)) -> None:
+        self.__counts = CoinStore(denominations)
+        self.__coins: "list[Coin]" = []
+        self.__value = 0
+
+    def insert(self, coin: Coin) -> None:
+        """Adds an inserted coin."""
+        value = coin.get_value()
+        self.__counts.add(value)
+        self.__coins.append(coin)
+        self.__value += value
+
+    def get_value(self) -> int:
+        """Returns value of the inserted coins in grosze."""
+        return self.__value
+
+    def get_counts(self) -> "list[int]":
+        """Returns counts of the inserted coins indexed by denomination."""
+        return self.__counts.get_counts()
+
+    def get_coins(self) -> "list[Coin]":
+        """Returns the inserted coins in insertion order."""
+        return self.__coins
+
+    def take_coins(self) -> "list[Coin]":
+        """Empties the escrow and hands over the list of inserted coins."""
+        coins = self.__coins
+        self.clear()
+        return coins
+
+    def clear(self) -> None:
+        """Empties the escrow, e.g. after the coins went into the float."""
+        self.__counts.clear()
+        self.__coins = []
+        self.__value = 0
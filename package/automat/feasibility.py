@@ -0,0 +1,59 @@
+def add_reachable(bits: int, value: int, count: int, mask: int) -> int:
+    """Returns the set of amounts reachable after adding 'count' coins of
+    'value' to coins reaching amounts in 'bits' (bit n set means n grosze
+    can be paid). Coins are added in groups of 1, 2, 4... so only
+    O(log count) shifts are needed."""
+    group = 1
+    while count > 0 and bits != mask:
+        group = min(group, count)
+        bits = (bits | (bits << (value * group))) & mask
+        count -= group
+        group *= 2
+    return bits
+
+class ChangeFeasibilityIndex:
+    """Keeps a bitset of amounts that can be paid with the automat's coins.
+    Bitsets are kept in layers: layer i holds amounts reachable with
+    denominations 0..i, so a change in denomination i only recomputes layers
+    from i upwards. Only amounts up to 'maxAmount' are tracked."""
+    def __init__(self, denominations: "tuple[int, ...]", counts: "list[int]", maxAmount: int = 10000) -> None:
+        self.__denominations = denominations
+        self.__max_amount = maxAmount
+        self.__mask = (1 << (maxAmount + 1)) - 1
+        self.__counts = [0] * len(denominations)
+        self.__layers = [1] * len(denominations)
+        self.__rebuild(0, counts)
+
+    def __rebuild(self, start: int, counts: "list[int]") -> None:
+        """Recomputes layers starting with layer 'start'."""
+        bits = self.__layers[start - 1] if start > 0 else 1
+        for i in range(start, len(self.__denominations)):
+            bits = add_reachable(bits, self.__denominations[i], counts[i], self.__mask)
+            self.__layers[i] = bits
+            self.__counts[i] = counts[i]
+
+    def get_max_amount(self) -> int:
+        """Returns the largest amount tracked by the index."""
+        return self.__max_amount
+
+    def update(self, counts: "list[int]") -> None:
+        """Updates the index after the coin counts have changed."""
+        for i, n in enumerate(counts):
+            if n != self.__counts[i]:
+                self.__rebuild(i, counts)
+                return
+
+    def get_reachable(self, extraCounts: "list[int] | None" = None) -> int:
+        """Returns the bitset of reachable amounts, optionally with extra
+        coins (e.g. the inserted ones) on top of the indexed ones."""
+        bits = self.__layers[-1] if self.__layers else 1
+        if extraCounts is not None:
+            for v, n in zip(self.__denominations, extraCounts):
+                if n > 0:
+                    bits = add_reachable(bits, v, n, self.__mask)
+        return bits
+
+    def is_reachable(self, amount: int, extraCounts: "list[int] | None" = None) -> bool:
+        """Checks whether 'amount' (not larger than get_max_amount) can be
+        paid."""
+        return (self.get_reachable(extraCounts) >> amount) & 1 == 1
@@ -1,22 +1,42 @@
-import copy
+from typing import Callable
 
 class Item:
-    """Represents an item for use with Automats"""
+    """Represents an item for use with Automats. Items are immutable, so
+    a single instance can be handed out for every sold copy."""
+    __slots__ = ('_Item__itemName',)
+
     def __init__(self, name: str) -> None:
-        self.__itemName = name
+        object.__setattr__(self, '_Item__itemName', name)
     def get_name(self) -> str:
         """Returns item's name."""
         return self.__itemName
+    def __eq__(self, other: object) -> bool:
+        """Compares item names."""
+        return isinstance(other, Item) and self.__itemName == other._Item__itemName
+    def __hash__(self) -> int:
+        return hash(self.__itemName)
+    def __repr__(self) -> str:
+        return f"Item({self.__itemName!r})"
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Item is immutable")
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Item is immutable")
+    def __copy__(self) -> "Item":
+        return self
+    def __deepcopy__(self, memo: dict) -> "Item":
+        return self
+    def __reduce__(self) -> tuple:
+        return (Item, (self.__itemName,))
 
 class InvalidItemAmountException(Exception):
     """Raised when item amount is less than zero."""
-    def __init__(self, amount: float) -> None:
+    def __init__(self, amount: int) -> None:
         super().__init__(f"Incorrect amount of items: {amount}")
 
 class InvalidItemPriceException(Exception):
     """Raised when item price is less than 1gr."""
-    def __init__(self, price: float) -> None:
-        super().__init__(f"Incorrect item price: {price}")
+    def __init__(self, price: int) -> None:
+        super().__init__(f"Incorrect item price: {price}gr")
 
 class NoItemsLeftException(Exception):
     """Raised when there are no item copies left."""
@@ -25,36 +45,66 @@ class NoItemsLeftException(Exception):
 
 class ItemInfo:
     """Contains information about an item: its price, amount and class instance."""
-    def __init__(self, price: float, amount: int, item: Item) -> None:
+    __slots__ = ('_ItemInfo__amount', '_ItemInfo__price', '_ItemInfo__item', '_ItemInfo__listener')
+
+    def __init__(self, price: int, amount: int, item: Item) -> None:
+        self.__listener: "Callable[[ItemInfo, int, int], None] | None" = None
+        self.__amount = 0
+        self.__price = 0
         self.set_amount(amount)
         self.set_price(price)
         self.__item = item   
+    def set_listener(self, listener: "Callable[[ItemInfo, int, int], None] | None") -> None:
+        """Sets a function called with the item info, old price and old
+        amount after the price or the amount changes."""
+        self.__listener = listener
+    def get_listener(self) -> "Callable[[ItemInfo, int, int], None] | None":
+        """Returns the function set with set_listener."""
+        return self.__listener
     def set_amount(self, amount: int) -> None:
         """Sets how many copies of this items are left."""
         if amount < 0:
             raise InvalidItemAmountException(amount)
         else:
+            oldAmount = self.__amount
             self.__amount = amount
-    def set_price(self, price: float) -> None:
-        """Sets price for this item."""
-        if price < 0.01:
+            if self.__listener is not None:
+                self.__listener(self, self.__price, oldAmount)
+    def set_price(self, price: int) -> None:
+        """Sets price for this item in grosze."""
+        if price < 1:
             raise InvalidItemPriceException(price)
         else:
+            oldPrice = self.__price
             self.__price = price  
+            if self.__listener is not None:
+                self.__listener(self, oldPrice, self.get_amount())
     def fetch_item(self) -> Item:
-        """Decremets item counter and returns a copy of the item instance.
-        Raises NoItemsLeftException when the amount of items is 0."""
-        if self.__amount == 0:
+        """Decremets item counter and returns the item instance, which is
+        shared since items are immutable. Raises NoItemsLeftException when
+        the amount of items is 0."""
+        item = self.try_fetch_item()
+        if item is None:
             raise NoItemsLeftException()
-        else:
-            self.set_amount(self.__amount - 1)
-            return copy.deepcopy(self.__item)
+        return item
+    def try_fetch_item(self) -> "Item | None":
+        """Decremets item counter and returns the item instance, or returns
+        None when the amount of items is 0."""
+        if self.__amount == 0:
+            return None
+        self.__amount -= 1
+        if self.__listener is not None:
+            self.__listener(self, self.__price, self.__amount + 1)
+        return self.__item
+    def get_item(self) -> Item:
+        """Returns the item instance without changing the amount."""
+        return self.__item
     def get_amount(self) -> int:
         """Returns the current amount of items."""
         return self.__amount
     def get_name(self) -> str:
         """Returns item name."""
         return self.__item.get_name()
-    def get_price(self) -> float:
-        """Returns item price."""
+    def get_price(self) -> int:
+        """Returns item price in grosze."""
         return self.__price
\ No newline at end of file
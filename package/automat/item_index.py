@@ -0,0 +1,72 @@
+import bisect
+import contextlib
+import functools
+import threading
+from .catalog import *
+
+class ItemIndex:
+    """Secondary indexes over a catalog: items sorted by price and in-stock
+    items sorted by price. The indexes are kept up to date by listeners set
+    on every item info, so price and stock changes are reflected at once.
+    Entries are (price, item number) pairs kept in sorted lists, updates
+    find their place with a binary search and queries return a slice."""
+    def __init__(self, catalog: Catalog, threadSafe: bool = False) -> None:
+        self.__catalog = catalog
+        self.__lock = threading.Lock() if threadSafe else contextlib.nullcontext()
+        self.rebuild()
+        for n, info in catalog.items():
+            info.set_listener(functools.partial(self.__on_change, n))
+
+    def rebuild(self) -> None:
+        """Builds the indexes from scratch, e.g. after items were changed in
+        a way the listeners didn't see."""
+        catalog = self.__catalog
+        byPrice = sorted((info.get_price(), n) for n, info in catalog.items())
+        inStock = [(p, n) for p, n in byPrice if catalog[n].get_amount() > 0]
+        with self.__lock:
+            self.__by_price = byPrice
+            self.__in_stock = inStock
+            self.__in_stock_numbers = { n for _, n in inStock }
+
+    def __on_change(self, itemNumber: int, info: ItemInfo, oldPrice: int, oldAmount: int) -> None:
+        """Moves the item in the indexes after its price or amount changed."""
+        price = info.get_price()
+        isInStock = info.get_amount() > 0
+        old = (oldPrice, itemNumber)
+        new = (price, itemNumber)
+        with self.__lock:
+            #the index, not 'oldAmount', says where the item is, amounts kept
+            #in shared memory may have changed without a listener call
+            wasInStock = itemNumber in self.__in_stock_numbers
+            if price == oldPrice and wasInStock == isInStock:
+                return
+            if price != oldPrice:
+                del self.__by_price[bisect.bisect_left(self.__by_price, old)]
+                bisect.insort(self.__by_price, new)
+            if wasInStock:
+                del self.__in_stock[bisect.bisect_left(self.__in_stock, old)]
+                self.__in_stock_numbers.discard(itemNumber)
+            if isInStock:
+                bisect.insort(self.__in_stock, new)
+                self.__in_stock_numbers.add(itemNumber)
+
+    def get_by_price(self, low: int, high: int) -> "list[int]":
+        """Returns numbers of items priced from 'low' to 'high' grosze
+        inclusive, cheapest first."""
+        with self.__lock:
+            start = bisect.bisect_left(self.__by_price, (low, ))
+            end = bisect.bisect_left(self.__by_price, (high + 1, ))
+            return [n for _, n in self.__by_price[start:end]]
+
+    def get_in_stock(self, maxPrice: "int | None" = None) -> "list[int]":
+        """Returns numbers of items in stock, cheapest first. Only items
+        priced up to 'maxPrice' grosze are returned if it is given."""
+        with self.__lock:
+            if maxPrice is None:
+                return [n for _, n in self.__in_stock]
+            end = bisect.bisect_left(self.__in_stock, (maxPrice + 1, ))
+            return [n for _, n in self.__in_stock[:end]]
+
+    def is_in_stock(self, itemNumber: int) -> bool:
+        """Returns whether the item has copies left."""
+        return itemNumber in self.__in_stock_numbers
@@ -0,0 +1,270 @@
+import contextlib
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Iterator
+from .state import *
+
+#event types
+EVENT_INSERT = 1 #coin inserted in the default session
+EVENT_REFUND = 2 #coins of the default session returned
+EVENT_SALE = 3 #item sold, coins in and change out
+EVENT_ADD_COINS = 4 #coins added to the float
+EVENT_RESTOCK = 5 #amount of an item set
+EVENT_NO_CHANGE = 6 #purchase refused for lack of change, state not changed
+
+JOURNAL_FILE = 'journal.bin'
+SNAPSHOT_FILE = 'snapshot.bin'
+JOURNAL_MAGIC = b'AUTJ0001'
+SNAPSHOT_MAGIC = b'AUTS0001'
+
+class CorruptSnapshotException(Exception):
+    """Raised when a snapshot file can't be read."""
+    def __init__(self, path: str) -> None:
+        super().__init__(f"Corrupt snapshot: {path}")
+
+class JournalMismatchException(Exception):
+    """Raised when a journal was written for another set of denominations."""
+    def __init__(self, path: str) -> None:
+        super().__init__(f"Journal does not match the automat: {path}")
+
+def record_struct(denominations: "tuple[int, ...]") -> struct.Struct:
+    """Returns the fixed-size record layout for the denominations: event
+    type, flags, sequence number, item number, value, coins in and coins out
+    per denomination. A CRC32 of the record follows it."""
+    return struct.Struct(f'<BBxxQii{2 * len(denominations)}I')
+
+def header_bytes(magic: bytes, denominations: "tuple[int, ...]") -> bytes:
+    """Returns the file header describing the denominations."""
+    return magic + struct.pack(f'<I{len(denominations)}I', len(denominations), *denominations)
+
+class Journal:
+    """Append-only journal of automat events. Events are fixed-size binary
+    records, synced to disk every 'syncEvery' records. Every 'snapshotEvery'
+    records a snapshot of the whole state is written and the journal is
+    emptied, so replaying on start only has to read the tail written since
+    the last snapshot.
+
+    'lock' must be held around each state change together with recording it
+    (Automat does that) and events are recorded once the change is done, so
+    snapshots always match the journal."""
+    def __init__(self, directory: str, denominations: "tuple[int, ...]", sequence: int = 0, syncEvery: int = 64, snapshotEvery: int = 10000) -> None:
+        self.lock = threading.Lock()
+        self.__directory = directory
+        self.__denominations = tuple(denominations)
+        self.__record = record_struct(self.__denominations)
+        self.__sequence = sequence
+        self.__sync_every = syncEvery
+        self.__snapshot_every = snapshotEvery
+        self.__unsynced = 0
+        self.__since_snapshot = 0
+        self.__batches = 0
+        self.__state_source = None
+        os.makedirs(directory, exist_ok=True)
+        self.__path = os.path.join(directory, JOURNAL_FILE)
+        self.__file = open(self.__path, 'ab')
+        if self.__file.tell() == 0:
+            self.__file.write(header_bytes(JOURNAL_MAGIC, self.__denominations))
+
+    def set_state_source(self, source) -> None:
+        """Sets a callable returning the current AutomatState, used for
+        periodic snapshots. It is called with 'lock' held."""
+        self.__state_source = source
+
+    def get_sequence(self) -> int:
+        """Returns the sequence number of the last recorded event."""
+        return self.__sequence
+
+    def __append(self, event: int, flags: int = 0, item: int = 0, value: int = 0, coinsIn: "list[int] | None" = None, coinsOut: "list[int] | None" = None) -> None:
+        """Writes one record. Must be called with 'lock' held."""
+        zeros = [0] * len(self.__denominations)
+        self.__sequence += 1
+        data = self.__record.pack(event, flags, self.__sequence, item, value, *(coinsIn or zeros), *(coinsOut or zeros))
+        self.__file.write(data + struct.pack('<I', zlib.crc32(data)))
+        self.__unsynced += 1
+        self.__since_snapshot += 1
+        if self.__unsynced >= self.__sync_every:
+            self.sync()
+        if self.__batches == 0:
+            self.__snapshot_if_due()
+
+    def __snapshot_if_due(self) -> None:
+        if self.__since_snapshot >= self.__snapshot_every and self.__state_source is not None:
+            self.write_snapshot(self.__state_source())
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Holds back the periodic snapshot until the end of the block, for
+        state changes recorded as several events: a snapshot taken between
+        them would include the whole change and the events after it would
+        be replayed again. Must be used with 'lock' held."""
+        self.__batches += 1
+        try:
+            yield
+        finally:
+            self.__batches -= 1
+        if self.__batches == 0:
+            self.__snapshot_if_due()
+
+    def record_insert(self, value: int) -> None:
+        """Records a coin inserted in the default session."""
+        self.__append(EVENT_INSERT, value=value)
+
+    def record_refund(self) -> None:
+        """Records that coins of the default session were returned."""
+        self.__append(EVENT_REFUND)
+
+    def record_sale(self, itemNumber: int, coinsIn: "list[int]", change: "list[int]", defaultSession: bool) -> None:
+        """Records a sale. 'coinsIn' are the coins paid into the float and
+        'change' the coins given out. For the default session its inserted
+        coins are cleared on replay."""
+        self.__append(EVENT_SALE, 1 if defaultSession else 0, itemNumber, 0, coinsIn, change)
+
+    def record_no_change(self, itemNumber: int, price: int, coinsIn: "list[int]") -> None:
+        """Records a purchase refused because change couldn't be given.
+        Nothing is replayed, it is kept for sales_from_journal."""
+        self.__append(EVENT_NO_CHANGE, item=itemNumber, value=price, coinsIn=coinsIn)
+
+    def record_add_coins(self, counts: "list[int]") -> None:
+        """Records coins added to the float."""
+        self.__append(EVENT_ADD_COINS, coinsIn=counts)
+
+    def record_restock(self, itemNumber: int, amount: int) -> None:
+        """Records the new amount of an item."""
+        self.__append(EVENT_RESTOCK, item=itemNumber, value=amount)
+
+    def sync(self) -> None:
+        """Flushes recorded events to disk."""
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__unsynced = 0
+
+    def write_snapshot(self, state: AutomatState) -> None:
+        """Saves the state as of the last recorded event and empties the
+        journal. Must be called with 'lock' held."""
+        self.sync()
+        save_snapshot(self.__directory, state, self.__sequence)
+        #the snapshot is in place, records up to it are not needed anymore
+        self.__file.close()
+        self.__file = open(self.__path, 'wb')
+        self.__file.write(header_bytes(JOURNAL_MAGIC, self.__denominations))
+        self.sync()
+        self.__since_snapshot = 0
+
+    def close(self) -> None:
+        """Syncs and closes the journal."""
+        with self.lock:
+            self.sync()
+            self.__file.close()
+
+def save_snapshot(directory: str, state: AutomatState, sequence: int) -> None:
+    """Writes a compact binary snapshot atomically (write, sync, rename)."""
+    parts = [header_bytes(SNAPSHOT_MAGIC, state.denominations)]
+    parts.append(struct.pack('<Q', sequence))
+    parts.append(struct.pack(f'<{len(state.coinCounts)}I', *state.coinCounts))
+    parts.append(struct.pack(f'<I{len(state.insertedCoins)}I', len(state.insertedCoins), *state.insertedCoins))
+    parts.append(struct.pack('<I', len(state.items)))
+    for number, name, price, amount in state.items:
+        encoded = name.encode('utf-8')
+        parts.append(struct.pack('<iiiH', number, price, amount, len(encoded)))
+        parts.append(encoded)
+    data = b''.join(parts)
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+        f.write(struct.pack('<I', zlib.crc32(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+
+def load_snapshot(directory: str) -> "tuple[AutomatState, int] | None":
+    """Reads the snapshot. Returns the state and the sequence number of the
+    last event it includes, or None if there is no snapshot."""
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 4 or zlib.crc32(data[:-4]) != struct.unpack_from('<I', data, len(data) - 4)[0] or not data.startswith(SNAPSHOT_MAGIC):
+        raise CorruptSnapshotException(path)
+    offset = len(SNAPSHOT_MAGIC)
+    count, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    denominations = struct.unpack_from(f'<{count}I', data, offset)
+    offset += 4 * count
+    sequence, = struct.unpack_from('<Q', data, offset)
+    offset += 8
+    coinCounts = list(struct.unpack_from(f'<{count}I', data, offset))
+    offset += 4 * count
+    insertedCount, = struct.unpack_from('<I', data, offset)
+    insertedCoins = list(struct.unpack_from(f'<{insertedCount}I', data, offset + 4))
+    offset += 4 + 4 * insertedCount
+    itemCount, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    items = []
+    for _ in range(0, itemCount):
+        number, price, amount, length = struct.unpack_from('<iiiH', data, offset)
+        offset += 14
+        items.append((number, data[offset:offset + length].decode('utf-8'), price, amount))
+        offset += length
+    return AutomatState(tuple(denominations), coinCounts, insertedCoins, items), sequence
+
+def read_records(directory: str, denominations: "tuple[int, ...]") -> "Iterator[tuple[int, int, int, int, int, tuple[int, ...], tuple[int, ...]]]":
+    """Yields event type, flags, sequence number, item number, value, coins
+    in and coins out of every journal record. The journal is read through a
+    memory map and reading stops at the first incomplete or damaged record
+    (e.g. torn by a crash)."""
+    path = os.path.join(directory, JOURNAL_FILE)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    header = header_bytes(JOURNAL_MAGIC, denominations)
+    record = record_struct(denominations)
+    size = record.size + 4
+    count = len(denominations)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:len(header)] != header:
+            raise JournalMismatchException(path)
+        for offset in range(len(header), len(data) - size + 1, size):
+            if zlib.crc32(data[offset:offset + record.size]) != struct.unpack_from('<I', data, offset + record.size)[0]:
+                break
+            fields = record.unpack_from(data, offset)
+            yield fields[0], fields[1], fields[2], fields[3], fields[4], fields[5:5 + count], fields[5 + count:]
+
+def replay_journal(directory: str, state: AutomatState, sequence: int) -> int:
+    """Applies journal records newer than 'sequence' to the state in place
+    (see read_records). Returns the sequence number of the last applied
+    record."""
+    count = len(state.denominations)
+    items = { n:i for i, (n, _, _, _) in enumerate(state.items) }
+    for event, flags, seq, item, value, coinsIn, coinsOut in read_records(directory, state.denominations):
+        if seq <= sequence:
+            continue
+        if event == EVENT_INSERT:
+            state.insertedCoins.append(value)
+        elif event == EVENT_REFUND:
+            state.insertedCoins.clear()
+        elif event == EVENT_SALE or event == EVENT_ADD_COINS:
+            for i in range(0, count):
+                state.coinCounts[i] += coinsIn[i] - coinsOut[i]
+            if event == EVENT_SALE:
+                number, name, price, amount = state.items[items[item]]
+                state.items[items[item]] = (number, name, price, amount - 1)
+                if flags == 1:
+                    state.insertedCoins.clear()
+        elif event == EVENT_RESTOCK:
+            number, name, price, amount = state.items[items[item]]
+            state.items[items[item]] = (number, name, price, value)
+        sequence = seq
+    return sequence
+
+def load_state(directory: str) -> "tuple[AutomatState, int] | None":
+    """Loads the latest snapshot and replays the journal tail on top of it.
+    Returns the state and the last sequence number, or None if nothing was
+    saved yet."""
+    loaded = load_snapshot(directory)
+    if loaded is None:
+        return None
+    state, sequence = loaded
+    return state, replay_journal(directory, state, sequence)
@@ -0,0 +1,268 @@
+import array
+import bisect
+import os
+import struct
+import threading
+import time
+from typing import Callable, Iterator
+from .result import *
+try:
+    import numpy
+except ImportError:
+    #aggregates are summed by the array module without NumPy
+    numpy = None
+
+LEDGER_MAGIC = b'AUTL0001'
+LEDGER_FILE = 'ledger-{:08d}.bin'
+
+class LedgerMismatchException(Exception):
+    """Raised when a spilled ledger chunk was written for another set of
+    denominations."""
+    def __init__(self, path: str) -> None:
+        super().__init__(f"Ledger chunk does not match the ledger: {path}")
+
+def chunk_header_struct(denominationCount: int) -> struct.Struct:
+    """Returns the header layout of a spilled chunk: number of rows, number
+    of denominations, first and last timestamp and the denominations."""
+    return struct.Struct(f'<IIdd{denominationCount}I')
+
+class LedgerChunk:
+    """Up to 'capacity' outcomes stored column by column in typed arrays
+    allocated once: timestamps, item numbers, prices, statuses and a column
+    of tendered and of change coin counts per denomination. Once spilled to
+    'path' the columns are dropped and only the time range is kept."""
+    __slots__ = ('times', 'items', 'prices', 'statuses', 'tendered', 'change', 'size', 'first', 'last', 'path')
+
+    def __init__(self, capacity: int, denominationCount: int) -> None:
+        self.times = array.array('d', [0.0]) * capacity
+        self.items = array.array('i', [0]) * capacity
+        self.prices = array.array('i', [0]) * capacity
+        self.statuses = array.array('b', [0]) * capacity
+        self.tendered = [array.array('I', [0]) * capacity for _ in range(0, denominationCount)]
+        self.change = [array.array('I', [0]) * capacity for _ in range(0, denominationCount)]
+        self.size = 0
+        self.first = 0.0
+        self.last = 0.0
+        self.path: "str | None" = None
+
+    def get_columns(self) -> "list[array.array]":
+        """Returns the columns in the order they are spilled in."""
+        return [self.times, self.items, self.prices, self.statuses, *self.tendered, *self.change]
+
+    def spill(self, path: str, denominations: "tuple[int, ...]") -> None:
+        """Writes the rows to a file and drops the columns. Columns are
+        written in native byte order."""
+        header = chunk_header_struct(len(denominations))
+        with open(path, 'wb') as f:
+            f.write(LEDGER_MAGIC + header.pack(self.size, len(denominations), self.first, self.last, *denominations))
+            for column in self.get_columns():
+                column[:self.size].tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self.path = path
+        self.times = self.items = self.prices = self.statuses = None
+        self.tendered = self.change = None
+
+    @classmethod
+    def open_spilled(cls, path: str, denominations: "tuple[int, ...]") -> "LedgerChunk":
+        """Returns a spilled chunk with its time range read from the file."""
+        header = chunk_header_struct(len(denominations))
+        with open(path, 'rb') as f:
+            data = f.read(len(LEDGER_MAGIC) + header.size)
+        if len(data) < len(LEDGER_MAGIC) + header.size or not data.startswith(LEDGER_MAGIC):
+            raise LedgerMismatchException(path)
+        size, count, first, last, *values = header.unpack_from(data, len(LEDGER_MAGIC))
+        if count != len(denominations) or tuple(values) != denominations:
+            raise LedgerMismatchException(path)
+        chunk = cls(0, 0)
+        chunk.size, chunk.first, chunk.last, chunk.path = size, first, last, path
+        return chunk
+
+    def get_view(self) -> "LedgerChunk":
+        """Returns a chunk sharing the columns and rows recorded so far, it
+        can be read after this one is spilled."""
+        view = LedgerChunk(0, 0)
+        view.times, view.items, view.prices, view.statuses = self.times, self.items, self.prices, self.statuses
+        view.tendered, view.change = self.tendered, self.change
+        view.size, view.first, view.last, view.path = self.size, self.first, self.last, self.path
+        return view
+
+    def load(self, denominationCount: int) -> "LedgerChunk":
+        """Returns an in-memory copy of a spilled chunk."""
+        header = chunk_header_struct(denominationCount)
+        loaded = LedgerChunk(0, denominationCount)
+        loaded.size, loaded.first, loaded.last = self.size, self.first, self.last
+        with open(self.path, 'rb') as f:
+            f.seek(len(LEDGER_MAGIC) + header.size)
+            for column in loaded.get_columns():
+                column.fromfile(f, self.size)
+        return loaded
+
+class SalesLedger:
+    """Outcome of every purchase attempt (time, item number, price, status
+    and for sales the tendered and change coin counts per denomination)
+    kept column by column in chunks of 'chunkSize' rows. Full chunks older
+    than 'retention' seconds are spilled to files in 'directory' and read
+    back only by queries reaching that far, or dropped without a directory;
+    'retention' None keeps everything in memory. Spilled chunks found in the
+    directory are queried too, so history survives restarts.
+
+    Aggregates sum the columns of the rows in a time window, with NumPy if
+    it is installed and 'vectorized' isn't False, and never create objects
+    per row. Times are time.time() values, windows include 'since' and
+    exclude 'until'."""
+    def __init__(self, denominations: "tuple[int, ...]", chunkSize: int = 4096, retention: "float | None" = 3600.0,
+            directory: "str | None" = None, vectorized: "bool | None" = None, clock: "Callable[[], float]" = time.time) -> None:
+        self.__denominations = tuple(denominations)
+        self.__chunk_size = chunkSize
+        self.__retention = retention
+        self.__directory = directory
+        self.__vectorized = numpy is not None if vectorized is None else vectorized and numpy is not None
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__chunks: "list[LedgerChunk]" = []
+        self.__spilled = 0
+        self.__last = 0.0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            names = sorted(n for n in os.listdir(directory) if n.startswith('ledger-') and n.endswith('.bin'))
+            for name in names:
+                self.__chunks.append(LedgerChunk.open_spilled(os.path.join(directory, name), self.__denominations))
+            if names:
+                self.__spilled = int(names[-1][len('ledger-'):-len('.bin')])
+                self.__last = self.__chunks[-1].last
+        self.__current = LedgerChunk(chunkSize, len(self.__denominations))
+        self.__chunks.append(self.__current)
+
+    def get_denominations(self) -> "tuple[int, ...]":
+        return self.__denominations
+
+    def get_count(self) -> int:
+        """Returns the number of recorded outcomes, spilled ones included."""
+        with self.__lock:
+            return sum(c.size for c in self.__chunks)
+
+    def get_spilled_count(self) -> int:
+        """Returns the number of chunks spilled to disk."""
+        with self.__lock:
+            return sum(1 for c in self.__chunks if c.path is not None)
+
+    def record(self, itemNumber: int, price: int, status: PurchaseStatus, tendered: "list[int] | None" = None, change: "list[int] | None" = None) -> None:
+        """Appends an outcome. Coin counts are indexed like the denominations
+        and only given for sales, the counts of other rows stay 0."""
+        with self.__lock:
+            chunk = self.__current
+            row = chunk.size
+            if row == self.__chunk_size:
+                chunk = self.__start_chunk()
+                row = 0
+            #time.time can go back, rows are kept sorted for the windows
+            now = self.__clock()
+            if now < self.__last:
+                now = self.__last
+            self.__last = now
+            if row == 0:
+                chunk.first = now
+            chunk.last = now
+            chunk.times[row] = now
+            chunk.items[row] = itemNumber
+            chunk.prices[row] = price
+            chunk.statuses[row] = status
+            if tendered is not None:
+                for column, n in zip(chunk.tendered, tendered):
+                    column[row] = n
+            if change is not None:
+                for column, n in zip(chunk.change, change):
+                    column[row] = n
+            chunk.size = row + 1
+
+    def __start_chunk(self) -> LedgerChunk:
+        """Starts a new chunk and spills or drops the full ones past the
+        retention window. Must be called with the lock held."""
+        if self.__retention is not None:
+            cutoff = self.__clock() - self.__retention
+            kept = []
+            for chunk in self.__chunks:
+                if chunk.path is None and chunk.last < cutoff:
+                    if self.__directory is None:
+                        continue
+                    self.__spilled += 1
+                    chunk.spill(os.path.join(self.__directory, LEDGER_FILE.format(self.__spilled)), self.__denominations)
+                kept.append(chunk)
+            self.__chunks = kept
+        self.__current = LedgerChunk(self.__chunk_size, len(self.__denominations))
+        self.__chunks.append(self.__current)
+        return self.__current
+
+    def __windows(self, since: "float | None", until: "float | None") -> "Iterator[tuple[LedgerChunk, int, int]]":
+        """Yields chunks overlapping the window with the range of their rows
+        in it. Rows are only ever appended, so the columns taken under the
+        lock can be read without it up to the size seen."""
+        with self.__lock:
+            chunks = [c.get_view() for c in self.__chunks if c.size > 0]
+        for chunk in chunks:
+            if (since is not None and chunk.last < since) or (until is not None and chunk.first >= until):
+                continue
+            size = chunk.size
+            if chunk.path is not None:
+                chunk = chunk.load(len(self.__denominations))
+            low = 0 if since is None else bisect.bisect_left(chunk.times, since, 0, size)
+            high = size if until is None else bisect.bisect_left(chunk.times, until, low, size)
+            if low < high:
+                yield chunk, low, high
+
+    def get_item_totals(self, since: "float | None" = None, until: "float | None" = None) -> "dict[int, tuple[int, int]]":
+        """Returns the number of sales and revenue (in grosze) of every item
+        sold in the window."""
+        totals: "dict[int, tuple[int, int]]" = {}
+        for chunk, low, high in self.__windows(since, until):
+            if self.__vectorized:
+                sold = numpy.frombuffer(chunk.statuses, 'b')[low:high] == PurchaseStatus.OK
+                numbers, inverse = numpy.unique(numpy.frombuffer(chunk.items, 'i')[low:high][sold], return_inverse=True)
+                counts = numpy.bincount(inverse, minlength=len(numbers))
+                revenues = numpy.bincount(inverse, numpy.frombuffer(chunk.prices, 'i')[low:high][sold], len(numbers))
+                pairs = zip(numbers.tolist(), counts.tolist(), revenues.tolist())
+            else:
+                chunkTotals: "dict[int, list[int]]" = {}
+                for n, price, status in zip(chunk.items[low:high], chunk.prices[low:high], chunk.statuses[low:high]):
+                    if status == PurchaseStatus.OK:
+                        total = chunkTotals.get(n)
+                        if total is None:
+                            chunkTotals[n] = [1, price]
+                        else:
+                            total[0] += 1
+                            total[1] += price
+                pairs = ((n, k, r) for n, (k, r) in chunkTotals.items())
+            for n, k, r in pairs:
+                count, revenue = totals.get(n, (0, 0))
+                totals[n] = (count + k, revenue + int(r))
+        return totals
+
+    def get_coin_totals(self, since: "float | None" = None, until: "float | None" = None) -> "tuple[list[int], list[int]]":
+        """Returns counts of the coins tendered and given as change in sales
+        in the window, indexed like the denominations. Denominations given
+        more often than tendered are the ones the float runs out of."""
+        tendered = [0] * len(self.__denominations)
+        change = [0] * len(self.__denominations)
+        for chunk, low, high in self.__windows(since, until):
+            for totals, columns in [(tendered, chunk.tendered), (change, chunk.change)]:
+                for i, column in enumerate(columns):
+                    if self.__vectorized:
+                        totals[i] += int(numpy.frombuffer(column, 'I')[low:high].sum(dtype=numpy.int64))
+                    else:
+                        totals[i] += sum(column[low:high])
+        return tendered, change
+
+    def get_status_counts(self, since: "float | None" = None, until: "float | None" = None) -> "dict[PurchaseStatus, int]":
+        """Returns how many purchase attempts in the window ended with each
+        status."""
+        counts = [0] * len(PurchaseStatus)
+        for chunk, low, high in self.__windows(since, until):
+            if self.__vectorized:
+                for s, k in enumerate(numpy.bincount(numpy.frombuffer(chunk.statuses, 'b')[low:high], minlength=len(counts)).tolist()):
+                    counts[s] += k
+            else:
+                statuses = chunk.statuses[low:high]
+                for s in range(0, len(counts)):
+                    counts[s] += statuses.count(s)
+        return { s:counts[s] for s in PurchaseStatus }
@@ -0,0 +1,184 @@
+import contextlib
+import functools
+import math
+import threading
+import time
+from typing import Callable
+
+class LatencyHistogram:
+    """HDR-style histogram of durations in nanoseconds. Every power of two
+    is split into SUB_BUCKETS linear buckets, so recorded values are kept
+    with a relative error below 1/SUB_BUCKETS while the bucket count only
+    grows with the logarithm of the largest value."""
+    SUB_BUCKET_BITS = 4
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+    def __init__(self) -> None:
+        self.__counts: "list[int]" = []
+        self.__count = 0
+        self.__sum = 0
+        self.__max = 0
+
+    @staticmethod
+    def get_bucket_index(value: int) -> int:
+        """Returns the bucket a value falls into."""
+        if value < 2 * LatencyHistogram.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - LatencyHistogram.SUB_BUCKET_BITS - 1
+        return shift * LatencyHistogram.SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def get_bucket_range(index: int) -> "tuple[int, int]":
+        """Returns the lowest and the highest value of a bucket."""
+        if index < 2 * LatencyHistogram.SUB_BUCKETS:
+            return index, index
+        shift = index // LatencyHistogram.SUB_BUCKETS - 1
+        low = (index % LatencyHistogram.SUB_BUCKETS + LatencyHistogram.SUB_BUCKETS) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Records a duration in nanoseconds."""
+        if value < 0:
+            value = 0
+        index = LatencyHistogram.get_bucket_index(value)
+        counts = self.__counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.__count += 1
+        self.__sum += value
+        if value > self.__max:
+            self.__max = value
+
+    def get_count(self) -> int:
+        """Returns the number of recorded values."""
+        return self.__count
+
+    def get_sum(self) -> int:
+        """Returns the sum of recorded values."""
+        return self.__sum
+
+    def get_max(self) -> int:
+        """Returns the largest recorded value."""
+        return self.__max
+
+    def get_percentile(self, percentile: float) -> int:
+        """Returns the highest value equivalent to the given percentile (0-100)
+        of recorded values, 0 when nothing was recorded."""
+        if self.__count == 0:
+            return 0
+        rank = max(1, math.ceil(self.__count * percentile / 100))
+        seen = 0
+        for index, n in enumerate(self.__counts):
+            seen += n
+            if seen >= rank:
+                return min(LatencyHistogram.get_bucket_range(index)[1], self.__max)
+        return self.__max
+
+    def get_buckets(self) -> "list[tuple[int, int]]":
+        """Returns (highest value, count) of every non-empty bucket."""
+        return [(LatencyHistogram.get_bucket_range(i)[1], n) for i, n in enumerate(self.__counts) if n > 0]
+
+    def to_dict(self) -> dict:
+        """Returns a summary of the histogram."""
+        return {
+            'count': self.__count,
+            'sum_ns': self.__sum,
+            'max_ns': self.__max,
+            'p50_ns': self.get_percentile(50),
+            'p90_ns': self.get_percentile(90),
+            'p99_ns': self.get_percentile(99),
+            'p999_ns': self.get_percentile(99.9),
+        }
+
+class Metrics:
+    """Counters of operation outcomes and latency histograms of operations.
+    Outcome is 'ok', a result description or the name of the exception
+    type raised by the operation."""
+    def __init__(self, threadSafe: bool = False) -> None:
+        self.__counters: "dict[tuple[str, str], int]" = {}
+        self.__histograms: "dict[str, LatencyHistogram]" = {}
+        self.__lock = threading.Lock() if threadSafe else contextlib.nullcontext()
+
+    def record(self, operation: str, outcome: str, duration: int) -> None:
+        """Counts an outcome of an operation that took 'duration' ns."""
+        with self.__lock:
+            key = (operation, outcome)
+            self.__counters[key] = self.__counters.get(key, 0) + 1
+            histogram = self.__histograms.get(operation)
+            if histogram is None:
+                histogram = self.__histograms[operation] = LatencyHistogram()
+            histogram.record(duration)
+
+    def get_count(self, operation: str, outcome: "str | None" = None) -> int:
+        """Returns how many times the operation ended with the outcome, or
+        how many times it was called at all."""
+        with self.__lock:
+            if outcome is not None:
+                return self.__counters.get((operation, outcome), 0)
+            return sum(n for (op, _), n in self.__counters.items() if op == operation)
+
+    def get_histogram(self, operation: str) -> "LatencyHistogram | None":
+        """Returns the latency histogram of an operation."""
+        return self.__histograms.get(operation)
+
+    def to_dict(self) -> dict:
+        """Returns counters and latency summaries of all operations."""
+        with self.__lock:
+            result = {}
+            for (operation, outcome), n in sorted(self.__counters.items()):
+                result.setdefault(operation, { 'outcomes': {} })['outcomes'][outcome] = n
+            for operation, histogram in self.__histograms.items():
+                result[operation]['latency'] = histogram.to_dict()
+            return result
+
+    def to_prometheus(self, prefix: str = 'automat') -> str:
+        """Returns the metrics in Prometheus text exposition format. Latency
+        buckets are merged at powers of two and reported in seconds."""
+        with self.__lock:
+            lines = [f'# TYPE {prefix}_operations_total counter']
+            for (operation, outcome), n in sorted(self.__counters.items()):
+                lines.append(f'{prefix}_operations_total{{operation="{operation}",outcome="{outcome}"}} {n}')
+            name = f'{prefix}_operation_duration_seconds'
+            lines.append(f'# TYPE {name} histogram')
+            for operation, histogram in sorted(self.__histograms.items()):
+                labels = f'operation="{operation}"'
+                buckets = histogram.get_buckets()
+                seen = 0
+                #start at the power of two below the lowest recorded value
+                bound = 1 << max(0, buckets[0][0].bit_length() - 1) if buckets else 1
+                for high, n in buckets:
+                    while high >= bound:
+                        lines.append(f'{name}_bucket{{{labels},le="{bound / 1e9:g}"}} {seen}')
+                        bound <<= 1
+                    seen += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound / 1e9:g}"}} {seen}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.get_count()}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram.get_sum() / 1e9:g}')
+                lines.append(f'{name}_count{{{labels}}} {histogram.get_count()}')
+            return '\n'.join(lines) + '\n'
+
+def instrument(metrics: Metrics, operation: str, func: Callable, outcome: "Callable[[object], str] | None" = None) -> Callable:
+    """Wraps a function so every call is timed and counted in 'metrics'.
+    'outcome' describes the returned value, 'ok' is counted without it."""
+    clock = time.perf_counter_ns
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            metrics.record(operation, type(e).__name__, clock() - start)
+            raise
+        metrics.record(operation, 'ok' if outcome is None else outcome(result), clock() - start)
+        return result
+    return wrapper
+
+def instrument_class(cls: type, metrics: Metrics, methods: "dict[str, tuple[str, Callable[[object], str] | None]]") -> type:
+    """Returns a subclass of 'cls' whose methods named in 'methods' are
+    wrapped with instrument. The subclass adds no attributes, so instances
+    of slotted classes can be switched to it and back by setting __class__."""
+    namespace: dict = { '__slots__': () }
+    for name, (operation, outcome) in methods.items():
+        namespace[name] = instrument(metrics, operation, getattr(cls, name), outcome)
+    return type(f'Instrumented{cls.__name__}', (cls, ), namespace)
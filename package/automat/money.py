@@ -0,0 +1,16 @@
+#all amounts of money in the automat are integer grosze (1zl = 100gr)
+GROSZE_PER_ZLOTY = 100
+
+def to_grosze(zloty: float) -> int:
+    """Converts an amount given in zloty to integer grosze."""
+    return round(zloty * GROSZE_PER_ZLOTY)
+
+def to_zloty(grosze: int) -> float:
+    """Converts an amount given in grosze to zloty. Use only for display."""
+    return grosze / GROSZE_PER_ZLOTY
+
+def format_money(grosze: int) -> str:
+    """Returns a display string of an amount in zloty, e.g. '5.20'."""
+    sign = '-' if grosze < 0 else ''
+    zl, gr = divmod(abs(grosze), GROSZE_PER_ZLOTY)
+    return f'{sign}{zl}.{gr:02d}'
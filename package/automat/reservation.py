@@ -0,0 +1,59 @@
+import threading
+import weakref
+from typing import Callable
+from .escrow import *
+from .item import *
+
+class Reservation:
+    """A unit of an item and change coins held for a customer until the
+    purchase is confirmed or cancelled, see Automat.reserve. The coins
+    inserted by the customer are held too, so they can be given back as
+    they were; change is taken from them first and only 'fromFloat' coins
+    are taken from automat's coins."""
+    __slots__ = ('id', 'itemNumber', 'item', 'price', 'escrow', 'coins', 'insertedCounts', 'change', 'fromFloat', 'deadline')
+
+    def __init__(self, id: int, itemNumber: int, item: Item, price: int, escrow: Escrow, coins: "list[Coin]", insertedCounts: "list[int]", change: "list[int]", deadline: float) -> None:
+        self.id = id
+        self.itemNumber = itemNumber
+        self.item = item
+        self.price = price
+        self.escrow = escrow
+        self.coins = coins
+        self.insertedCounts = insertedCounts
+        self.change = change
+        self.fromFloat = [max(0, c - k) for c, k in zip(change, insertedCounts)]
+        self.deadline = deadline
+
+    def get_float_income(self) -> "list[int]":
+        """Returns coins automat's coins gain on confirmation: the inserted
+        ones that weren't given back as change."""
+        return [k - (c - f) for k, c, f in zip(self.insertedCounts, self.change, self.fromFloat)]
+
+class ReservationReaper:
+    """Thread expiring stale reservations. 'expire' expires reservations
+    that are due and returns seconds until the next deadline (None if there
+    is none). It is held through a weak reference, so the thread stops once
+    its automat is gone; idle waits are capped to notice that."""
+    IDLE_WAIT = 1.0
+
+    def __init__(self, expire: "Callable[[], float | None]") -> None:
+        self.__expire = weakref.WeakMethod(expire)
+        self.__wake = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def wake(self) -> None:
+        """Makes the thread look at the deadlines again, e.g. after an
+        earlier one was added."""
+        self.__wake.set()
+
+    def __run(self) -> None:
+        while True:
+            expire = self.__expire()
+            if expire is None:
+                return
+            delay = expire()
+            #don't keep the automat alive while waiting
+            del expire
+            self.__wake.wait(min(delay, ReservationReaper.IDLE_WAIT) if delay is not None else ReservationReaper.IDLE_WAIT)
+            self.__wake.clear()
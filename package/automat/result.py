@@ -0,0 +1,49 @@
+import enum
+from typing import NamedTuple
+from .coin import *
+from .item import *
+
+class PurchaseStatus(enum.IntEnum):
+    """Outcome of a purchase attempt."""
+    OK = 0
+    NOT_ENOUGH_MONEY = 1
+    NO_ITEMS_LEFT = 2
+    EXACT_CHANGE_ONLY = 3
+    INVALID_ITEM_NUMBER = 4
+    RESERVATION_EXPIRED = 5
+    INVALID_COIN = 6
+
+class OrderResult(NamedTuple):
+    """Result of one order of a batch. 'coins' is the change when the order
+    succeeded and the tendered coins given back when it failed."""
+    status: PurchaseStatus
+    item: "Item | None"
+    coins: "list[Coin]"
+
+class PurchaseResult(NamedTuple):
+    """Result of a purchase attempt. 'provided' and 'required' are the
+    inserted amount and the item price in grosze (price is 0 for an invalid
+    item number)."""
+    status: PurchaseStatus
+    item: "Item | None"
+    change: "list[Coin]"
+    provided: int
+    required: int
+
+class ReservationResult(NamedTuple):
+    """Result of a reservation attempt. 'reservationId' is only meaningful
+    when the status is OK and the reservation is held until 'deadline'
+    (a time.monotonic value). Amounts are in grosze like in PurchaseResult."""
+    status: PurchaseStatus
+    reservationId: int
+    deadline: float
+    provided: int
+    required: int
+
+class LookupResult(NamedTuple):
+    """Result of an item lookup. Name, price and amount are only meaningful
+    when the status is OK."""
+    status: PurchaseStatus
+    name: str
+    price: int
+    amount: int
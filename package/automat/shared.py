@@ -0,0 +1,198 @@
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing import shared_memory
+from .item import *
+from .state import *
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+class FileLock:
+    """Lock shared by processes through a lock file, so processes started
+    independently of each other can use it. Threads of one process are
+    serialized by a regular lock first, the file lock only works between
+    processes."""
+    def __init__(self, path: str) -> None:
+        self.__path = path
+        self.__thread_lock = threading.Lock()
+        self.__file = None
+        self.__pid = 0
+
+    def __reduce__(self) -> tuple:
+        return (FileLock, (self.__path, ))
+
+    def get_path(self) -> str:
+        return self.__path
+
+    def acquire(self) -> None:
+        self.__thread_lock.acquire()
+        try:
+            if self.__file is None or self.__pid != os.getpid():
+                #a forked child must not share the parent's open file, the
+                #lock belongs to it
+                self.__file = open(self.__path, 'a+b')
+                self.__pid = os.getpid()
+            if os.name == 'nt':
+                self.__file.seek(0)
+                msvcrt.locking(self.__file.fileno(), msvcrt.LK_LOCK, 1)
+            else:
+                fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self.__thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        if os.name == 'nt':
+            self.__file.seek(0)
+            msvcrt.locking(self.__file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+        self.__thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+class SharedInventory:
+    """Coin counts and item stock of one machine kept in a shared memory
+    block, so several processes can serve the same machine. Values are
+    64-bit integers: a header (denomination count, item count and a counter
+    bumped on every stock change), the denominations, item numbers, coin
+    counts and stock. Writes are made under 'items_lock' (stock) and
+    'coins_lock' (coin counts), always taken in that order; reads don't
+    lock and copy nothing."""
+    HEADER = 3
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool) -> None:
+        self.__memory = memory
+        self.__owner = owner
+        self.__values = memory.buf.cast('q')
+        d, i = self.__values[0], self.__values[1]
+        start = SharedInventory.HEADER
+        self.__denominations = tuple(self.__values[start:start + d])
+        self.__item_numbers = list(self.__values[start + d:start + d + i])
+        self.__coins = self.__values[start + d + i:start + 2 * d + i]
+        self.__stock = self.__values[start + 2 * d + i:start + 2 * d + 2 * i]
+        lockPath = os.path.join(tempfile.gettempdir(), memory.name.lstrip('/'))
+        self.items_lock = FileLock(lockPath + '.items.lock')
+        self.coins_lock = FileLock(lockPath + '.coins.lock')
+
+    @classmethod
+    def create(cls, name: "str | None", denominations: "tuple[int, ...]", coinCounts: "list[int]", items: "list[tuple[int, int]]") -> "SharedInventory":
+        """Creates the shared block for the denominations and coin counts and
+        for the (item number, amount) pairs. A name is made up if 'name' is
+        None, see get_name."""
+        values = [len(denominations), len(items), 0, *denominations, *[n for n, _ in items], *coinCounts, *[amount for _, amount in items]]
+        memory = shared_memory.SharedMemory(name, create=True, size=8 * len(values))
+        view = memory.buf.cast('q')
+        for i, v in enumerate(values):
+            view[i] = v
+        view.release()
+        return cls(memory, True)
+
+    @classmethod
+    def from_state(cls, state: AutomatState, name: "str | None" = None) -> "SharedInventory":
+        """Creates the shared block with coin counts and stock of a saved
+        automat state."""
+        return cls.create(name, state.denominations, state.coinCounts, [(n, amount) for n, _, _, amount in state.items])
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedInventory":
+        """Opens a shared block created by another process."""
+        memory = shared_memory.SharedMemory(name)
+        if sys.version_info < (3, 13) and os.name != 'nt':
+            #older versions unlink the block when any attached process exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        return cls(memory, False)
+
+    def get_name(self) -> str:
+        """Returns the name other processes attach with."""
+        return self.__memory.name
+
+    def get_denominations(self) -> "tuple[int, ...]":
+        return self.__denominations
+
+    def get_item_numbers(self) -> "list[int]":
+        return self.__item_numbers
+
+    def get_coin_counts(self) -> memoryview:
+        """Returns the shared coin counts indexed like get_denominations."""
+        return self.__coins
+
+    def get_stock(self) -> memoryview:
+        """Returns the shared stock indexed like get_item_numbers."""
+        return self.__stock
+
+    def get_stock_version(self) -> int:
+        """Returns a counter that changes whenever stock changes."""
+        return self.__values[2]
+
+    def bump_stock_version(self) -> None:
+        """Marks a stock change, call with 'items_lock' held."""
+        self.__values[2] += 1
+
+    def close(self) -> None:
+        """Detaches from the block. Views returned earlier can't be used
+        after that."""
+        self.__coins.release()
+        self.__stock.release()
+        self.__values.release()
+        self.__memory.close()
+
+    def unlink(self) -> None:
+        """Removes the block once every process has closed it. Only the
+        process that created it should call this."""
+        if self.__owner:
+            if sys.version_info < (3, 13) and os.name != 'nt':
+                #attach may have unregistered the block in this process too
+                from multiprocessing import resource_tracker
+                resource_tracker.register(self.__memory._name, 'shared_memory')
+            self.__memory.unlink()
+            for lock in [self.items_lock, self.coins_lock]:
+                try:
+                    os.remove(lock.get_path())
+                except OSError:
+                    pass
+
+class SharedItemInfo(ItemInfo):
+    """Item info whose amount is kept in the stock of a SharedInventory.
+    Changes must be made with the inventory's 'items_lock' held, which the
+    automat does."""
+    __slots__ = ('_SharedItemInfo__inventory', '_SharedItemInfo__stock', '_SharedItemInfo__index')
+
+    def __init__(self, price: int, item: Item, inventory: SharedInventory, index: int) -> None:
+        self.__index = None
+        super().__init__(price, 0, item)
+        self.__inventory = inventory
+        self.__stock = inventory.get_stock()
+        self.__index = index
+
+    def set_amount(self, amount: int) -> None:
+        if self.__index is None:
+            #called by ItemInfo.__init__, the amount is already shared
+            return
+        if amount < 0:
+            raise InvalidItemAmountException(amount)
+        oldAmount = self.__stock[self.__index]
+        self.__stock[self.__index] = amount
+        self.__inventory.bump_stock_version()
+        listener = self.get_listener()
+        if listener is not None:
+            listener(self, self.get_price(), oldAmount)
+
+    def try_fetch_item(self) -> "Item | None":
+        amount = self.__stock[self.__index]
+        if amount == 0:
+            return None
+        self.set_amount(amount - 1)
+        return self.get_item()
+
+    def get_amount(self) -> int:
+        return self.__stock[self.__index]
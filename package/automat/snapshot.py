@@ -0,0 +1,77 @@
+from typing import Callable, Hashable
+from .catalog import *
+from .state import *
+
+class SnapshotGeneration:
+    """Values of the automat's state saved by the first write of every part
+    of it (see Automat.snapshot for the keys) after the generation's
+    snapshots were taken. Generations are linked from older to newer, the
+    automat only keeps a weak reference to the newest one, so saving stops
+    once no snapshot is left."""
+    __slots__ = ('saved', 'next', '__weakref__')
+
+    def __init__(self) -> None:
+        self.saved: "dict[Hashable, object]" = {}
+        self.next: "SnapshotGeneration | None" = None
+
+class AutomatSnapshot:
+    """Immutable view of an automat's stock, prices, coins and coins
+    inserted in the default session at the moment it was taken. Nothing is
+    copied: a value is read from the automat unless a later write has saved
+    the old one in this or a newer generation, so reading never blocks
+    purchases."""
+    def __init__(self, generation: SnapshotGeneration, read: "Callable[[Hashable], object]", items: Catalog, denominations: "tuple[int, ...]") -> None:
+        self.__generation = generation
+        self.__read = read
+        self.__items = items
+        self.__denominations = denominations
+
+    def __get(self, key: Hashable) -> object:
+        """Returns a part of the state as it was when the snapshot was taken.
+        The live value is read first: a write saves the old value before
+        changing it, so if it changed after that read, the saved value is
+        found below."""
+        value = self.__read(key)
+        generation = self.__generation
+        while generation is not None:
+            saved = generation.saved
+            if key in saved:
+                return saved[key]
+            generation = generation.next
+        return value
+
+    def get_denominations(self) -> "tuple[int, ...]":
+        return self.__denominations
+
+    def get_item_numbers(self) -> "list[int]":
+        return list(self.__items)
+
+    def get_item_details(self, itemNumber: int) -> "tuple[str, int, int]":
+        """Returns name, price (in grosze) and amount of an item."""
+        return self.__items[itemNumber].get_name(), self.__get(('price', itemNumber)), self.__get(('amount', itemNumber))
+
+    def get_amount(self, itemNumber: int) -> int:
+        return self.__get(('amount', itemNumber))
+
+    def get_price(self, itemNumber: int) -> int:
+        return self.__get(('price', itemNumber))
+
+    def get_coin_counts(self) -> "list[int]":
+        """Returns counts of automat's coins indexed like get_denominations."""
+        return list(self.__get('coins'))
+
+    def get_stored_coins_value(self) -> int:
+        """Returns value of automat's coins in grosze."""
+        return sum(v * n for v, n in zip(self.__denominations, self.__get('coins')))
+
+    def get_inserted_coins(self) -> "list[int]":
+        """Returns values of the coins inserted in the default session."""
+        return list(self.__get('inserted'))
+
+    def get_inserted_coins_value(self) -> int:
+        return sum(self.__get('inserted'))
+
+    def to_state(self) -> AutomatState:
+        """Returns the snapshot as a plain copy, like Automat.export_state."""
+        return AutomatState(self.__denominations, self.get_coin_counts(), self.get_inserted_coins(),
+            [(n, info.get_name(), self.get_price(n), self.get_amount(n)) for n, info in self.__items.items()])
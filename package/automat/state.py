@@ -0,0 +1,11 @@
+from typing import NamedTuple
+
+class AutomatState(NamedTuple):
+    """Plain copy of an automat's state used to save and restore it.
+    Amounts are in grosze."""
+    denominations: "tuple[int, ...]"
+    coinCounts: "list[int]"
+    #values of the coins inserted in the default session
+    insertedCoins: "list[int]"
+    #number, name, price and amount of every item
+    items: "list[tuple[int, str, int, int]]"
@@ -0,0 +1,46 @@
+import tracemalloc
+from ..automat.automat import *
+
+purchases = 10000
+
+def run_purchases(a: Automat, itemNumber: int, count: int) -> list:
+    """Buys the item with the exact amount and inserts and returns coins
+    'count' times. Bought items and returned coins are kept alive like
+    a customer would keep them."""
+    kept = []
+    coins = [Coin(200), Coin(100)]
+    for _ in range(0, count):
+        for c in coins:
+            a.insert_coin(c)
+        kept.append(a.pay_for_item(itemNumber))
+        for c in coins:
+            a.insert_coin(c)
+        kept.append(a.return_inserted_coins())
+    return kept
+
+def main() -> None:
+    a = Automat(purchases)
+    itemNumber = 30
+    a._Automat__items[itemNumber].set_price(300)
+    #warm up caches first
+    run_purchases(a, itemNumber, 10)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = run_purchases(a, itemNumber, purchases - 10)
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    #counting the results keeps them alive until after the snapshot
+    count = len(kept) // 2
+    print(f"purchases: {count}")
+    print(f"retained blocks per purchase: {blocks / count:.2f}")
+    print(f"retained bytes per purchase: {size / count:.1f}")
+    print(f"peak traced bytes per purchase: {peak / count:.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import copy
+import random
+import time
+from ..automat.automat import *
+
+order_count = 50000
+
+def make_orders(a: Automat, count: int, seed: int = 0) -> "list[tuple[int, list[Coin]]]":
+    """Returns random orders: a random item paid with random coins until
+    the price is reached."""
+    rng = random.Random(seed)
+    items = [n for n, _ in a.get_items_list()]
+    orders = []
+    for _ in range(0, count):
+        itemNumber = rng.choice(items)
+        price = a.get_item_details(itemNumber)[1]
+        coins = []
+        while get_coins_value(coins) < price:
+            coins.append(Coin(rng.choice(coin_values)))
+        orders.append((itemNumber, coins))
+    return orders
+
+def replay_separately(a: Automat, orders: "list[tuple[int, list[Coin]]]") -> int:
+    """Replays orders with insert_coin and pay_for_item. Returns the number
+    of items sold."""
+    sold = 0
+    for itemNumber, coins in orders:
+        for c in coins:
+            a.insert_coin(c)
+        try:
+            a.pay_for_item(itemNumber)
+            sold += 1
+        except (NoItemsLeftException, ExactChangeOnlyException):
+            a.return_inserted_coins()
+    return sold
+
+def main() -> None:
+    a = Automat(order_count)
+    orders = make_orders(a, order_count)
+    b = copy.deepcopy(a)
+
+    start = time.perf_counter()
+    sold = replay_separately(a, orders)
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = b.pay_for_items(orders)
+    batch = time.perf_counter() - start
+
+    batchSold = sum(1 for r in results if r.status == PurchaseStatus.OK)
+    print(f"orders: {order_count}")
+    print(f"separate: {separate:.3f}s ({order_count / separate:.0f} orders/s), sold {sold}")
+    print(f"batch:    {batch:.3f}s ({order_count / batch:.0f} orders/s), sold {batchSold}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import random
+from ..automat.change import *
+from ..automat.coin import *
+from .timing import *
+
+#amount of coins of each denomination in the float
+float_sizes = [0, 1, 3, 10, 100, 1000]
+calls = 200
+
+def make_cases(floatSize: int, rng: random.Random) -> "list[tuple[int, list[int]]]":
+    """Returns (amount, available coins) pairs. Coin counts vary between
+    0 and 'floatSize' so that some denominations run out."""
+    cases = []
+    for _ in range(0, calls):
+        available = [rng.randint(0, floatSize) for _ in coin_values]
+        cases.append((rng.randint(1, 1000), available))
+    return cases
+
+def run_engine(engine: ChangeEngine, cases: "list[tuple[int, list[int]]]") -> "tuple[float, int, int]":
+    """Returns time per call in microseconds, number of cases solved and
+    total number of coins given."""
+    denominations = tuple(coin_values)
+    it = iter(cases * 3)
+    def call() -> None:
+        amount, available = next(it)
+        engine.make_change(amount, denominations, available)
+    elapsed = measure(call, len(cases), 3)
+    solved = 0
+    coins = 0
+    for amount, available in cases:
+        change = engine.make_change(amount, denominations, available)
+        if change is not None:
+            solved += 1
+            coins += sum(change)
+    return elapsed, solved, coins
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'float':>6} {'engine':>8} {'us/call':>10} {'solved':>8} {'coins':>8}")
+    for floatSize in float_sizes:
+        cases = make_cases(floatSize, rng)
+        for name, engine in [('greedy', GreedyChangeEngine()), ('optimal', OptimalChangeEngine())]:
+            elapsed, solved, coins = run_engine(engine, cases)
+            print(f"{floatSize:>6} {name:>8} {elapsed:>10.2f} {solved:>8} {coins:>8}")
+
+if __name__ == '__main__':
+    main()
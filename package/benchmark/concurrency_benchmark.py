@@ -0,0 +1,65 @@
+import random
+import threading
+import time
+from ..automat.automat import *
+
+thread_counts = [1, 2, 4, 8]
+customers_per_thread = 2000
+
+def run_customers(a: Automat, count: int, seed: int, results: list) -> None:
+    """Simulates 'count' customers in its own session. Each one inserts
+    random coins until the price is reached and tries to buy a random item.
+    Appends (sold, revenue, change given) to 'results'."""
+    rng = random.Random(seed)
+    session = a.open_session()
+    items = [n for n, _ in a.get_items_list()]
+    sold = 0
+    revenue = 0
+    changeGiven = 0
+    for _ in range(0, count):
+        itemNumber = rng.choice(items)
+        name, price, amount = a.get_item_details(itemNumber)
+        while a.get_inserted_coins_value(session) < price:
+            a.insert_coin(Coin(rng.choice(coin_values)), session)
+        try:
+            change, item = a.pay_for_item(itemNumber, session)
+            sold += 1
+            revenue += price
+            changeGiven += get_coins_value(change)
+        except (NoItemsLeftException, ExactChangeOnlyException):
+            a.return_inserted_coins(session)
+    results.append((sold, revenue, changeGiven))
+
+def run_stress(threadCount: int, customers: int, itemAmount: int, seed: int = 0) -> "tuple[float, int]":
+    """Runs customers on 'threadCount' threads against one thread safe
+    automat and checks that money and stock are conserved. Returns elapsed
+    time in seconds and the number of items sold."""
+    a = Automat(itemAmount, threadSafe=True)
+    startValue = a.get_stored_coins_value()
+    startStock = sum(a.get_item_details(n)[2] for n, _ in a.get_items_list())
+    results = []
+    threads = [threading.Thread(target=run_customers, args=(a, customers, seed + i, results)) for i in range(0, threadCount)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    sold = sum(r[0] for r in results)
+    revenue = sum(r[1] for r in results)
+    endStock = sum(a.get_item_details(n)[2] for n, _ in a.get_items_list())
+    if endStock != startStock - sold:
+        raise AssertionError(f"Stock not conserved: {startStock} - {sold} != {endStock}")
+    if a.get_stored_coins_value() != startValue + revenue:
+        raise AssertionError(f"Money not conserved: {startValue} + {revenue} != {a.get_stored_coins_value()}")
+    return elapsed, sold
+
+def main() -> None:
+    print(f"{'threads':>8} {'customers':>10} {'sold':>8} {'seconds':>8} {'customers/s':>12}")
+    for threadCount in thread_counts:
+        customers = threadCount * customers_per_thread
+        elapsed, sold = run_stress(threadCount, customers_per_thread, customers)
+        print(f"{threadCount:>8} {customers:>10} {sold:>8} {elapsed:>8.3f} {customers / elapsed:>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import os
+import random
+import time
+from ..fleet.fleet import *
+
+def make_batch(machineIds: list, count: int, seed: int = 0) -> "list[tuple[object, str, tuple]]":
+    """Returns purchases of random items paid with a 5zl and a 2zl coin."""
+    rng = random.Random(seed)
+    return [(rng.choice(machineIds), 'buy', (rng.randint(30, 50), [500, 200])) for _ in range(0, count)]
+
+def run(shards: int, machines: int, operations: int, rounds: int) -> float:
+    """Returns fleet throughput in operations per second."""
+    ids = list(range(0, machines))
+    with Fleet(ids, shards, amountOfEachItem=operations * rounds) as fleet:
+        batches = [make_batch(ids, operations, r) for r in range(0, rounds)]
+        fleet.execute(batches[0][:100])
+        start = time.perf_counter()
+        for batch in batches:
+            fleet.execute(batch)
+        elapsed = time.perf_counter() - start
+    return operations * rounds / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures fleet throughput for growing numbers of worker processes.")
+    parser.add_argument('--machines', type=int, default=1000)
+    parser.add_argument('--operations', type=int, default=20000, help="operations per batch")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--max-shards', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    shards = 1
+    base = None
+    while shards <= args.max_shards:
+        throughput = run(shards, args.machines, args.operations, args.rounds)
+        base = throughput if base is None else base
+        print(f"shards: {shards:3} {throughput:10.0f} ops/s ({throughput / base:.2f}x)")
+        shards *= 2
+    print(f"cores: {os.cpu_count()}")
+
+if __name__ == '__main__':
+    main()
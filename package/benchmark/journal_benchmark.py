@@ -0,0 +1,37 @@
+import tempfile
+import time
+from ..automat.automat import *
+
+sale_counts = [1000, 10000, 50000]
+snapshot_intervals = [1000, 100000]
+
+def run_sales(a: Automat, count: int) -> None:
+    """Buys random items with exact coins 'count' times."""
+    items = [n for n, _ in a.get_items_list()]
+    for i in range(0, count):
+        itemNumber = items[i % len(items)]
+        price = a.get_item_details(itemNumber)[1]
+        for v in reversed(coin_values):
+            while price >= v:
+                a.insert_coin(Coin(v))
+                price -= v
+        a.pay_for_item(itemNumber)
+
+def main() -> None:
+    print(f"{'sales':>8} {'snapshot every':>15} {'us/sale':>8} {'restart ms':>11}")
+    for sales in sale_counts:
+        for interval in snapshot_intervals:
+            with tempfile.TemporaryDirectory() as directory:
+                a = Automat.open_journaled(directory, sales, snapshotEvery=interval)
+                start = time.perf_counter()
+                run_sales(a, sales)
+                perSale = (time.perf_counter() - start) / sales * 1e6
+                a.get_journal().close()
+                start = time.perf_counter()
+                b = Automat.open_journaled(directory)
+                restart = (time.perf_counter() - start) * 1000
+                b.get_journal().close()
+            print(f"{sales:>8} {interval:>15} {perSale:>8.1f} {restart:>11.1f}")
+
+if __name__ == '__main__':
+    main()
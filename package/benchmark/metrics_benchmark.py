@@ -0,0 +1,41 @@
+from ..automat.automat import *
+from .timing import *
+
+calls = 20000
+rounds = 10
+
+def make_automat() -> Automat:
+    """Returns an automat where item 30 costs 7zl, so a 5zl and a 2zl coin
+    pay it exactly."""
+    a = Automat(calls * 3 + 10)
+    a._Automat__items[30].set_price(700)
+    return a
+
+def purchase(a: Automat) -> None:
+    """The hot path: insert coins and pay."""
+    a.insert_coin(Coin(500))
+    a.insert_coin(Coin(200))
+    a.try_pay(30)
+
+def main() -> None:
+    plain = make_automat()
+    disabled = make_automat()
+    disabled.enable_metrics()
+    disabled.disable_metrics()
+    enabled = make_automat()
+    metrics = enabled.enable_metrics()
+    automats = [('never enabled', plain), ('disabled', disabled), ('enabled', enabled)]
+    best = [None] * len(automats)
+    #measure in turns so warm-up and noise hit every variant alike
+    for _ in range(0, rounds):
+        for i, (_, a) in enumerate(automats):
+            t = measure(lambda: purchase(a), calls // rounds, 1)
+            best[i] = t if best[i] is None else min(best[i], t)
+    base = best[0]
+    for (name, _), t in zip(automats, best):
+        print(f"{name + ':':15}{t:.2f} us/purchase ({t / base - 1:+.1%})")
+    latency = metrics.get_histogram('try_pay').to_dict()
+    print(f"try_pay p50 {latency['p50_ns']}ns, p99 {latency['p99_ns']}ns")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import random
+from ..automat.automat import *
+from .timing import *
+
+attempts = 20000
+#share of attempts that only check the price
+price_checks = 0.8
+
+def make_attempts(a: Automat, count: int, seed: int = 0) -> "list[tuple[int, list[Coin]]]":
+    """Returns (item number, coins) attempts. Most attempts insert no coins
+    and only check the price, some use an invalid number and the rest pay
+    the exact price."""
+    rng = random.Random(seed)
+    items = [n for n, _ in a.get_items_list()]
+    result = []
+    for _ in range(0, count):
+        r = rng.random()
+        if r < price_checks:
+            result.append((rng.choice(items), []))
+        elif r < price_checks + 0.05:
+            result.append((99, []))
+        else:
+            #pay the exact price so the change engine doesn't dominate
+            itemNumber = rng.choice(items)
+            price = a.get_item_details(itemNumber)[1]
+            coins = []
+            for v in reversed(coin_values):
+                while price >= v:
+                    coins.append(Coin(v))
+                    price -= v
+            result.append((itemNumber, coins))
+    return result
+
+def with_exceptions(a: Automat, attempts: "list[tuple[int, list[Coin]]]") -> None:
+    """Plays the attempts with get_item_details and pay_for_item."""
+    for itemNumber, coins in attempts:
+        try:
+            a.get_item_details(itemNumber)
+        except InvalidItemNumberException:
+            continue
+        for c in coins:
+            a.insert_coin(c)
+        try:
+            a.pay_for_item(itemNumber)
+        except (NotEnoughMoneyException, NoItemsLeftException, ExactChangeOnlyException):
+            a.return_inserted_coins()
+
+def with_results(a: Automat, attempts: "list[tuple[int, list[Coin]]]") -> None:
+    """Plays the attempts with lookup and try_pay."""
+    for itemNumber, coins in attempts:
+        if a.lookup(itemNumber).status != PurchaseStatus.OK:
+            continue
+        for c in coins:
+            a.insert_coin(c)
+        if a.try_pay(itemNumber).status != PurchaseStatus.OK:
+            a.return_inserted_coins()
+
+def main() -> None:
+    a = Automat(attempts)
+    played = make_attempts(a, attempts)
+    raising = measure(lambda: with_exceptions(a, played), 1, 3) / attempts
+    results = measure(lambda: with_results(a, played), 1, 3) / attempts
+    print(f"attempts: {attempts} ({price_checks:.0%} price checks)")
+    print(f"exceptions: {raising:.2f} us/attempt")
+    print(f"results:    {results:.2f} us/attempt")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import json
+import platform
+import sys
+from typing import Callable
+from ..automat.automat import *
+from ..test.helpers import make_catalog
+from .timing import *
+
+def make_automat(amountOfEachCoin: int = 10, stock: int = 1000000) -> Automat:
+    """Returns an automat selling a 7zl item number 30 and a 7.30zl item
+    number 31."""
+    return Automat.from_catalog(make_catalog(stock, prices=(700, 730)), amountOfEachCoin)
+
+def bench_get_coins_value() -> Callable:
+    coins = [Coin(v) for v in coin_values] * 2
+    return lambda: get_coins_value(coins)
+
+def bench_pay_exact() -> Callable:
+    a = make_automat()
+    def run() -> None:
+        a.insert_coin(Coin(500))
+        a.insert_coin(Coin(200))
+        a.pay_for_item(30)
+    return run
+
+def bench_pay_change() -> Callable:
+    a = make_automat()
+    def run() -> None:
+        a.insert_coin(Coin(500))
+        a.insert_coin(Coin(500))
+        change, _ = a.pay_for_item(31)
+        #put the change back so the float doesn't run out
+        a.add_coins(change)
+    return run
+
+def bench_pay_failure() -> Callable:
+    a = make_automat()
+    def run() -> None:
+        a.insert_coin(Coin(100))
+        try:
+            a.pay_for_item(30)
+        except NotEnoughMoneyException:
+            a.return_inserted_coins()
+    return run
+
+def bench_get_change(amountOfEachCoin: int) -> Callable:
+    a = make_automat(amountOfEachCoin)
+    insertedCounts = [0] * len(coin_values)
+    insertedCounts[coin_values.index(500)] = 2
+    #change of 4zl, with one coin of each denomination greedy runs out of
+    #2zl coins and the solver has to be used
+    return lambda: a._Automat__get_change(1000, 600, insertedCounts)
+
+def bench_fetch_item() -> Callable:
+    info = ItemInfo(100, 10 ** 9, Item("Water"))
+    return info.fetch_item
+
+def bench_handler_keys() -> Callable:
+    import application
+    #the default view shows nothing, so no window is needed
+    handler = application.AutomatHandler(make_automat())
+    def run() -> None:
+        #look up the price, pay and buy
+        handler.on_number_btn_click(3)
+        handler.on_number_btn_click(0)
+        handler.on_coin_btn_click(500)
+        handler.on_coin_btn_click(200)
+        handler.on_number_btn_click(3)
+        handler.on_number_btn_click(0)
+    return run
+
+#name: (function returning the callable to measure, calls per measurement)
+benchmarks: "dict[str, tuple[Callable[[], Callable], int]]" = {
+    'get_coins_value': (bench_get_coins_value, 20000),
+    'pay_for_item.exact': (bench_pay_exact, 5000),
+    'pay_for_item.change': (bench_pay_change, 5000),
+    'pay_for_item.failure': (bench_pay_failure, 5000),
+    'get_change.float_1': (lambda: bench_get_change(1), 2000),
+    'get_change.float_10': (lambda: bench_get_change(10), 2000),
+    'get_change.float_1000': (lambda: bench_get_change(1000), 2000),
+    'fetch_item': (bench_fetch_item, 50000),
+    'handler.key_presses': (bench_handler_keys, 2000),
+}
+
+def run_suite(pattern: str = '', scale: float = 1.0, repeat: int = 5) -> "dict[str, float]":
+    """Runs benchmarks whose names contain 'pattern'. Returns the best time
+    per call in microseconds for every benchmark."""
+    results = {}
+    for name, (setup, calls) in benchmarks.items():
+        if pattern not in name:
+            continue
+        results[name] = measure(setup(), max(1, int(calls * scale)), repeat)
+    return results
+
+def save_results(path: str, results: "dict[str, float]") -> None:
+    """Writes results to a JSON file together with the Python version."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({ 'python': platform.python_version(), 'results_us': results }, f, indent=2, sort_keys=True)
+
+def load_results(path: str) -> "dict[str, float]":
+    """Reads results written by save_results."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results_us']
+
+def compare(results: "dict[str, float]", baseline: "dict[str, float]", threshold: float) -> "list[tuple[str, float, float, bool]]":
+    """Compares results with a baseline. Returns (name, baseline time, time,
+    regressed) for benchmarks present in both. A benchmark has regressed
+    when it got slower by more than 'threshold' (0.1 is 10%)."""
+    rows = []
+    for name, t in results.items():
+        if name in baseline:
+            rows.append((name, baseline[name], t, t > baseline[name] * (1 + threshold)))
+    return rows
+
+def main(argv: "list[str] | None" = None) -> int:
+    parser = argparse.ArgumentParser(description="Runs the automat benchmark suite.")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose names contain this text")
+    parser.add_argument('--output', help="save results to this JSON file")
+    parser.add_argument('--baseline', help="compare results with this JSON file")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown against the baseline (0.2 is 20%%)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplies the number of calls")
+    args = parser.parse_args(argv)
+    results = run_suite(args.filter, args.scale)
+    if args.output:
+        save_results(args.output, results)
+    if not args.baseline:
+        for name, t in results.items():
+            print(f"{name:24}{t:10.2f} us")
+        return 0
+    rows = compare(results, load_results(args.baseline), args.threshold)
+    for name, base, t, regressed in rows:
+        print(f"{name:24}{base:10.2f} us {t:10.2f} us {t / base - 1:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return 1 if any(regressed for *_, regressed in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import time
+from typing import Callable
+
+def measure(func: Callable, calls: int, repeat: int = 3) -> float:
+    """Calls 'func' 'calls' times, 'repeat' times over. Returns the best
+    time per call in microseconds."""
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        for _ in range(0, calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / calls * 1e6
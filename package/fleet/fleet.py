@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import random
+import zlib
+from ..automat.automat import *
+
+class FleetOperationException(Exception):
+    """Raised when an operation failed in a fleet worker."""
+    def __init__(self, machineId: object, op: str, reason: str) -> None:
+        super().__init__(f"Operation {op} on machine {machineId} failed: {reason}")
+
+class UnknownOperationException(Exception):
+    """Raised in a fleet worker for an operation it doesn't support."""
+    def __init__(self, op: str) -> None:
+        super().__init__(f"Unknown operation: {op}")
+
+def buy(a: Automat, itemNumber: int, coinValues: "list[int]") -> "tuple[PurchaseStatus, list[int]]":
+    """Inserts the coins and tries to buy the item. Returns the status and
+    values of the change, or of the returned coins if the purchase failed."""
+    for value in coinValues:
+        a.insert_coin(Coin(value))
+    result = a.try_pay(itemNumber)
+    if result.status != PurchaseStatus.OK:
+        return result.status, [c.get_value() for c in a.return_inserted_coins()]
+    return result.status, [c.get_value() for c in result.change]
+
+#operations on a single machine, results must be picklable
+operations = {
+    'buy': buy,
+    'insert_coin': lambda a, value: a.insert_coin(Coin(value)),
+    'return_inserted_coins': lambda a: [c.get_value() for c in a.return_inserted_coins()],
+    'try_pay': lambda a, itemNumber: a.try_pay(itemNumber),
+    'lookup': lambda a, itemNumber: a.lookup(itemNumber),
+    'restock': lambda a, itemNumber, amount: a.restock(itemNumber, amount),
+    'add_coins': lambda a, coinValues: a.add_coins([Coin(v) for v in coinValues]),
+    'export_state': lambda a: a.export_state(),
+}
+
+def query_stock(machines: "dict[object, Automat]") -> "dict[int, int]":
+    """Returns the amount of every item summed over the machines."""
+    totals: "dict[int, int]" = {}
+    for a in machines.values():
+        for n, _ in a.get_items_list():
+            totals[n] = totals.get(n, 0) + a.lookup(n).amount
+    return totals
+
+def query_float(machines: "dict[object, Automat]") -> int:
+    """Returns the value of the machines' coins in grosze."""
+    return sum(a.get_stored_coins_value() for a in machines.values())
+
+def query_exact_change_only(machines: "dict[object, Automat]") -> list:
+    """Returns IDs of machines that can't give change for some item."""
+    return [m for m, a in machines.items() if a.get_exact_change_only_items()]
+
+#fleet-wide queries: function run on every shard and how results are merged
+queries = {
+    'stock': (query_stock, lambda parts: { n:sum(p.get(n, 0) for p in parts) for n in sorted(set().union(*parts)) }),
+    'float': (query_float, sum),
+    'exact_change_only': (query_exact_change_only, lambda parts: [m for p in parts for m in p]),
+}
+
+def run_shard(connection, machineIds: list, amountOfEachItem: int, seed: int) -> None:
+    """Worker process loop. Owns the automats of one shard and serves
+    batches of operations and queries sent through 'connection' until None
+    is received."""
+    random.seed(seed)
+    machines = { m:Automat(amountOfEachItem) for m in machineIds }
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        kind, payload = message
+        if kind == 'query':
+            connection.send(queries[payload][0](machines))
+            continue
+        results = []
+        for machineId, op, args in payload:
+            try:
+                if op not in operations:
+                    raise UnknownOperationException(op)
+                results.append((True, operations[op](machines[machineId], *args)))
+            except Exception as e:
+                #exceptions are sent as text, not all of them can be pickled
+                results.append((False, repr(e)))
+        connection.send(results)
+    connection.close()
+
+class Fleet:
+    """Many automats sharded across worker processes. Every machine lives in
+    exactly one worker, chosen by its ID, so operations on different shards
+    run in parallel. Operations are sent in batches (see execute) and
+    fleet-wide queries are run by every worker at once and merged."""
+    def __init__(self, machineIds: list, shards: "int | None" = None, amountOfEachItem: int = 5, seed: int = 0) -> None:
+        self.__shard_count = max(1, min(shards if shards is not None else os.cpu_count() or 1, len(machineIds)))
+        self.__machines = set(machineIds)
+        self.__connections = []
+        self.__processes = []
+        for s in range(0, self.__shard_count):
+            parent, child = multiprocessing.Pipe()
+            ids = [m for m in machineIds if self.get_shard(m) == s]
+            process = multiprocessing.Process(target=run_shard, args=(child, ids, amountOfEachItem, seed + s), daemon=True)
+            process.start()
+            child.close()
+            self.__connections.append(parent)
+            self.__processes.append(process)
+
+    def __enter__(self) -> "Fleet":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_shard_count(self) -> int:
+        """Returns the number of worker processes."""
+        return self.__shard_count
+
+    def get_shard(self, machineId: object) -> int:
+        """Returns the shard a machine belongs to. The choice only depends on
+        the ID's text, so it is the same in every process and run."""
+        return zlib.crc32(str(machineId).encode()) % self.__shard_count
+
+    def execute(self, batch: "list[tuple[object, str, tuple]]") -> list:
+        """Runs (machine ID, operation, arguments) triples, see 'operations'.
+        Every shard gets its part of the batch at once and works on it in
+        parallel with the others; operations on the same machine run in the
+        order given. Returns the results in the order of the batch. Raises
+        FleetOperationException for the first operation that failed, after
+        the whole batch has run."""
+        parts: "list[list[int]]" = [[] for _ in range(0, self.__shard_count)]
+        for i, (machineId, _, _) in enumerate(batch):
+            if machineId not in self.__machines:
+                raise FleetOperationException(machineId, batch[i][1], "unknown machine")
+            parts[self.get_shard(machineId)].append(i)
+        for s, indexes in enumerate(parts):
+            if indexes:
+                self.__connections[s].send(('ops', [batch[i] for i in indexes]))
+        results = [None] * len(batch)
+        failure = None
+        for s, indexes in enumerate(parts):
+            if not indexes:
+                continue
+            for i, (ok, value) in zip(indexes, self.__connections[s].recv()):
+                results[i] = value
+                if not ok and (failure is None or i < failure[0]):
+                    failure = (i, value)
+        if failure is not None:
+            raise FleetOperationException(batch[failure[0]][0], batch[failure[0]][1], failure[1])
+        return results
+
+    def call(self, machineId: object, op: str, *args) -> object:
+        """Runs one operation on a machine and returns its result."""
+        return self.execute([(machineId, op, args)])[0]
+
+    def __query(self, name: str) -> object:
+        """Runs a query on every shard in parallel and merges the results."""
+        for connection in self.__connections:
+            connection.send(('query', name))
+        return queries[name][1]([connection.recv() for connection in self.__connections])
+
+    def get_stock_totals(self) -> "dict[int, int]":
+        """Returns the amount of every item in the whole fleet."""
+        return self.__query('stock')
+
+    def get_float_total(self) -> int:
+        """Returns the value of coins in all machines in grosze."""
+        return self.__query('float')
+
+    def get_exact_change_only_machines(self) -> list:
+        """Returns IDs of machines that can't give change for some item."""
+        return self.__query('exact_change_only')
+
+    def close(self) -> None:
+        """Stops the worker processes."""
+        for connection in self.__connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.__processes:
+            process.join()
+        self.__connections = []
+        self.__processes = []
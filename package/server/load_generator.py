@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from ..automat.automat import *
+from .server import *
+
+class LoadReport:
+    """Collects request latencies of a load run."""
+    def __init__(self) -> None:
+        self.latencies: "list[float]" = []
+        self.outcomes: "dict[str, int]" = {}
+        self.elapsed = 0.0
+
+    def add_outcome(self, outcome: str) -> None:
+        """Counts the outcome of a purchase."""
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def get_percentile(self, percent: float) -> float:
+        """Returns the latency percentile in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index] * 1000
+
+    def get_throughput(self) -> float:
+        """Returns requests per second."""
+        return len(self.latencies) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        outcomes = ', '.join(f'{k}: {v}' for k, v in sorted(self.outcomes.items()))
+        return (f"requests: {len(self.latencies)} in {self.elapsed:.2f}s ({self.get_throughput():.0f}/s)\n"
+            f"latency p50: {self.get_percentile(50):.3f}ms, p99: {self.get_percentile(99):.3f}ms\n"
+            f"purchases: {outcomes}")
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, report: LoadReport, message: dict) -> dict:
+    """Sends one request and waits for the response, timing the round trip."""
+    start = time.perf_counter()
+    writer.write(json.dumps(message).encode() + b'\n')
+    response = json.loads(await reader.readline())
+    report.latencies.append(time.perf_counter() - start)
+    return response
+
+async def run_client(host: str, port: int, customers: int, seed: int, report: LoadReport) -> None:
+    """Opens one connection and plays 'customers' customers one after another:
+    each checks a random item, inserts random coins until the price is
+    reached and pays."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        items = (await request(reader, writer, report, { 'op': 'list' }))['items']
+        for _ in range(0, customers):
+            itemNumber = rng.choice(items)[0]
+            details = await request(reader, writer, report, { 'op': 'details', 'item': itemNumber })
+            credit = 0
+            while credit < details['price']:
+                credit = (await request(reader, writer, report, { 'op': 'insert', 'coin': rng.choice(coin_values) }))['credit']
+            response = await request(reader, writer, report, { 'op': 'pay', 'item': itemNumber })
+            report.add_outcome('ok' if response['ok'] else response['error'])
+            if not response['ok']:
+                await request(reader, writer, report, { 'op': 'refund' })
+    finally:
+        writer.close()
+
+async def run_load(host: str, port: int, clients: int, customers: int, seed: int = 0) -> LoadReport:
+    """Runs 'clients' concurrent connections sharing 'customers' customers."""
+    report = LoadReport()
+    perClient = [customers // clients + (1 if i < customers % clients else 0) for i in range(0, clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*[run_client(host, port, n, seed + i, report) for i, n in enumerate(perClient)])
+    report.elapsed = time.perf_counter() - start
+    return report
+
+async def run_local(clients: int, customers: int, itemAmount: int) -> LoadReport:
+    """Starts a server on a free local port and runs the load against it."""
+    server = AutomatServer(Automat(itemAmount), '127.0.0.1', 0)
+    await server.start()
+    try:
+        return await run_load('127.0.0.1', server.get_port(), clients, customers)
+    finally:
+        await server.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generates customer load against an automat server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=100, help="concurrent connections")
+    parser.add_argument('--customers', type=int, default=5000, help="customers in total")
+    parser.add_argument('--local', action='store_true', help="start a server in this process")
+    parser.add_argument('--items', type=int, default=100000, help="amount of each item for --local")
+    args = parser.parse_args()
+    if args.local:
+        report = asyncio.run(run_local(args.clients, args.customers, args.items))
+    else:
+        report = asyncio.run(run_load(args.host, args.port, args.clients, args.customers))
+    print(report)
+
+if __name__ == '__main__':
+    main()
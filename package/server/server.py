@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import json
+import traceback
+from ..automat.automat import *
+
+#error codes sent back for expected failures
+error_codes = {
+    InvalidItemNumberException: 'invalid_item',
+    NotEnoughMoneyException: 'not_enough_money',
+    ExactChangeOnlyException: 'exact_change_only',
+    NoItemsLeftException: 'no_items_left',
+    InvalidCoinValueException: 'invalid_coin',
+}
+
+class BadRequestException(Exception):
+    """Raised when a request can't be understood."""
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Bad request: {reason}")
+
+def get_int_field(request: dict, name: str) -> int:
+    """Returns an integer field of a request."""
+    value = request.get(name)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise BadRequestException(f"{name!r} must be an integer")
+    return value
+
+class AutomatServer:
+    """Exposes an Automat over TCP. The protocol is JSON lines: each request
+    is one JSON object with an 'op' field and gets exactly one JSON object
+    back. Every connection is a separate customer session with its own
+    inserted coins, which are returned when the connection closes.
+
+    Requests:
+        {"op": "list"}
+        {"op": "details", "item": 30}
+        {"op": "insert", "coin": 200}
+        {"op": "pay", "item": 30}
+        {"op": "refund"}
+    Responses have "ok": true and the result fields, or "ok": false with
+    "error" (a code from 'error_codes', "bad_request" or "server_error")
+    and "message"."""
+    def __init__(self, automat: Automat, host: str = '127.0.0.1', port: int = 8765) -> None:
+        self.automat = automat
+        self.host = host
+        self.port = port
+        self.__server: "asyncio.AbstractServer | None" = None
+
+    async def start(self) -> None:
+        """Starts listening. Port 0 picks a free port, see get_port."""
+        self.__server = await asyncio.start_server(self.__handle_client, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Starts the server and serves clients until cancelled."""
+        if self.__server is None:
+            await self.start()
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def stop(self) -> None:
+        """Stops accepting clients."""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    def get_port(self) -> int:
+        """Returns the port the server listens on."""
+        return self.port
+
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one connection as one customer session."""
+        session = self.automat.open_session()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(json.dumps(self.handle_request(line, session)).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            #a customer that walks away gets the coins back
+            self.automat.return_inserted_coins(session)
+            writer.close()
+
+    def handle_request(self, line: bytes, session: Escrow) -> dict:
+        """Executes one request line and returns the response. Requests are
+        checked before anything is called, so any other exception is a bug
+        and is answered with "server_error"."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return { 'ok': False, 'error': 'bad_request', 'message': str(e) }
+        try:
+            return self.__execute(request, session)
+        except BadRequestException as e:
+            return { 'ok': False, 'error': 'bad_request', 'message': str(e) }
+        except tuple(error_codes) as e:
+            return { 'ok': False, 'error': error_codes[type(e)], 'message': str(e) }
+        except Exception as e:
+            traceback.print_exc()
+            return { 'ok': False, 'error': 'server_error', 'message': repr(e) }
+
+    def __execute(self, request: object, session: Escrow) -> dict:
+        """Calls the automat for a decoded request."""
+        if not isinstance(request, dict):
+            raise BadRequestException("request must be an object")
+        op = request.get('op')
+        if op == 'list':
+            return { 'ok': True, 'items': [[n, name] for n, name in self.automat.get_items_list()] }
+        if op == 'details':
+            name, price, amount = self.automat.get_item_details(get_int_field(request, 'item'))
+            return { 'ok': True, 'name': name, 'price': price, 'amount': amount }
+        if op == 'insert':
+            self.automat.insert_coin(Coin(get_int_field(request, 'coin')), session)
+            return { 'ok': True, 'credit': self.automat.get_inserted_coins_value(session) }
+        if op == 'pay':
+            change, item = self.automat.pay_for_item(get_int_field(request, 'item'), session)
+            return { 'ok': True, 'item': item.get_name(), 'change': [c.get_value() for c in change] }
+        if op == 'refund':
+            coins = self.automat.return_inserted_coins(session)
+            return { 'ok': True, 'coins': [c.get_value() for c in coins] }
+        raise BadRequestException(f"unknown op {op!r}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serves a vending machine over TCP (JSON lines).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--items', type=int, default=5, help="amount of each item")
+    args = parser.parse_args()
+    server = AutomatServer(Automat(args.items), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import bisect
+import heapq
+import random
+import time
+from typing import NamedTuple
+from ..automat.automat import *
+from .simulator import *
+
+class Sale(NamedTuple):
+    """A purchase from the sales history: item price and counts of tendered
+    coins, both for the denominations the optimizer was created with."""
+    price: int
+    tendered: "list[int]"
+
+class Replay(NamedTuple):
+    """Result of playing the sales history with a starting float: the coin
+    counts before every sale (and after the last one), whether each sale
+    failed for lack of change and how many failures happened from each sale
+    on. 'scarce' lists, for every denomination, the sales where fewer coins
+    of it were available than the change amount could use."""
+    states: "list[list[int]]"
+    failed: "list[bool]"
+    failuresFrom: "list[int]"
+    scarce: "list[list[int]]"
+
+    def get_failures(self) -> int:
+        """Returns the number of sales that failed."""
+        return self.failuresFrom[0]
+
+class FloatPlan(NamedTuple):
+    """Coin counts of a float and the sales history failures with it."""
+    counts: "list[int]"
+    failures: int
+    value: int
+
+def sales_from_customers(prices: "list[int]", customers: CustomerStream) -> "list[Sale]":
+    """Turns simulated customers into sales."""
+    return [Sale(prices[i], list(counts)) for i, counts in zip(customers.items, customers.tendered)]
+
+def sales_from_journal(directory: str, denominations: "tuple[int, ...]" = tuple(coin_values)) -> "list[Sale]":
+    """Reads the sales and the purchases refused for lack of change recorded
+    in an automat's journal, in the order they happened. A snapshot empties
+    the journal, so only what happened since the last one is read; open the
+    automat with a 'snapshotEvery' covering the period to optimize for."""
+    sales = []
+    for event, _, _, _, value, coinsIn, coinsOut in read_records(directory, denominations):
+        if event == EVENT_SALE:
+            change = sum(v * n for v, n in zip(denominations, coinsOut))
+            sales.append(Sale(sum(v * n for v, n in zip(denominations, coinsIn)) - change, list(coinsIn)))
+        elif event == EVENT_NO_CHANGE:
+            sales.append(Sale(value, list(coinsIn)))
+    return sales
+
+class FloatOptimizer:
+    """Finds coin floats that let an automat give change for a sales
+    history. Candidate floats are compared with a replay of the current
+    float: a candidate only differs from it by a few extra coins, and as long
+    as those coins can't change the change given, the candidate follows the
+    replay without any work. Change computations are cached by the amount
+    and the coin counts that amount could use, and unreachable amounts are
+    rejected with a bitset before the change engine is asked."""
+    def __init__(self, sales: "list[Sale]", denominations: "tuple[int, ...]" = tuple(coin_values), changeEngine: "ChangeEngine | None" = None) -> None:
+        self.__sales = sales
+        self.__denominations = denominations
+        self.__change_engine = changeEngine if changeEngine is not None else OptimalChangeEngine()
+        #change amount and the largest useful count of every denomination
+        self.__amounts = []
+        self.__caps = []
+        for sale in sales:
+            amount = sum(v * n for v, n in zip(denominations, sale.tendered)) - sale.price
+            self.__amounts.append(amount)
+            self.__caps.append([amount // v for v in denominations])
+        self.__solved: "dict[tuple[int, ...], list[int] | None]" = {}
+
+    def __make_change(self, index: int, available: "list[int]") -> "list[int] | None":
+        """Returns change for a sale from the available coins (the float and
+        the tendered coins), None if it can't be given."""
+        amount = self.__amounts[index]
+        key = (amount, *[min(n, c) for n, c in zip(available, self.__caps[index])])
+        if key in self.__solved:
+            return self.__solved[key]
+        mask = (1 << (amount + 1)) - 1
+        bits = 1
+        for v, n in zip(self.__denominations, key[1:]):
+            bits = add_reachable(bits, v, n, mask)
+        change = self.__change_engine.make_change(amount, self.__denominations, list(key[1:])) if bits >> amount & 1 else None
+        self.__solved[key] = change
+        return change
+
+    def __step(self, index: int, counts: "list[int]") -> "list[int] | None":
+        """Plays a sale on the coin counts. Returns the counts after it or
+        None if change couldn't be given."""
+        tendered = self.__sales[index].tendered
+        available = [n + k for n, k in zip(counts, tendered)]
+        change = self.__make_change(index, available)
+        if change is None:
+            return None
+        return [n - k for n, k in zip(available, change)]
+
+    def replay(self, counts: "list[int]") -> Replay:
+        """Plays the whole sales history with a starting float."""
+        states = [list(counts)]
+        failed = []
+        for i in range(0, len(self.__sales)):
+            after = self.__step(i, states[-1])
+            failed.append(after is None)
+            states.append(states[-1] if after is None else after)
+        failuresFrom = [0] * (len(failed) + 1)
+        for i in range(len(failed) - 1, -1, -1):
+            failuresFrom[i] = failuresFrom[i + 1] + failed[i]
+        scarce = [[] for _ in self.__denominations]
+        for i, sale in enumerate(self.__sales):
+            for d, (n, k, c) in enumerate(zip(states[i], sale.tendered, self.__caps[i])):
+                if n + k < c:
+                    scarce[d].append(i)
+        return Replay(states, failed, failuresFrom, scarce)
+
+    def count_failures(self, base: Replay, extra: "list[int]", limit: "int | None" = None) -> int:
+        """Returns failures of the sales history with the float of 'base'
+        plus 'extra' coins. Counting stops once 'limit' is exceeded."""
+        delta = list(extra)
+        support = [d for d, n in enumerate(delta) if n != 0]
+        failures = 0
+        i = 0
+        while i < len(self.__sales):
+            if not support:
+                #the candidate has caught up with the replay
+                return failures + base.failuresFrom[i]
+            if all(delta[d] > 0 for d in support):
+                #extra coins only matter where the replay was short of them,
+                #skip to the next such sale
+                nextScarce = len(self.__sales)
+                for d in support:
+                    scarce = base.scarce[d]
+                    j = bisect.bisect_left(scarce, i)
+                    if j < len(scarce) and scarce[j] < nextScarce:
+                        nextScarce = scarce[j]
+                failures += base.failuresFrom[i] - base.failuresFrom[nextScarce]
+                i = nextScarce
+                if i == len(self.__sales):
+                    break
+            state = base.states[i]
+            tendered = self.__sales[i].tendered
+            caps = self.__caps[i]
+            #coins above the cap can't be used, so the candidate gives the
+            #same change as the replay if the extra coins are all above it
+            if all(state[d] + tendered[d] >= caps[d] and state[d] + tendered[d] + delta[d] >= caps[d] for d in support):
+                failures += base.failed[i]
+            else:
+                counts = [n + k for n, k in zip(state, delta)]
+                after = self.__step(i, counts)
+                if after is None:
+                    failures += 1
+                    after = counts
+                following = base.states[i + 1]
+                delta = [a - b for a, b in zip(after, following)]
+                support = [d for d, n in enumerate(delta) if n != 0]
+            if limit is not None and failures > limit:
+                return failures
+            i += 1
+        return failures
+
+    def __improve(self, counts: "list[int]", stop) -> "list[int]":
+        """Keeps adding the coins that remove the most failures per grosz
+        until 'stop(counts, replay, value being added)' says so or nothing
+        helps. Batches of 1, 2, 4... 64 coins of a denomination are the
+        candidates. Candidates are evaluated lazily: the gain a candidate
+        had before bounds what it has now, so only the candidates that could
+        still be the best are tried again."""
+        counts = list(counts)
+        base = self.replay(counts)
+        sizes = [1 << k for k in range(0, 7)]
+        fresh = True
+        while not stop(counts, base, 0) and base.get_failures() > 0:
+            if fresh:
+                #every candidate starts with an unknown (infinite) bound
+                candidates = [(-float('inf'), v * size, d, size) for d, v in enumerate(self.__denominations) for size in sizes]
+                heapq.heapify(candidates)
+            accepted = None
+            while candidates:
+                _, cost, d, size = heapq.heappop(candidates)
+                if stop(counts, base, cost):
+                    continue
+                extra = [0] * len(counts)
+                extra[d] = size
+                gain = base.get_failures() - self.count_failures(base, extra, base.get_failures())
+                if gain <= 0:
+                    continue
+                if not candidates or -gain / cost <= candidates[0][0]:
+                    accepted = (d, size)
+                    break
+                heapq.heappush(candidates, (-gain / cost, cost, d, size))
+            if accepted is None:
+                if fresh:
+                    break
+                #bounds may be stale, look at every candidate once more
+                fresh = True
+                continue
+            heapq.heappush(candidates, (-gain / cost, cost, d, size))
+            counts[accepted[0]] += accepted[1]
+            base = self.replay(counts)
+            fresh = False
+        return counts
+
+    def __plan(self, counts: "list[int]") -> FloatPlan:
+        value = sum(v * n for v, n in zip(self.__denominations, counts))
+        return FloatPlan(counts, self.replay(counts).get_failures(), value)
+
+    def optimize(self, budget: int, start: "list[int] | None" = None) -> FloatPlan:
+        """Returns a float worth at most 'budget' grosze (including the
+        'start' coins) with as few failed sales as the search finds."""
+        counts = [0] * len(self.__denominations) if start is None else list(start)
+        spent = sum(v * n for v, n in zip(self.__denominations, counts))
+        def stop(c: "list[int]", _: Replay, adding: int) -> bool:
+            return sum(v * n for v, n in zip(self.__denominations, c)) + adding > max(budget, spent)
+        return self.__plan(self.__improve(counts, stop))
+
+    def minimum_refill(self, current: "list[int]", targetRate: float) -> FloatPlan:
+        """Returns the coins to add to the 'current' float so that at most
+        'targetRate' of the sales fail, choosing cheap coins first. The
+        result's failures and value are those of the refilled float."""
+        allowed = int(targetRate * len(self.__sales))
+        def stop(_: "list[int]", base: Replay, adding: int) -> bool:
+            return adding == 0 and base.get_failures() <= allowed
+        counts = self.__improve(current, stop)
+        plan = self.__plan(counts)
+        return FloatPlan([n - k for n, k in zip(counts, current)], plan.failures, plan.value)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Finds a coin float for simulated sales.")
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--budget', type=int, default=20000, help="float value in grosze")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    prices = [rng.randint(150, 700) for _ in range(0, 21)]
+    sales = sales_from_customers(prices, make_customers(prices, args.customers, args.seed))
+    start = time.perf_counter()
+    optimizer = FloatOptimizer(sales)
+    plan = optimizer.optimize(args.budget)
+    elapsed = time.perf_counter() - start
+    default = optimizer.replay([10] * len(coin_values)).get_failures()
+    print(f"{len(sales)} sales, optimized in {elapsed:.2f}s")
+    print(f"default float (10 of each, {format_money(10 * sum(coin_values))}zl): {default} failures")
+    counts = ', '.join(f'{n}x{format_money(v)}' for v, n in zip(coin_values, plan.counts) if n > 0)
+    print(f"optimized float ({format_money(plan.value)}zl): {plan.failures} failures")
+    print(f"  {counts}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import random
+import time
+from typing import NamedTuple
+from ..automat.automat import *
+try:
+    import numpy
+except ImportError:
+    #the scalar simulator is used without NumPy
+    numpy = None
+
+#how often customers pick each denomination when tendering coins, indexed
+#like coin_values; most people pay with 1, 2 and 5zl coins
+default_coin_weights = [1, 1, 1, 2, 3, 4, 8, 8, 6]
+
+class CustomerStream(NamedTuple):
+    """Customers arriving at a machine: index of the chosen item and counts
+    of tendered coins (indexed like coin_values) for every customer. The
+    tendered value is never below the item price."""
+    items: "list[int]"
+    tendered: "list[list[int]]"
+
+class SimulationConfig(NamedTuple):
+    """Starting state of a simulated machine. Every 'restockEvery' customers
+    all items are restocked to 'stock' copies, 0 means never."""
+    coinCounts: "list[int]"
+    stock: int
+    restockEvery: int = 0
+
+class SimulationReport(NamedTuple):
+    """Outcome of a simulation run. 'firstStockOut' is the index of the
+    first customer who found the item sold out, -1 if nobody did."""
+    customers: int
+    sold: int
+    exactChangeOnly: int
+    noItemsLeft: int
+    revenue: int
+    firstStockOut: int
+
+    def get_exact_change_only_rate(self) -> float:
+        """Returns the share of customers refused because of missing change."""
+        return self.exactChangeOnly / self.customers if self.customers > 0 else 0.0
+
+def make_customers(prices: "list[int]", count: int, seed: int = 0, coinWeights: "list[int] | None" = None) -> CustomerStream:
+    """Generates customers choosing items uniformly and inserting random
+    coins until they have tendered at least the price."""
+    weights = default_coin_weights if coinWeights is None else coinWeights
+    if numpy is None:
+        rng = random.Random(seed)
+        items = [rng.randrange(len(prices)) for _ in range(0, count)]
+        tendered = []
+        for i in items:
+            counts = [0] * len(coin_values)
+            left = prices[i]
+            while left > 0:
+                d = rng.choices(range(0, len(coin_values)), weights)[0]
+                counts[d] += 1
+                left -= coin_values[d]
+            tendered.append(counts)
+        return CustomerStream(items, tendered)
+    rng = numpy.random.default_rng(seed)
+    values = numpy.array(coin_values)
+    p = numpy.array(weights, dtype=float) / sum(weights)
+    items = rng.integers(0, len(prices), count)
+    left = numpy.array(prices)[items]
+    counts = numpy.zeros((count, len(coin_values)), dtype=numpy.int64)
+    active = numpy.nonzero(left > 0)[0]
+    #every round adds a coin for all customers who haven't paid enough yet
+    while len(active) > 0:
+        d = rng.choice(len(coin_values), size=len(active), p=p)
+        counts[active, d] += 1
+        left[active] -= values[d]
+        active = active[left[active] > 0]
+    return CustomerStream(items.tolist(), counts.tolist())
+
+def make_automat(prices: "list[int]", config: SimulationConfig) -> Automat:
+    """Creates an automat in the configured starting state. Items are
+    numbered from 30."""
+    items = [(30 + i, f"Item {30 + i}", price, config.stock) for i, price in enumerate(prices)]
+    return Automat.from_state(AutomatState(tuple(coin_values), list(config.coinCounts), [], items))
+
+def simulate_scalar(prices: "list[int]", customers: CustomerStream, config: SimulationConfig) -> SimulationReport:
+    """Plays the customers on a real automat with pay_for_item. This is the
+    reference the vectorized simulator agrees with."""
+    a = make_automat(prices, config)
+    sold = exactChangeOnly = noItemsLeft = revenue = 0
+    firstStockOut = -1
+    for t, (i, counts) in enumerate(zip(customers.items, customers.tendered)):
+        if config.restockEvery > 0 and t > 0 and t % config.restockEvery == 0:
+            for n, _ in a.get_items_list():
+                a.restock(n, config.stock - a.get_item_details(n)[2])
+        for d, k in enumerate(counts):
+            for _ in range(0, k):
+                a.insert_coin(Coin(coin_values[d]))
+        try:
+            a.pay_for_item(30 + i)
+            sold += 1
+            revenue += prices[i]
+        except NoItemsLeftException:
+            a.return_inserted_coins()
+            noItemsLeft += 1
+            if firstStockOut < 0:
+                firstStockOut = t
+        except ExactChangeOnlyException:
+            a.return_inserted_coins()
+            exactChangeOnly += 1
+    return SimulationReport(len(customers.items), sold, exactChangeOnly, noItemsLeft, revenue, firstStockOut)
+
+def simulate_vectorized(prices: "list[int]", customers: CustomerStream, configs: "list[SimulationConfig]") -> "list[SimulationReport]":
+    """Plays the customers on all configurations at once, one customer per
+    step for every machine. Change is given greedily where that is what the
+    automat's change engine would do (canonical coins and no denomination
+    running out); the remaining machines fall back to the engine itself."""
+    denominations = tuple(coin_values)
+    values = numpy.array(denominations, dtype=numpy.int64)
+    engine = OptimalChangeEngine()
+    canonical = is_greedy_canonical(denominations)
+    n = len(configs)
+    coins = numpy.array([c.coinCounts for c in configs], dtype=numpy.int64).reshape(n, len(denominations))
+    startStock = numpy.array([c.stock for c in configs], dtype=numpy.int64)
+    stock = numpy.repeat(startStock[:, None], len(prices), axis=1)
+    restockEvery = numpy.array([c.restockEvery for c in configs], dtype=numpy.int64)
+    sold = numpy.zeros(n, dtype=numpy.int64)
+    exactChangeOnly = numpy.zeros(n, dtype=numpy.int64)
+    noItemsLeft = numpy.zeros(n, dtype=numpy.int64)
+    revenue = numpy.zeros(n, dtype=numpy.int64)
+    firstStockOut = numpy.full(n, -1, dtype=numpy.int64)
+    solved: "dict[tuple[int, ...], list[int] | None]" = {}
+    tenderedAll = numpy.array(customers.tendered, dtype=numpy.int64).reshape(-1, len(denominations))
+    for t, i in enumerate(customers.items):
+        if t > 0:
+            restocked = (restockEvery > 0) & (t % numpy.maximum(restockEvery, 1) == 0)
+            if restocked.any():
+                stock[restocked] = startStock[restocked, None]
+        tendered = tenderedAll[t]
+        price = prices[i]
+        inStock = stock[:, i] > 0
+        outOfStock = ~inStock
+        noItemsLeft += outOfStock
+        firstStockOut[outOfStock & (firstStockOut < 0)] = t
+        available = coins + tendered
+        amount = int(tendered @ values) - price
+        #greedy change for every machine
+        left = numpy.full(n, amount, dtype=numpy.int64)
+        limited = numpy.zeros(n, dtype=bool)
+        change = numpy.zeros_like(coins)
+        for d in range(len(denominations) - 1, -1, -1):
+            required = left // values[d]
+            take = numpy.minimum(required, available[:, d])
+            limited |= take < required
+            change[:, d] = take
+            left -= take * values[d]
+        paid = inStock & (left == 0) & ~limited if canonical else numpy.zeros(n, dtype=bool)
+        mask = (1 << (amount + 1)) - 1
+        rest = numpy.nonzero(inStock & ~paid)[0]
+        if len(rest) > 0:
+            #coins beyond what the amount could use don't change the result,
+            #so machines in similar states share solutions
+            capped = numpy.minimum(available[rest], amount // values)
+            states, which = numpy.unique(capped, axis=0, return_inverse=True)
+            found = numpy.zeros(len(states), dtype=bool)
+            for u, state in enumerate(states.tolist()):
+                key = (amount, *state)
+                if key not in solved:
+                    #most of these machines can't give change at all, which a
+                    #bitset of reachable amounts shows much faster than the solver
+                    bits = 1
+                    for v, k in zip(denominations, state):
+                        bits = add_reachable(bits, v, k, mask)
+                    solved[key] = engine.make_change(amount, denominations, state) if bits >> amount & 1 else None
+                exact = solved[key]
+                if exact is not None:
+                    states[u] = exact
+                    found[u] = True
+            which = which.reshape(-1)
+            ok = found[which]
+            change[rest[ok]] = states[which[ok]]
+            paid[rest[ok]] = True
+            exactChangeOnly[rest[~ok]] += 1
+        coins[paid] = available[paid] - change[paid]
+        stock[paid, i] -= 1
+        sold += paid
+        revenue += paid * price
+    return [SimulationReport(len(customers.items), int(sold[m]), int(exactChangeOnly[m]), int(noItemsLeft[m]), int(revenue[m]), int(firstStockOut[m]))
+        for m in range(0, n)]
+
+def simulate(prices: "list[int]", customers: CustomerStream, configs: "list[SimulationConfig]") -> "list[SimulationReport]":
+    """Plays the same customers on every configuration. Vectorized with
+    NumPy when it is installed, one automat at a time otherwise."""
+    if numpy is None:
+        return [simulate_scalar(prices, customers, c) for c in configs]
+    return simulate_vectorized(prices, customers, configs)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares starting coin floats and restock cadences.")
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=21)
+    parser.add_argument('--max-coins', type=int, default=30, help="largest float of each coin to try")
+    parser.add_argument('--stock', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    prices = [rng.randint(150, 700) for _ in range(0, args.items)]
+    customers = make_customers(prices, args.customers, args.seed)
+    configs = [SimulationConfig([k] * len(coin_values), args.stock, r)
+        for k in range(0, args.max_coins + 1) for r in [0, 250, 500, 1000]]
+    start = time.perf_counter()
+    reports = simulate(prices, customers, configs)
+    elapsed = time.perf_counter() - start
+    print(f"{len(configs)} configurations x {args.customers} customers in {elapsed:.2f}s"
+        f" ({'vectorized' if numpy is not None else 'scalar'})")
+    print(f"{'float':>6} {'restock':>8} {'exact change':>13} {'stock-out':>10} {'revenue':>10}")
+    for c, r in zip(configs, reports):
+        print(f"{c.coinCounts[0]:6} {c.restockEvery:8} {r.get_exact_change_only_rate():13.1%} {r.firstStockOut:10} {format_money(r.revenue):>10}")
+
+if __name__ == '__main__':
+    main()
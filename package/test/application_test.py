@@ -0,0 +1,156 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+import application
+from ..automat.automat import *
+from .helpers import *
+
+class RecordingView(application.View):
+    """Keeps the last texts and all popups."""
+    def __init__(self) -> None:
+        self.numberText = ''
+        self.coinText = ''
+        self.affordableText = ''
+        self.popups: "list[str]" = []
+
+    def set_number_text(self, text: str) -> None:
+        self.numberText = text
+
+    def set_coin_text(self, text: str) -> None:
+        self.coinText = text
+
+    def shows_affordable_text(self) -> bool:
+        return True
+
+    def set_affordable_text(self, text: str) -> None:
+        self.affordableText = text
+
+    def display_popup(self, text: str) -> None:
+        self.popups.append(text)
+
+class TestHeadlessHandler(unittest.TestCase):
+    def test_importDoesntNeedTkinter(self) -> None:
+        code = "import sys, application; application.AutomatHandler().on_number_btn_click(3); print('tkinter' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+        self.assertEqual(output.strip(), 'False')
+
+    def test_replaysScript(self) -> None:
+        view = RecordingView()
+        handler = application.AutomatHandler(make_automat(2, juiceAmount=0), view)
+        events = application.parse_script(['# buy water', 'coin 200 100', 'key 30', '', 'key 31', 'key 9', 'clear_coins'])
+        count = application.replay_script(handler, events)
+
+        self.assertEqual(count, 8)
+        self.assertEqual(view.popups[0], 'Bought item: Water\n\nChange was added\nback to your coins')
+        self.assertEqual(view.popups[1], 'Selected item: Juice\nPrice: 3.70zl\nAmount: 0')
+        self.assertEqual(view.popups[2], 'Returned 0.50zl')
+        self.assertEqual(view.numberText, '9')
+        self.assertEqual(view.coinText, '0.00')
+        self.assertEqual(handler.automat.lookup(30).amount, 1)
+
+    def test_defaultViewSkipsAffordableItems(self) -> None:
+        view = RecordingView()
+        application.AutomatHandler(make_automat(2, juiceAmount=0), view).on_coin_btn_click(500)
+        self.assertEqual(view.affordableText, 'You can buy: 30')
+
+        handler = application.AutomatHandler(make_automat(2, juiceAmount=0))
+        handler.on_coin_btn_click(500)
+        self.assertEqual(handler.automat.get_inserted_coins_value(), 500)
+
+    def test_repeatsScript(self) -> None:
+        handler = application.AutomatHandler(make_automat(2, juiceAmount=0))
+        events = application.parse_script(['coin 500', 'key 30', 'clear_coins'])
+        self.assertEqual(application.replay_script(handler, events, 3), 12)
+        #two items were in stock
+        self.assertEqual(handler.automat.lookup(30).amount, 0)
+        self.assertEqual(handler.automat.get_stored_coins_value(), 10 * sum(coin_values) + 500)
+
+    def test_recordedScriptReplaysTheSame(self) -> None:
+        lines = []
+        handler = application.AutomatHandler(make_automat(2, juiceAmount=0))
+        handler.recorder = lines.append
+        handler.on_coin_btn_click(200)
+        handler.on_coin_btn_click(50)
+        handler.on_number_btn_click(3)
+        handler.on_clear_number_btn_click()
+        handler.on_number_btn_click(3)
+        handler.on_number_btn_click(0)
+        handler.on_clear_coins_btn_click()
+
+        view = RecordingView()
+        replayed = application.AutomatHandler(make_automat(2, juiceAmount=0), view)
+        application.replay_script(replayed, application.parse_script(lines))
+        self.assertEqual(lines[:3], ['coin 200', 'coin 50', 'key 3'])
+        self.assertEqual(replayed.automat.export_state(), handler.automat.export_state())
+        self.assertEqual(view.popups[0], 'Bought item: Water\n\nChange was added\nback to your coins')
+
+    def test_invalidScript(self) -> None:
+        for line in ['coin 3', 'key', 'key 3a', 'clear_coins 1', 'dance']:
+            with self.assertRaises(application.InvalidScriptException):
+                application.parse_script(['key 30', line])
+
+    def test_main(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'script.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('coin 500\nkey 30\nclear_coins\n')
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(application.main(['--headless', path, '--repeat', '2', '--seed', '1']), 0)
+
+        self.assertTrue(output.getvalue().startswith('8 events in '))
+
+class TestBufferedFrontEnd(unittest.TestCase):
+    def test_coalescesUpdates(self) -> None:
+        view = application.BufferedView()
+        handler = application.AutomatHandler(make_automat(2, juiceAmount=0), view)
+        for _ in range(0, 5):
+            handler.on_coin_btn_click(100)
+        texts, popup = view.take_updates()
+
+        self.assertDictEqual(texts, { 'coin':'5.00', 'affordable':'You can buy: 30' })
+        self.assertIsNone(popup)
+        self.assertEqual(view.take_updates(), ({}, None))
+
+    def test_keepsLatestPopup(self) -> None:
+        view = application.BufferedView()
+        view.display_popup('first')
+        view.display_popup('second')
+
+        self.assertEqual(view.take_updates()[1], 'second')
+        self.assertIsNone(view.take_updates()[1])
+
+    def test_workerRunsCallbacksInOrder(self) -> None:
+        worker = application.HandlerWorker()
+        calls = []
+        worker.submit(lambda: calls.append(threading.current_thread()))
+        worker.submit(lambda: 1 / 0)
+        worker.submit(calls.append, 'after failure')
+        with contextlib.redirect_stderr(io.StringIO()):
+            worker.wait()
+        worker.close()
+
+        self.assertIsNot(calls[0], threading.current_thread())
+        self.assertEqual(calls[1], 'after failure')
+
+    def test_workerDrivesHandler(self) -> None:
+        view = application.BufferedView()
+        handler = application.AutomatHandler(make_automat(2, juiceAmount=0), view)
+        worker = application.HandlerWorker()
+        for callback, value in [(handler.on_coin_btn_click, 200), (handler.on_coin_btn_click, 50), (handler.on_number_btn_click, 3), (handler.on_number_btn_click, 0)]:
+            worker.submit(callback, value)
+        worker.close()
+        texts, popup = view.take_updates()
+
+        self.assertEqual(texts['number'], '')
+        self.assertEqual(popup, 'Bought item: Water\n\nChange was added\nback to your coins')
+        self.assertEqual(handler.automat.lookup(30).amount, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,13 @@
 import unittest
+import copy
+import random
 from ..automat.automat import *
 from ..automat.coin import *
 
-def sum_coins(coins: "list[Coin]") -> float:
+def sum_coins(coins: "list[Coin]") -> int:
     sum = 0
     for c in coins:
-        sum = round(sum + c.get_value(), 2)
+        sum += c.get_value()
     return sum
 
 class TestAutomatMethods(unittest.TestCase):
@@ -14,7 +16,7 @@ class TestAutomatMethods(unittest.TestCase):
         self.itemAmount = 5
         self.a = Automat(self.itemAmount)
         self.itemNumber = 30
-        self.itemPrice = 3
+        self.itemPrice = 300
         self.a._Automat__items[self.itemNumber].set_price(self.itemPrice)
 
     def test_returnsItemsList(self) -> None:
@@ -30,27 +32,27 @@ class TestAutomatMethods(unittest.TestCase):
         self.assertEqual(itemAmount, self.itemAmount)
 
     def test_addsCoins(self) -> None:
-        amountOf5zl = len(self.a._Automat__coins[5])
-        amountOf20gr = len(self.a._Automat__coins[0.2])
-        coins_to_add = [Coin(5), Coin(5), Coin(0.2)]
+        amountOf5zl = self.a._Automat__coins.get_count(500)
+        amountOf20gr = self.a._Automat__coins.get_count(20)
+        coins_to_add = [Coin(500), Coin(500), Coin(20)]
 
         self.a.add_coins(coins_to_add)
 
-        self.assertEqual(len(self.a._Automat__coins[5]), amountOf5zl + 2)
-        self.assertEqual(len(self.a._Automat__coins[0.2]), amountOf20gr + 1)
+        self.assertEqual(self.a._Automat__coins.get_count(500), amountOf5zl + 2)
+        self.assertEqual(self.a._Automat__coins.get_count(20), amountOf20gr + 1)
 
     def test_returnsChange(self) -> None:
-        coinsValue = 17.37
-        price = 10
-        expected = round(coinsValue - price, 2)
+        coinsValue = 1737
+        price = 1000
+        expected = coinsValue - price
 
-        change = self.a._Automat__get_change(coinsValue, price)
-        sum = sum_coins(change)
+        change = self.a._Automat__get_change(coinsValue, price, [0] * len(coin_values))
+        sum = sum_coins(self.a._Automat__coins.make_coins(change))
 
         self.assertEqual(sum, expected)
 
     def test_returnsNoCoinsWhenRequiredAmountPaid(self) -> None:
-        testCoins = [Coin(2), Coin(1)]
+        testCoins = [Coin(200), Coin(100)]
 
         for c in testCoins:
             self.a.insert_coin(c)
@@ -60,7 +62,7 @@ class TestAutomatMethods(unittest.TestCase):
         self.assertListEqual(coins, [])
 
     def test_consumesCoinsWhenRequiredAmountPaid(self) -> None:
-        testCoins = [Coin(2), Coin(1)]
+        testCoins = [Coin(200), Coin(100)]
 
         for c in testCoins:
             self.a.insert_coin(c)
@@ -70,7 +72,7 @@ class TestAutomatMethods(unittest.TestCase):
         self.assertEqual(self.a.get_inserted_coins_value(), 0)
 
     def test_returnsCoinsWhenPaidTooMuch(self) -> None:
-        testCoins = [Coin(2), Coin(2)]
+        testCoins = [Coin(200), Coin(200)]
 
         for c in testCoins:
             self.a.insert_coin(c)
@@ -78,17 +80,129 @@ class TestAutomatMethods(unittest.TestCase):
         coins, item = self.a.pay_for_item(self.itemNumber)
         sum = sum_coins(coins)
 
-        self.assertEqual(sum, 1)
+        self.assertEqual(sum, 100)
+
+    def test_returnsChangeWhenGreedyFails(self) -> None:
+        a = Automat(self.itemAmount)
+        a._Automat__items[self.itemNumber].set_price(240)
+        #only 2zl, 1zl, one 50gr and three 20gr coins are left in the automat
+        a._Automat__coins.remove_counts([10, 10, 10, 10, 7, 9, 0, 0, 10])
+        a.insert_coin(Coin(200))
+        a.insert_coin(Coin(100))
+
+        change, item = a.pay_for_item(self.itemNumber)
+
+        #greedy would give 50gr first and get stuck at 10gr
+        self.assertEqual(sum_coins(change), 60)
+
+    def test_keepsStateWhenChangeCannotBeGiven(self) -> None:
+        a = Automat(self.itemAmount)
+        a._Automat__items[self.itemNumber].set_price(self.itemPrice)
+        a._Automat__coins.remove_counts([10] * len(coin_values))
+        a.insert_coin(Coin(500))
+
+        with self.assertRaises(ExactChangeOnlyException):
+            a.pay_for_item(self.itemNumber)
+
+        self.assertEqual(a.get_inserted_coins_value(), 500)
+        self.assertEqual(a._Automat__coins.get_value(), 0)
+        self.assertEqual(a.get_item_details(self.itemNumber)[2], self.itemAmount)
+
+    def test_checksIfChangeCanBeGiven(self) -> None:
+        a = Automat(self.itemAmount)
+        a._Automat__coins.remove_counts([10, 10, 10, 10, 7, 9, 0, 0, 10])
+        a.add_coins([])
+
+        self.assertTrue(a.can_give_change(60))
+        self.assertFalse(a.can_give_change(30))
+
+        a.insert_coin(Coin(10))
+
+        self.assertTrue(a.can_give_change(30))
+
+    def test_returnsExactChangeOnlyItems(self) -> None:
+        self.assertListEqual(self.a.get_exact_change_only_items(), [])
+
+        self.a._Automat__coins.remove_counts([10, 10, 10, 10, 10, 10, 10, 10, 10])
+        self.a.add_coins([])
+
+        self.assertTrue(self.a.is_exact_change_only(self.itemNumber))
+        self.assertEqual(len(self.a.get_exact_change_only_items()), 21)
+
+        #exact amount inserted
+        self.a.insert_coin(Coin(200))
+        self.a.insert_coin(Coin(100))
+
+        self.assertFalse(self.a.is_exact_change_only(self.itemNumber))
+
+    def test_paysForBatchOfOrders(self) -> None:
+        a = Automat(1)
+        a._Automat__items[self.itemNumber].set_price(self.itemPrice)
+        startValue = a.get_stored_coins_value()
+        orders = [
+            (self.itemNumber, [Coin(500)]),
+            (self.itemNumber, [Coin(500)]),
+            (55, [Coin(100)]),
+            (31, [Coin(1)]),
+        ]
+
+        results = a.pay_for_items(orders)
+
+        statuses = [r.status for r in results]
+        self.assertListEqual(statuses, [PurchaseStatus.OK, PurchaseStatus.NO_ITEMS_LEFT,
+            PurchaseStatus.INVALID_ITEM_NUMBER, PurchaseStatus.NOT_ENOUGH_MONEY])
+        self.assertEqual(sum_coins(results[0].coins), 200)
+        self.assertListEqual(results[1].coins, [Coin(500)])
+        self.assertEqual(a.get_item_details(self.itemNumber)[2], 0)
+        self.assertEqual(a.get_stored_coins_value(), startValue + self.itemPrice)
+
+    def test_batchMatchesSeparatePurchases(self) -> None:
+        rng = random.Random(3)
+        orders = [(rng.randint(29, 51), [Coin(rng.choice(coin_values)) for _ in range(0, rng.randint(0, 6))]) for _ in range(0, 300)]
+        a = Automat(3)
+        b = copy.deepcopy(a)
+
+        results = a.pay_for_items(orders)
+
+        for (itemNumber, coins), result in zip(orders, results):
+            for c in coins:
+                b.insert_coin(c)
+            try:
+                change, item = b.pay_for_item(itemNumber)
+                self.assertEqual(result.status, PurchaseStatus.OK)
+                self.assertListEqual(change, result.coins)
+            except (InvalidItemNumberException, NotEnoughMoneyException, NoItemsLeftException, ExactChangeOnlyException):
+                self.assertNotEqual(result.status, PurchaseStatus.OK)
+                b.return_inserted_coins()
+        self.assertEqual(a.get_stored_coins_value(), b.get_stored_coins_value())
+
+    def test_looksUpItem(self) -> None:
+        self.assertEqual(self.a.lookup(self.itemNumber).price, self.itemPrice)
+        self.assertEqual(self.a.lookup(55).status, PurchaseStatus.INVALID_ITEM_NUMBER)
+
+    def test_triesToPay(self) -> None:
+        self.a.insert_coin(Coin(200))
+
+        result = self.a.try_pay(self.itemNumber)
+
+        self.assertEqual(result.status, PurchaseStatus.NOT_ENOUGH_MONEY)
+        self.assertEqual(result.required, self.itemPrice)
+
+        self.a.insert_coin(Coin(200))
+        result = self.a.try_pay(self.itemNumber)
+
+        self.assertEqual(result.status, PurchaseStatus.OK)
+        self.assertEqual(sum_coins(result.change), 100)
 
     def test_insertsCoins(self) -> None:
-        coinToAdd = Coin(5)
+        coinToAdd = Coin(500)
 
         self.a.insert_coin(coinToAdd)
 
-        self.assertListEqual(self.a._Automat__inserted_coins, [coinToAdd])
+        self.assertListEqual(self.a._Automat__escrow.get_coins(), [coinToAdd])
 
     def test_returnsInsertedCoinsValue(self) -> None:
-        coinValue = 5
+        coinValue = 500
         coinToAdd = Coin(coinValue)
 
         self.a.insert_coin(coinToAdd)
@@ -96,20 +210,20 @@ class TestAutomatMethods(unittest.TestCase):
         self.assertEqual(self.a.get_inserted_coins_value(), coinValue)
 
     def test_returnsInsertedCoin(self) -> None:
-        coinValue = 5
+        coinValue = 500
         coinToAdd = Coin(coinValue)
 
         self.a.insert_coin(coinToAdd)
         self.a.return_inserted_coins()
 
-        self.assertEqual(self.a._Automat__inserted_coins, [])
+        self.assertEqual(self.a._Automat__escrow.get_coins(), [])
 
     def test_getCoinsValue(self) -> None:
-        coins = [Coin(5), Coin(0.1), Coin(0.02)]
+        coins = [Coin(500), Coin(10), Coin(2)]
 
         value = get_coins_value(coins)
 
-        self.assertEqual(value, 5.12)
+        self.assertEqual(value, 512)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from ..benchmark.suite import *
+
+class TestBenchmarkBaseline(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'baseline.json')
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+        super().tearDown()
+
+    def test_savesAndLoadsResults(self) -> None:
+        results = { 'fetch_item': 1.5, 'get_change.float_10': 20.25 }
+        save_results(self.path, results)
+
+        self.assertDictEqual(load_results(self.path), results)
+
+    def test_comparesWithBaseline(self) -> None:
+        save_results(self.path, { 'fetch_item': 1.0, 'insert_coin': 2.0, 'removed': 3.0 })
+        rows = compare({ 'fetch_item': 1.1, 'insert_coin': 2.5, 'added': 1.0 }, load_results(self.path), 0.2)
+
+        self.assertListEqual(rows, [('fetch_item', 1.0, 1.1, False), ('insert_coin', 2.0, 2.5, True)])
+
+    def test_failsOnRegression(self) -> None:
+        save_results(self.path, { 'fetch_item': 1e-6 })
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            code = main(['--filter', 'fetch_item', '--scale', '0.01', '--baseline', self.path])
+
+        self.assertEqual(code, 1)
+        self.assertIn('REGRESSION', output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from ..automat.automat import *
+
+class TestCatalogLoading(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+        super().tearDown()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_loadsCsv(self) -> None:
+        path = self.write('items.csv', 'number,name,price,stock\n30,Water,250,4\n31,Juice,390,0\n')
+        catalog = load_catalog(path)
+
+        self.assertEqual(len(catalog), 2)
+        self.assertEqual(catalog[30].get_name(), 'Water')
+        self.assertEqual(catalog[30].get_price(), 250)
+        self.assertEqual(catalog[31].get_amount(), 0)
+
+    def test_loadsJsonLines(self) -> None:
+        path = self.write('items.jsonl', '{"number": 7, "name": "Tea", "price": 300, "stock": 2}\n\n')
+        catalog = load_catalog(path)
+
+        self.assertEqual(catalog[7].get_name(), 'Tea')
+        self.assertEqual(catalog.get_number_length(), 1)
+
+    def test_reportsBadLine(self) -> None:
+        path = self.write('items.csv', 'number,name,price,stock\n30,Water,250,4\n31,Juice,abc,1\n')
+
+        with self.assertRaisesRegex(InvalidCatalogException, 'line 3'):
+            load_catalog(path)
+
+    def test_reportsRawLineNumbers(self) -> None:
+        path = self.write('items.jsonl', '{"number": 7, "name": "Tea", "price": 300, "stock": 2}\n\n\n{"number": 8, "name": "Coffee", "price": 300}\n')
+        with self.assertRaisesRegex(InvalidCatalogException, 'line 4'):
+            load_catalog(path)
+
+        path = self.write('items.csv', 'number,name,price,stock\n\n30,Water,250,4\n\n31,Juice,x,1\n')
+        with self.assertRaisesRegex(InvalidCatalogException, 'line 5'):
+            load_catalog(path)
+
+    def test_rejectsNegativePriceAndStock(self) -> None:
+        path = self.write('items.csv', 'number,name,price,stock\n30,Water,250,4\n31,Juice,-390,1\n')
+        with self.assertRaisesRegex(InvalidCatalogException, 'line 3'):
+            load_catalog(path)
+
+        path = self.write('items.jsonl', '{"number": 7, "name": "Tea", "price": 300, "stock": -2}\n')
+        with self.assertRaisesRegex(InvalidCatalogException, 'line 1'):
+            load_catalog(path)
+
+    def test_rejectsDuplicates(self) -> None:
+        path = self.write('items.csv', 'number,name,price,stock\n30,Water,250,4\n30,Juice,390,1\n')
+
+        with self.assertRaises(DuplicateItemNumberException):
+            load_catalog(path)
+
+    def test_buildsAutomat(self) -> None:
+        path = self.write('items.csv', 'number,name,price,stock\n1001,Water,250,4\n')
+        a = Automat.from_catalog(path)
+        a.insert_coin(Coin(500))
+
+        result = a.try_pay(1001)
+
+        self.assertEqual(result.status, PurchaseStatus.OK)
+        self.assertEqual(a.get_item_number_length(), 4)
+
+class TestCatalogStorage(unittest.TestCase):
+    def info(self, name: str) -> ItemInfo:
+        return ItemInfo(100, 1, Item(name))
+
+    def test_keepsContiguousNumbersDense(self) -> None:
+        catalog = Catalog((n, self.info(str(n))) for n in range(30, 51))
+
+        self.assertTrue(catalog.is_dense())
+        self.assertNotIn(29, catalog)
+        self.assertEqual(catalog[50].get_name(), '50')
+
+    def test_switchesSparseNumbersToDictionary(self) -> None:
+        catalog = Catalog([(1, self.info('a')), (1000000, self.info('b'))])
+
+        self.assertFalse(catalog.is_dense())
+        self.assertEqual(catalog[1000000].get_name(), 'b')
+        self.assertIsNone(catalog.get(2))
+
+    def test_viewKeepsInsertionOrder(self) -> None:
+        catalog = Catalog([(5, self.info('a')), (3, self.info('b')), (4, self.info('c'))])
+        view = ItemsListView(catalog)
+
+        self.assertEqual(len(view), 3)
+        self.assertEqual(view[1], (3, 'b'))
+        self.assertListEqual(list(view), [(5, 'a'), (3, 'b'), (4, 'c')])
+        self.assertListEqual(view[1:], [(3, 'b'), (4, 'c')])
+
+    def test_handlesManyItems(self) -> None:
+        catalog = Catalog((n, self.info('x')) for n in range(100000, 200000))
+
+        self.assertEqual(len(catalog), 100000)
+        self.assertTrue(catalog.is_dense())
+        self.assertEqual(catalog.get_number_length(), 6)
+        self.assertIn(199999, catalog)
+
+if __name__ == '__main__':
+    unittest.main()
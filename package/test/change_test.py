@@ -0,0 +1,78 @@
+import unittest
+import random
+from ..automat.change import *
+from ..automat.coin import *
+
+denominations = tuple(coin_values)
+
+class TestChangeFunctions(unittest.TestCase):
+    def test_detectsCanonicalSystem(self) -> None:
+        self.assertTrue(is_greedy_canonical(denominations))
+
+    def test_detectsNonCanonicalSystem(self) -> None:
+        self.assertFalse(is_greedy_canonical((1, 3, 4)))
+        self.assertFalse(is_greedy_canonical((2, 5, 10)))
+
+    def test_checksSystemsWithoutOneInUnits(self) -> None:
+        self.assertTrue(is_greedy_canonical((5, 10, 20, 50, 100, 200, 500)))
+        self.assertFalse(is_greedy_canonical((10, 30, 40)))
+
+class TestChangeEngines(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.greedy = GreedyChangeEngine()
+        self.optimal = OptimalChangeEngine()
+
+    def test_baseEngineIsAbstract(self) -> None:
+        with self.assertRaises(TypeError):
+            ChangeEngine()
+
+    def test_greedyFailsWithLimitedCoins(self) -> None:
+        available = [0, 0, 0, 0, 3, 1, 0, 0, 0]
+
+        self.assertIsNone(self.greedy.make_change(60, denominations, available))
+
+    def test_optimalFindsChangeWithLimitedCoins(self) -> None:
+        available = [0, 0, 0, 0, 3, 1, 0, 0, 0]
+
+        change = self.optimal.make_change(60, denominations, available)
+
+        self.assertListEqual(change, [0, 0, 0, 0, 3, 0, 0, 0, 0])
+
+    def test_optimalReturnsNoneWhenImpossible(self) -> None:
+        available = [0, 0, 0, 0, 3, 1, 0, 0, 0]
+
+        self.assertIsNone(self.optimal.make_change(30, denominations, available))
+
+    def test_optimalUsesFewestCoins(self) -> None:
+        change = self.optimal.make_change(6, (1, 3, 4), [10, 10, 10])
+
+        self.assertListEqual(change, [0, 2, 0])
+
+    def test_optimalMatchesBruteForce(self) -> None:
+        rng = random.Random(7)
+        coins = (1, 3, 4, 10)
+        for _ in range(0, 200):
+            available = [rng.randint(0, 3) for _ in coins]
+            amount = rng.randint(1, 40)
+            #enumerate all coin combinations
+            fewest = None
+            for a in range(0, available[0] + 1):
+                for b in range(0, available[1] + 1):
+                    for c in range(0, available[2] + 1):
+                        for d in range(0, available[3] + 1):
+                            if a + 3 * b + 4 * c + 10 * d == amount and (fewest is None or a + b + c + d < fewest):
+                                fewest = a + b + c + d
+
+            change = self.optimal.make_change(amount, coins, available)
+
+            if fewest is None:
+                self.assertIsNone(change)
+            else:
+                self.assertEqual(sum(v * n for v, n in zip(coins, change)), amount)
+                self.assertEqual(sum(change), fewest)
+                for n, limit in zip(change, available):
+                    self.assertLessEqual(n, limit)
+
+if __name__ == '__main__':
+    unittest.main()
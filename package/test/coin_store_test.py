@@ -0,0 +1,52 @@
+import unittest
+from ..automat.coin_store import *
+
+class TestCoinStoreMethods(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.store = CoinStore(coin_values, 10)
+
+    def test_returnsCount(self) -> None:
+        self.assertEqual(self.store.get_count(20), 10)
+
+    def test_returnsValue(self) -> None:
+        self.assertEqual(self.store.get_value(), 10 * sum(coin_values))
+
+    def test_addsCoins(self) -> None:
+        self.store.add(500, 1000)
+
+        self.assertEqual(self.store.get_count(500), 1010)
+
+    def test_removesCoins(self) -> None:
+        self.store.remove(5, 4)
+
+        self.assertEqual(self.store.get_count(5), 6)
+
+    def test_raisesNotEnoughCoinsException(self) -> None:
+        with self.assertRaises(NotEnoughCoinsException):
+            self.store.remove(5, 11)
+
+    def test_raisesInvalidCoinValueException(self) -> None:
+        with self.assertRaises(InvalidCoinValueException):
+            self.store.add(3)
+
+    def test_removesNothingWhenBulkRemoveFails(self) -> None:
+        counts = [0] * len(coin_values)
+        counts[0] = 1
+        counts[-1] = 11
+
+        with self.assertRaises(NotEnoughCoinsException):
+            self.store.remove_counts(counts)
+        self.assertEqual(self.store.get_counts(), [10] * len(coin_values))
+
+    def test_countsAndMakesCoins(self) -> None:
+        coins = [Coin(500), Coin(1), Coin(500)]
+
+        counts = self.store.count_coins(coins)
+
+        self.assertEqual(counts[0], 1)
+        self.assertEqual(counts[-1], 2)
+        self.assertListEqual(self.store.make_coins(counts), [Coin(500), Coin(500), Coin(1)])
+
+if __name__ == '__main__':
+    unittest.main()
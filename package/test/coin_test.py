@@ -3,26 +3,35 @@ from ..automat.coin import *
 
 class TestCoinMethods(unittest.TestCase):
     def test_eqOperatorFalse(self) -> None:
-        c1 = Coin(0.01)
-        c2 = Coin(0.2)
+        c1 = Coin(1)
+        c2 = Coin(20)
 
         self.assertFalse(c1 == c2)
 
     def test_eqOperatorTrue(self) -> None:
-        c1 = Coin(0.2)
-        c2 = Coin(0.2)
+        c1 = Coin(20)
+        c2 = Coin(20)
 
         self.assertTrue(c1 == c2)
 
     def test_returnsValue(self) -> None:
-        coinValue = 2
+        coinValue = 200
         c = Coin(coinValue)
 
         self.assertEqual(c.get_value(), coinValue)
 
     def test_raisesInvalidCoinValueException(self) -> None:
         with self.assertRaises(InvalidCoinValueException):
-            coin = Coin(0.88)
+            coin = Coin(88)
+
+    def test_sharesInstances(self) -> None:
+        self.assertIs(Coin(50), Coin(50))
+
+    def test_isImmutable(self) -> None:
+        c = Coin(50)
+
+        with self.assertRaises(AttributeError):
+            c._Coin__value = 500
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import unittest
+import threading
+from ..automat.automat import *
+
+class TestConcurrentAutomat(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.itemAmount = 50
+        self.a = Automat(self.itemAmount, threadSafe=True)
+        self.itemNumber = 30
+        self.a._Automat__items[self.itemNumber].set_price(300)
+
+    def buy(self, count: int, bought: list) -> None:
+        """Buys the item 'count' times in its own session, paying with 5zl."""
+        session = self.a.open_session()
+        for _ in range(0, count):
+            self.a.insert_coin(Coin(500), session)
+            try:
+                change, item = self.a.pay_for_item(self.itemNumber, session)
+                bought.append(get_coins_value(change))
+            except (NoItemsLeftException, ExactChangeOnlyException):
+                self.a.return_inserted_coins(session)
+
+    def test_keepsSessionsSeparate(self) -> None:
+        first = self.a.open_session()
+        second = self.a.open_session()
+
+        self.a.insert_coin(Coin(500), first)
+        self.a.insert_coin(Coin(20), second)
+
+        self.assertEqual(self.a.get_inserted_coins_value(first), 500)
+        self.assertEqual(self.a.get_inserted_coins_value(second), 20)
+        self.assertEqual(self.a.get_inserted_coins_value(), 0)
+
+    def test_conservesMoneyAndStock(self) -> None:
+        startValue = self.a.get_stored_coins_value()
+        bought = []
+        threads = [threading.Thread(target=self.buy, args=(20, bought)) for _ in range(0, 8)]
+
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        amount = self.a.get_item_details(self.itemNumber)[2]
+        self.assertEqual(amount, self.itemAmount - len(bought))
+        self.assertTrue(all(change == 200 for change in bought))
+        self.assertEqual(self.a.get_stored_coins_value(), startValue + 300 * len(bought))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from ..automat.automat import *
+from .helpers import *
+
+class TestDenominationSet(unittest.TestCase):
+    def test_sharesInstances(self) -> None:
+        d = DenominationSet.get([500, 1, 2, 5, 10, 20, 50, 100, 200])
+
+        self.assertIs(d, DenominationSet.get(coin_values))
+        self.assertTupleEqual(d.get_values(), tuple(coin_values))
+        self.assertEqual(d.get_index(50), 5)
+        self.assertIn(200, d)
+        self.assertNotIn(3, d)
+        self.assertTrue(d.is_greedy_canonical())
+        self.assertEqual(d.get_top_up_mask(), (1 << 500) - 1)
+
+    def test_raisesForInvalidValues(self) -> None:
+        for values in [(), (1, 1, 2), (0, 5), (-1, 5)]:
+            with self.assertRaises(InvalidDenominationsException):
+                DenominationSet.get(values)
+        with self.assertRaises(InvalidCoinValueException):
+            DenominationSet.get(coin_values).get_index(3)
+
+    def test_checksSystem(self) -> None:
+        d = DenominationSet.get((5, 10, 20, 50, 100, 200, 500))
+        self.assertEqual(d.get_unit(), 5)
+        self.assertTrue(d.is_greedy_canonical())
+        self.assertEqual(d.get_top_up_mask(), sum(1 << a for a in range(0, 500, 5)))
+        self.assertFalse(DenominationSet.get((1, 3, 4)).is_greedy_canonical())
+
+    def test_allowsCoinsOfTheSet(self) -> None:
+        DenominationSet.get((1, 25, 100))
+        self.assertEqual(Coin(25).get_value(), 25)
+
+class TestAutomatDenominations(unittest.TestCase):
+    def make_automat(self, denominations: "tuple[int, ...]") -> Automat:
+        return make_automat(5, 2, prices=(250, 330), denominations=denominations)
+
+    def test_refusesCoinsOutsideTheSet(self) -> None:
+        a = self.make_automat((5, 10, 20, 50, 100, 200, 500))
+
+        self.assertTupleEqual(a.get_denominations(), (5, 10, 20, 50, 100, 200, 500))
+        with self.assertRaises(InvalidCoinValueException):
+            a.insert_coin(Coin(2))
+        self.assertEqual(a.get_inserted_coins_value(), 0)
+
+    def test_givesChangeWithoutSmallCoins(self) -> None:
+        a = self.make_automat((5, 10, 20, 50, 100, 200, 500))
+        a.insert_coin(Coin(500))
+
+        self.assertFalse(a.is_exact_change_only(30))
+        change, _ = a.pay_for_item(30)
+        self.assertListEqual(change, [Coin(200), Coin(50)])
+        self.assertEqual(a.get_stored_coins_value(), 2 * 885 + 250)
+
+    def test_givesFewestCoinsInNonCanonicalSystem(self) -> None:
+        a = self.make_automat((1, 25, 100, 120))
+        a.insert_coin(Coin(120))
+        a.insert_coin(Coin(120))
+        a.insert_coin(Coin(120))
+        a.insert_coin(Coin(120))
+        #greedy would give 120 + 25 + 5 x 1
+        change, _ = a.pay_for_item(31)
+        self.assertListEqual(change, [Coin(100), Coin(25), Coin(25)])
+
+    def test_batchRefusesOnlyOrdersWithCoinsOutsideTheSet(self) -> None:
+        a = self.make_automat((5, 10, 20, 50, 100, 200, 500))
+        results = a.pay_for_items([(30, [Coin(200), Coin(50)]), (30, [Coin(200), Coin(1)]), (31, [Coin(500)])])
+
+        self.assertListEqual([r.status for r in results], [PurchaseStatus.OK, PurchaseStatus.INVALID_COIN, PurchaseStatus.OK])
+        self.assertListEqual(results[1].coins, [Coin(200), Coin(1)])
+        self.assertEqual(a.get_stored_coins_value(), 2 * 885 + 250 + 330)
+        self.assertEqual(a.lookup(30).amount, 4)
+
+    def test_keepsDenominationsInState(self) -> None:
+        a = self.make_automat((1, 25, 100))
+        b = Automat.from_state(a.export_state())
+
+        self.assertTupleEqual(b.get_denominations(), (1, 25, 100))
+
+if __name__ == '__main__':
+    unittest.main()
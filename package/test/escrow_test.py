@@ -0,0 +1,30 @@
+import unittest
+from ..automat.escrow import *
+
+class TestEscrowMethods(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.escrow = Escrow()
+        for c in [Coin(500), Coin(20), Coin(500)]:
+            self.escrow.insert(c)
+
+    def test_returnsValue(self) -> None:
+        self.assertEqual(self.escrow.get_value(), 1020)
+
+    def test_returnsCounts(self) -> None:
+        counts = self.escrow.get_counts()
+
+        self.assertEqual(counts[coin_values.index(500)], 2)
+        self.assertEqual(counts[coin_values.index(20)], 1)
+        self.assertEqual(sum(counts), 3)
+
+    def test_takesCoins(self) -> None:
+        coins = self.escrow.take_coins()
+
+        self.assertListEqual(coins, [Coin(500), Coin(20), Coin(500)])
+        self.assertEqual(self.escrow.get_value(), 0)
+        self.assertEqual(sum(self.escrow.get_counts()), 0)
+        self.assertListEqual(self.escrow.get_coins(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from ..automat.feasibility import *
+
+denominations = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class TestFeasibilityFunctions(unittest.TestCase):
+    def test_addsReachableAmounts(self) -> None:
+        bits = add_reachable(1, 20, 3, (1 << 101) - 1)
+
+        self.assertEqual(bits, 1 | 1 << 20 | 1 << 40 | 1 << 60)
+
+class TestChangeFeasibilityIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.counts = [0, 0, 0, 0, 3, 1, 0, 0, 0]
+        self.index = ChangeFeasibilityIndex(denominations, self.counts)
+
+    def test_checksReachableAmounts(self) -> None:
+        self.assertTrue(self.index.is_reachable(0))
+        self.assertTrue(self.index.is_reachable(60))
+        self.assertTrue(self.index.is_reachable(110))
+        self.assertFalse(self.index.is_reachable(30))
+        self.assertFalse(self.index.is_reachable(120))
+
+    def test_updatesAfterCountsChange(self) -> None:
+        self.counts[3] = 1
+        self.index.update(self.counts)
+
+        self.assertTrue(self.index.is_reachable(30))
+
+        self.counts[4] = 0
+        self.index.update(self.counts)
+
+        self.assertFalse(self.index.is_reachable(40))
+        self.assertTrue(self.index.is_reachable(60))
+
+    def test_checksReachableAmountsWithExtraCoins(self) -> None:
+        extra = [0, 0, 0, 1, 0, 0, 0, 0, 0]
+
+        self.assertTrue(self.index.is_reachable(30, extra))
+        self.assertFalse(self.index.is_reachable(30))
+
+    def test_matchesRecomputedIndex(self) -> None:
+        counts = [2, 0, 1, 4, 0, 2, 1, 0, 3]
+        self.index.update(counts)
+
+        fresh = ChangeFeasibilityIndex(denominations, counts)
+
+        self.assertEqual(self.index.get_reachable(), fresh.get_reachable())
+
+if __name__ == '__main__':
+    unittest.main()
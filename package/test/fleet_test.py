@@ -0,0 +1,42 @@
+import unittest
+from ..fleet.fleet import *
+
+class TestFleet(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.ids = [f"m{i}" for i in range(0, 6)]
+        self.fleet = Fleet(self.ids, shards=2, amountOfEachItem=3)
+
+    def tearDown(self) -> None:
+        self.fleet.close()
+        super().tearDown()
+
+    def test_sumsFleetWide(self) -> None:
+        self.assertEqual(self.fleet.get_shard_count(), 2)
+        self.assertEqual(self.fleet.get_stock_totals()[30], 3 * len(self.ids))
+        self.assertEqual(self.fleet.get_float_total(), 10 * sum(coin_values) * len(self.ids))
+        self.assertListEqual(self.fleet.get_exact_change_only_machines(), [])
+
+    def test_routesOperationsByMachine(self) -> None:
+        price = self.fleet.call('m1', 'lookup', 30).price
+        results = self.fleet.execute([('m1', 'buy', (30, [500, 500])), ('m4', 'buy', (31, [1])), ('m1', 'lookup', (30, ))])
+
+        self.assertEqual(results[0][0], PurchaseStatus.OK)
+        self.assertEqual(sum(results[0][1]), 1000 - price)
+        self.assertEqual(results[1], (PurchaseStatus.NOT_ENOUGH_MONEY, [1]))
+        self.assertEqual(results[2].amount, 2)
+        self.assertEqual(self.fleet.get_stock_totals()[30], 3 * len(self.ids) - 1)
+        self.assertEqual(self.fleet.get_float_total(), 10 * sum(coin_values) * len(self.ids) + price)
+
+    def test_reportsFailures(self) -> None:
+        with self.assertRaises(FleetOperationException):
+            self.fleet.call('m2', 'insert_coin', 3)
+        with self.assertRaises(FleetOperationException):
+            self.fleet.call('m9', 'lookup', 30)
+        with self.assertRaises(FleetOperationException):
+            self.fleet.call('m2', 'explode')
+        #the workers keep serving after a failure
+        self.assertEqual(self.fleet.call('m2', 'return_inserted_coins'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import random
+import tempfile
+import unittest
+from ..simulation.float_optimizer import *
+
+class TestFloatOptimizer(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.prices = [150, 230, 370, 410, 695]
+        self.sales = sales_from_customers(self.prices, make_customers(self.prices, 200, 3))
+        self.optimizer = FloatOptimizer(self.sales)
+
+    def test_countsFailuresLikeReplay(self) -> None:
+        rng = random.Random(5)
+        for _ in range(0, 20):
+            counts = [rng.randint(0, 5) for _ in coin_values]
+            extra = [rng.choice([0, 0, 1, 3]) for _ in coin_values]
+            base = self.optimizer.replay(counts)
+            expected = self.optimizer.replay([n + k for n, k in zip(counts, extra)]).get_failures()
+
+            self.assertEqual(self.optimizer.count_failures(base, extra), expected)
+
+    def test_replayAgreesWithSimulator(self) -> None:
+        counts = [3] * len(coin_values)
+        report = simulate_scalar(self.prices, make_customers(self.prices, 200, 3), SimulationConfig(counts, 1000))
+
+        self.assertEqual(self.optimizer.replay(counts).get_failures(), report.exactChangeOnly)
+
+    def test_staysWithinBudget(self) -> None:
+        plan = self.optimizer.optimize(3000)
+
+        self.assertLessEqual(plan.value, 3000)
+        self.assertEqual(plan.value, sum(v * n for v, n in zip(coin_values, plan.counts)))
+        self.assertLess(plan.failures, self.optimizer.replay([0] * len(coin_values)).get_failures())
+
+    def test_findsMinimumRefill(self) -> None:
+        current = [1] * len(coin_values)
+        plan = self.optimizer.minimum_refill(current, 0.05)
+        refilled = [n + k for n, k in zip(current, plan.counts)]
+
+        self.assertLessEqual(plan.failures, 0.05 * len(self.sales))
+        self.assertEqual(self.optimizer.replay(refilled).get_failures(), plan.failures)
+        self.assertTrue(all(n >= 0 for n in plan.counts))
+
+    def test_readsSalesFromJournal(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            a = Automat.open_journaled(directory)
+            a._Automat__items[30].set_price(350)
+            a.insert_coin(Coin(500))
+            a.pay_for_item(30)
+            #no change left, the next purchases are refused
+            a._Automat__coins.clear()
+            a.insert_coin(Coin(200))
+            a.insert_coin(Coin(200))
+            a.try_pay(30)
+            a.pay_for_items([(30, [Coin(500)])])
+            a.get_journal().close()
+
+            sales = sales_from_journal(directory)
+
+        self.assertEqual(len(sales), 3)
+        self.assertEqual(sales[0].price, 350)
+        self.assertEqual(sales[0].tendered[coin_values.index(500)], 1)
+        self.assertEqual(sales[1], Sale(350, [2 if v == 200 else 0 for v in coin_values]))
+        self.assertEqual(sales[2], Sale(350, [1 if v == 500 else 0 for v in coin_values]))
+
+if __name__ == '__main__':
+    unittest.main()
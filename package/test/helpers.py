@@ -0,0 +1,16 @@
+from typing import Iterable
+from ..automat.automat import *
+
+def make_catalog(amount: int = 10, juiceAmount: "int | None" = None, prices: "tuple[int, int]" = (250, 370)) -> Catalog:
+    """Returns a catalog of water (item number 30) and juice (31) with the
+    given prices, 'amount' of water and as much juice unless 'juiceAmount'
+    is given."""
+    waterPrice, juicePrice = prices
+    return Catalog([(30, ItemInfo(waterPrice, amount, Item("Water"))),
+        (31, ItemInfo(juicePrice, amount if juiceAmount is None else juiceAmount, Item("Juice")))])
+
+def make_automat(amount: int = 10, coins: int = 10, threadSafe: bool = False, juiceAmount: "int | None" = None,
+        prices: "tuple[int, int]" = (250, 370), denominations: "Iterable[int]" = coin_values) -> Automat:
+    """Returns an automat selling the make_catalog items with 'coins' coins
+    of each denomination."""
+    return Automat.from_catalog(make_catalog(amount, juiceAmount, prices), coins, threadSafe=threadSafe, denominations=denominations)
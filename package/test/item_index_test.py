@@ -0,0 +1,67 @@
+import unittest
+from ..automat.automat import *
+from .helpers import *
+
+class TestItemIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        #prices 400, 300, 200, 100 for numbers 1-4, item 3 is sold out
+        self.catalog = Catalog((n, ItemInfo(500 - 100 * n, 0 if n == 3 else 2, Item(f"Item {n}"))) for n in range(1, 5))
+        self.index = ItemIndex(self.catalog)
+
+    def test_returnsPriceRange(self) -> None:
+        self.assertListEqual(self.index.get_by_price(200, 300), [3, 2])
+        self.assertListEqual(self.index.get_by_price(0, 1000), [4, 3, 2, 1])
+        self.assertListEqual(self.index.get_by_price(101, 199), [])
+
+    def test_returnsInStockItems(self) -> None:
+        self.assertListEqual(self.index.get_in_stock(), [4, 2, 1])
+        self.assertListEqual(self.index.get_in_stock(300), [4, 2])
+        self.assertFalse(self.index.is_in_stock(3))
+
+    def test_followsFetchingAndRestocking(self) -> None:
+        info = self.catalog[4]
+        info.fetch_item()
+        info.fetch_item()
+
+        self.assertFalse(self.index.is_in_stock(4))
+        self.assertListEqual(self.index.get_in_stock(), [2, 1])
+
+        self.catalog[3].set_amount(1)
+
+        self.assertListEqual(self.index.get_in_stock(), [3, 2, 1])
+
+    def test_followsPriceChanges(self) -> None:
+        self.catalog[1].set_price(50)
+
+        self.assertListEqual(self.index.get_by_price(0, 150), [1, 4])
+        self.assertListEqual(self.index.get_in_stock(100), [1, 4])
+
+class TestAutomatItemQueries(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.a = Automat.from_catalog(make_catalog(1, 3, (250, 400)))
+
+    def test_returnsAffordableItems(self) -> None:
+        self.assertListEqual(self.a.get_affordable_items(), [])
+        self.a.insert_coin(Coin(200))
+        self.a.insert_coin(Coin(100))
+
+        self.assertListEqual(self.a.get_affordable_items(), [30])
+
+        self.a.pay_for_item(30)
+        self.a.insert_coin(Coin(500))
+
+        self.assertListEqual(self.a.get_affordable_items(), [31])
+        self.assertListEqual(self.a.get_in_stock_items(), [31])
+
+    def test_followsRestocks(self) -> None:
+        self.a.insert_coin(Coin(500))
+        self.a.pay_for_item(30)
+        self.a.restock(30, 2)
+
+        self.assertListEqual(self.a.get_in_stock_items(), [30, 31])
+        self.assertListEqual(self.a.get_items_by_price(300, 500), [31])
+
+if __name__ == '__main__':
+    unittest.main()
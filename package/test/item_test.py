@@ -10,9 +10,15 @@ class TestItemMethods(unittest.TestCase):
 
         self.assertEqual(item.get_name(), name)
 
+    def test_isImmutable(self) -> None:
+        item = Item("a")
+
+        with self.assertRaises(AttributeError):
+            item._Item__itemName = "b"
+
 class TestItemInfoMethods(unittest.TestCase):
     def test_returnsPrice(self) -> None:
-        price = 5.01
+        price = 501
         info = ItemInfo(price, 1, Item("a"))
 
         self.assertEqual(info.get_price(), price)
@@ -37,7 +43,7 @@ class TestItemInfoMethods(unittest.TestCase):
     def test_raisesExceptionWhenInvalidPriceIsSet(self) -> None:
         info = ItemInfo(1, 1, Item("a"))
         with self.assertRaises(InvalidItemPriceException):
-            info.set_price(-0.7)
+            info.set_price(-70)
 
     def test_returnsItem(self) -> None:
         info = ItemInfo(1, 1, Item("a"))
@@ -46,6 +52,17 @@ class TestItemInfoMethods(unittest.TestCase):
 
         self.assertIsInstance(item, Item)
 
+    def test_returnsSharedItem(self) -> None:
+        info = ItemInfo(1, 2, Item("a"))
+
+        self.assertIs(info.fetch_item(), info.fetch_item())
+
+    def test_triesToFetchItem(self) -> None:
+        info = ItemInfo(1, 1, Item("a"))
+
+        self.assertIsInstance(info.try_fetch_item(), Item)
+        self.assertIsNone(info.try_fetch_item())
+
     def test_raisesNoItemsLeftException(self) -> None:
         info = ItemInfo(1, 0, Item("a"))
 
@@ -0,0 +1,108 @@
+import unittest
+import os
+import tempfile
+from ..automat.automat import *
+from ..automat.journal import *
+
+class TestJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        self.itemNumber = 30
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def pay(self, a: Automat, itemNumber: int, session: "Escrow | None" = None) -> None:
+        """Buys the item paying 7zl, so change is given."""
+        a.insert_coin(Coin(500), session)
+        a.insert_coin(Coin(200), session)
+        a.pay_for_item(itemNumber, session)
+
+    def make_sales(self, a: Automat, count: int) -> None:
+        """Buys the item 'count' times, once in a separate session, and
+        leaves 2zl inserted."""
+        a.restock(self.itemNumber, count)
+        a.add_coins([Coin(v) for v in coin_values for _ in range(0, 5 * count)])
+        for _ in range(0, count):
+            self.pay(a, self.itemNumber)
+        self.pay(a, self.itemNumber + 1, a.open_session())
+        a.add_coins([Coin(1), Coin(1)])
+        a.insert_coin(Coin(100))
+        a.return_inserted_coins()
+        a.insert_coin(Coin(200))
+
+    def test_restoresStateAfterRestart(self) -> None:
+        a = Automat.open_journaled(self.directory)
+        self.make_sales(a, 20)
+        expected = a.export_state()
+        a.get_journal().close()
+
+        b = Automat.open_journaled(self.directory)
+
+        self.assertEqual(b.export_state(), expected)
+        self.assertEqual(b.get_inserted_coins_value(), 200)
+
+    def test_compactsJournalWithSnapshots(self) -> None:
+        a = Automat.open_journaled(self.directory, snapshotEvery=10)
+        self.make_sales(a, 100)
+        expected = a.export_state()
+        a.get_journal().close()
+
+        journalSize = os.path.getsize(os.path.join(self.directory, JOURNAL_FILE))
+        b = Automat.open_journaled(self.directory)
+
+        self.assertEqual(b.export_state(), expected)
+        self.assertLess(journalSize, 10 * 200)
+
+    def test_ignoresTornRecord(self) -> None:
+        a = Automat.open_journaled(self.directory)
+        self.make_sales(a, 3)
+        expected = a.export_state()
+        a.get_journal().close()
+        with open(os.path.join(self.directory, JOURNAL_FILE), 'ab') as f:
+            f.write(b'\x03\x00torn')
+
+        b = Automat.open_journaled(self.directory)
+
+        self.assertEqual(b.export_state(), expected)
+
+    def test_skipsRecordsIncludedInSnapshot(self) -> None:
+        a = Automat.open_journaled(self.directory)
+        self.make_sales(a, 3)
+        a.get_journal().sync()
+        path = os.path.join(self.directory, JOURNAL_FILE)
+        with open(path, 'rb') as f:
+            records = f.read()
+        expected = a.export_state()
+        #snapshot written, crash before the journal is emptied
+        save_snapshot(self.directory, expected, a.get_journal().get_sequence())
+        a.get_journal().close()
+        with open(path, 'wb') as f:
+            f.write(records)
+
+        b = Automat.open_journaled(self.directory)
+
+        self.assertEqual(b.export_state(), expected)
+
+    def test_snapshotsTakenOnEveryEvent(self) -> None:
+        #every interval puts a snapshot right on a sale, a refund or a batch
+        for snapshotEvery in range(1, 8):
+            directory = os.path.join(self.directory, str(snapshotEvery))
+            a = Automat.open_journaled(directory, snapshotEvery=snapshotEvery)
+            a.restock(self.itemNumber, 10)
+            self.pay(a, self.itemNumber)
+            a.insert_coin(Coin(200))
+            a.insert_coin(Coin(100))
+            a.return_inserted_coins()
+            a.pay_for_items([(self.itemNumber, [Coin(500), Coin(200)])] * 5)
+            a.insert_coin(Coin(50))
+            expected = a.export_state()
+            a.get_journal().close()
+
+            self.assertEqual(Automat.open_journaled(directory).export_state(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from ..automat.automat import *
+from .helpers import *
+
+class FakeClock:
+    """Clock moved by hand."""
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def fill(ledger: SalesLedger, clock: FakeClock, count: int, seed: int = 0) -> None:
+    """Records random outcomes one second apart."""
+    rng = random.Random(seed)
+    k = len(ledger.get_denominations())
+    for _ in range(0, count):
+        clock.now += 1
+        status = rng.choice([PurchaseStatus.OK, PurchaseStatus.OK, PurchaseStatus.NOT_ENOUGH_MONEY, PurchaseStatus.EXACT_CHANGE_ONLY])
+        if status == PurchaseStatus.OK:
+            ledger.record(rng.choice([30, 31, 45]), rng.randrange(100, 700), status, [rng.randrange(0, 3) for _ in range(0, k)], [rng.randrange(0, 2) for _ in range(0, k)])
+        else:
+            ledger.record(rng.choice([30, 31, 99]), 250, status)
+
+class TestSalesLedger(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def test_aggregatesWindow(self) -> None:
+        clock = FakeClock()
+        ledger = SalesLedger((10, 20, 50), chunkSize=2, clock=clock)
+        for itemNumber, price, status, tendered, change in [(30, 250, PurchaseStatus.OK, [0, 1, 5], [0, 1, 0]),
+                (31, 370, PurchaseStatus.NOT_ENOUGH_MONEY, None, None),
+                (30, 250, PurchaseStatus.OK, [0, 0, 5], None),
+                (31, 370, PurchaseStatus.OK, [1, 1, 7], [0, 0, 0])]:
+            clock.now += 10
+            ledger.record(itemNumber, price, status, tendered, change)
+
+        self.assertEqual(ledger.get_count(), 4)
+        self.assertDictEqual(ledger.get_item_totals(), { 30:(2, 500), 31:(1, 370) })
+        self.assertDictEqual(ledger.get_item_totals(since=1020, until=1040), { 30:(1, 250) })
+        self.assertEqual(ledger.get_coin_totals(since=1030), ([1, 1, 12], [0, 0, 0]))
+        self.assertEqual(ledger.get_coin_totals(until=1011), ([0, 1, 5], [0, 1, 0]))
+        statuses = ledger.get_status_counts(since=1015)
+        self.assertEqual(statuses[PurchaseStatus.OK], 2)
+        self.assertEqual(statuses[PurchaseStatus.NOT_ENOUGH_MONEY], 1)
+        self.assertEqual(statuses[PurchaseStatus.EXACT_CHANGE_ONLY], 0)
+        self.assertDictEqual(ledger.get_item_totals(since=2000), {})
+
+    def test_keepsTimesSorted(self) -> None:
+        clock = FakeClock()
+        ledger = SalesLedger((10,), clock=clock)
+        ledger.record(30, 100, PurchaseStatus.OK)
+        #the wall clock was set back
+        clock.now -= 50
+        ledger.record(31, 100, PurchaseStatus.OK)
+
+        self.assertDictEqual(ledger.get_item_totals(since=1000), { 30:(1, 100), 31:(1, 100) })
+
+    def test_spillsOldChunks(self) -> None:
+        clock = FakeClock()
+        ledger = SalesLedger(tuple(coin_values), chunkSize=16, retention=100, directory=self.directory, clock=clock)
+        memory = SalesLedger(tuple(coin_values), chunkSize=16, retention=None, clock=clock)
+        fill(ledger, clock, 200)
+        clock.now = 1000.0
+        fill(memory, clock, 200)
+
+        self.assertGreater(ledger.get_spilled_count(), 0)
+        self.assertEqual(len(os.listdir(self.directory)), ledger.get_spilled_count())
+        self.assertEqual(ledger.get_count(), 200)
+        for since, until in [(None, None), (1050, 1150), (1100, None), (None, 1020)]:
+            self.assertEqual(ledger.get_item_totals(since, until), memory.get_item_totals(since, until))
+            self.assertEqual(ledger.get_coin_totals(since, until), memory.get_coin_totals(since, until))
+            self.assertEqual(ledger.get_status_counts(since, until), memory.get_status_counts(since, until))
+        #spilled chunks are found again after a restart
+        reopened = SalesLedger(tuple(coin_values), directory=self.directory)
+        self.assertEqual(reopened.get_count(), 16 * ledger.get_spilled_count())
+        with self.assertRaises(LedgerMismatchException):
+            SalesLedger((10, 20), directory=self.directory)
+
+    def test_dropsOldChunksWithoutDirectory(self) -> None:
+        clock = FakeClock()
+        ledger = SalesLedger((10,), chunkSize=10, retention=30, clock=clock)
+        fill(ledger, clock, 100)
+
+        self.assertLess(ledger.get_count(), 50)
+        self.assertEqual(ledger.get_spilled_count(), 0)
+
+    @unittest.skipUnless(numpy is not None, "NumPy is not installed")
+    def test_vectorizedAgreesWithScalar(self) -> None:
+        clock = FakeClock()
+        vectorized = SalesLedger(tuple(coin_values), chunkSize=64, vectorized=True, clock=clock)
+        fill(vectorized, clock, 500, 3)
+        clock.now = 1000.0
+        scalar = SalesLedger(tuple(coin_values), chunkSize=64, vectorized=False, clock=clock)
+        fill(scalar, clock, 500, 3)
+
+        for since, until in [(None, None), (1100.5, 1333)]:
+            self.assertEqual(vectorized.get_item_totals(since, until), scalar.get_item_totals(since, until))
+            self.assertEqual(vectorized.get_coin_totals(since, until), scalar.get_coin_totals(since, until))
+            self.assertEqual(vectorized.get_status_counts(since, until), scalar.get_status_counts(since, until))
+
+    def test_automatRecordsOutcomes(self) -> None:
+        a = make_automat(1, juiceAmount=5)
+        ledger = a.enable_ledger()
+        a.insert_coin(Coin(500))
+        a.pay_for_item(30)
+        a.insert_coin(Coin(500))
+        a.try_pay(30)
+        a.try_pay(99)
+        a.return_inserted_coins()
+        a.pay_for_items([(31, [Coin(200), Coin(200)]), (31, [Coin(100)])])
+        a.insert_coin(Coin(500))
+        a.confirm(a.reserve(31).reservationId)
+        a.insert_coin(Coin(500))
+        a.reserve(31, timeout=0)
+        #expires the reservation first and buys with its coins
+        a.try_pay(31)
+        a.disable_ledger()
+        a.try_pay(30)
+
+        self.assertDictEqual(ledger.get_item_totals(), { 30:(1, 250), 31:(3, 1110) })
+        statuses = ledger.get_status_counts()
+        self.assertEqual(statuses[PurchaseStatus.OK], 4)
+        self.assertEqual(statuses[PurchaseStatus.NO_ITEMS_LEFT], 1)
+        self.assertEqual(statuses[PurchaseStatus.INVALID_ITEM_NUMBER], 1)
+        self.assertEqual(statuses[PurchaseStatus.NOT_ENOUGH_MONEY], 1)
+        self.assertEqual(statuses[PurchaseStatus.RESERVATION_EXPIRED], 1)
+        tendered, change = ledger.get_coin_totals()
+        denominations = ledger.get_denominations()
+        self.assertEqual(sum(v * n for v, n in zip(denominations, tendered)) - sum(v * n for v, n in zip(denominations, change)), 250 + 3 * 370)
+
+if __name__ == '__main__':
+    unittest.main()
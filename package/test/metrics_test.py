@@ -0,0 +1,74 @@
+import unittest
+from ..automat.automat import *
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_keepsSmallValuesExact(self) -> None:
+        for v in range(0, 32):
+            self.assertEqual(LatencyHistogram.get_bucket_range(LatencyHistogram.get_bucket_index(v)), (v, v))
+
+    def test_bucketsContainTheirValues(self) -> None:
+        for v in [32, 33, 100, 1000, 123456, 10 ** 9]:
+            low, high = LatencyHistogram.get_bucket_range(LatencyHistogram.get_bucket_index(v))
+            self.assertLessEqual(low, v)
+            self.assertGreaterEqual(high, v)
+            self.assertLess(high - low, v / LatencyHistogram.SUB_BUCKETS)
+
+    def test_returnsPercentiles(self) -> None:
+        h = LatencyHistogram()
+        for v in range(1, 1001):
+            h.record(v * 1000)
+
+        self.assertEqual(h.get_count(), 1000)
+        self.assertEqual(h.get_max(), 1000000)
+        self.assertAlmostEqual(h.get_percentile(50), 500000, delta=500000 / LatencyHistogram.SUB_BUCKETS)
+        self.assertAlmostEqual(h.get_percentile(99), 990000, delta=990000 / LatencyHistogram.SUB_BUCKETS)
+        self.assertEqual(h.get_percentile(100), 1000000)
+
+class TestAutomatMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.a = Automat(1)
+        self.a._Automat__items[30].set_price(700)
+        self.metrics = self.a.enable_metrics()
+
+    def buy(self) -> None:
+        self.a.insert_coin(Coin(500))
+        self.a.insert_coin(Coin(200))
+        self.a.pay_for_item(30)
+
+    def test_countsOutcomes(self) -> None:
+        self.buy()
+        with self.assertRaises(NoItemsLeftException):
+            self.buy()
+        self.a.return_inserted_coins()
+
+        self.assertEqual(self.metrics.get_count('insert_coin'), 4)
+        self.assertEqual(self.metrics.get_count('pay_for_item', 'ok'), 1)
+        self.assertEqual(self.metrics.get_count('pay_for_item', 'NoItemsLeftException'), 1)
+        self.assertEqual(self.metrics.get_count('try_pay', 'no_items_left'), 1)
+        self.assertEqual(self.metrics.get_count('fetch_item', 'ok'), 1)
+        self.assertEqual(self.metrics.get_count('get_change', 'ok'), 1)
+        self.assertEqual(self.metrics.get_count('return_inserted_coins'), 1)
+        self.assertEqual(self.metrics.get_histogram('pay_for_item').get_count(), 2)
+
+    def test_exportsMetrics(self) -> None:
+        self.buy()
+        exported = self.metrics.to_dict()
+        text = self.metrics.to_prometheus()
+
+        self.assertEqual(exported['insert_coin']['outcomes'], { 'ok': 2 })
+        self.assertEqual(exported['insert_coin']['latency']['count'], 2)
+        self.assertIn('automat_operations_total{operation="insert_coin",outcome="ok"} 2\n', text)
+        self.assertIn('automat_operation_duration_seconds_bucket{operation="insert_coin",le="+Inf"} 2\n', text)
+        self.assertIn('automat_operation_duration_seconds_count{operation="pay_for_item"} 1\n', text)
+
+    def test_stopsWhenDisabled(self) -> None:
+        self.a.disable_metrics()
+        self.buy()
+
+        self.assertIsNone(self.a.get_metrics())
+        self.assertEqual(self.metrics.get_count('insert_coin'), 0)
+        self.assertIs(type(self.a._Automat__items[30]), ItemInfo)
+
+if __name__ == '__main__':
+    unittest.main()
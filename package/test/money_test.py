@@ -0,0 +1,18 @@
+import unittest
+from ..automat.money import *
+
+class TestMoneyMethods(unittest.TestCase):
+    def test_convertsToGrosze(self) -> None:
+        self.assertEqual(to_grosze(5.2), 520)
+        self.assertEqual(to_grosze(0.01 * 3), 3)
+
+    def test_convertsToZloty(self) -> None:
+        self.assertEqual(to_zloty(130), 1.3)
+
+    def test_formatsMoney(self) -> None:
+        self.assertEqual(format_money(520), '5.20')
+        self.assertEqual(format_money(7), '0.07')
+        self.assertEqual(format_money(-150), '-1.50')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ class TestProjectRequirements(unittest.TestCase):
         self.automat = Automat(5)
         self.itemNumber = 30
         #set constant item price for itemNumber
-        self.itemPrice = 5.2
+        self.itemPrice = 520
         self.automat._Automat__items[self.itemNumber].set_price(self.itemPrice)
 
     def test_returnsItemPrice(self) -> None:
@@ -17,13 +17,13 @@ class TestProjectRequirements(unittest.TestCase):
         #get item info
         name, price, amount = self.automat.get_item_details(self.itemNumber)
 
-        #price must be a float number and greater than 0
-        self.assertIsInstance(price, float)
+        #price must be an integer number of grosze and greater than 0
+        self.assertIsInstance(price, int)
         self.assertGreater(price, 0)
 
     def test_returnsItemWithNoChangeWhenExactPriceMatched(self) -> None:
         """Test requirement #2"""
-        coins = [Coin(2), Coin(2), Coin(1), Coin(0.2)]
+        coins = [Coin(200), Coin(200), Coin(100), Coin(20)]
         for c in coins:
             self.automat.insert_coin(c)
 
@@ -36,8 +36,8 @@ class TestProjectRequirements(unittest.TestCase):
 
     def test_returnsItemAndChangeWhenTooMuchMoneyPaid(self) -> None:
         """Test requirement #3"""
-        coins = [Coin(2), Coin(2), Coin(2), Coin(0.5)]
-        expected_change = 1.3
+        coins = [Coin(200), Coin(200), Coin(200), Coin(50)]
+        expected_change = 130
         for c in coins:
             self.automat.insert_coin(c)
 
@@ -49,7 +49,7 @@ class TestProjectRequirements(unittest.TestCase):
 
     def test_raisesExceptionWhenBuyingUnavailableItem(self) -> None:
         """Test requirement #4"""
-        coins = [Coin(2), Coin(2), Coin(1), Coin(0.2)]
+        coins = [Coin(200), Coin(200), Coin(100), Coin(20)]
 
         #check how many items are available right now
         name, price, available = self.automat.get_item_details(self.itemNumber)
@@ -74,7 +74,7 @@ class TestProjectRequirements(unittest.TestCase):
 
     def test_returnsMoneyAfterCancelling(self) -> None:
         """Test requirement #6"""
-        coins = [Coin(1), Coin(2)]
+        coins = [Coin(100), Coin(200)]
         for c in coins:
             self.automat.insert_coin(c)
 
@@ -84,7 +84,7 @@ class TestProjectRequirements(unittest.TestCase):
 
     def test_retryBuyingAfterAddingMoreMoney(self) -> None:
         """Test requirement #7"""
-        coins = [Coin(2), Coin(2), Coin(1)]
+        coins = [Coin(200), Coin(200), Coin(100)]
 
         for c in coins:
             self.automat.insert_coin(c)
@@ -93,7 +93,7 @@ class TestProjectRequirements(unittest.TestCase):
             self.automat.pay_for_item(self.itemNumber)
 
         #add more money and pay again
-        self.automat.insert_coin(Coin(0.2))
+        self.automat.insert_coin(Coin(20))
         change, item = self.automat.pay_for_item(self.itemNumber)
 
         #returned change list should be empty and the item should be valid
@@ -103,7 +103,7 @@ class TestProjectRequirements(unittest.TestCase):
     def test_payingWith1grCoins(self) -> None:
         """Test requirement #8"""
         #520 1gr coins
-        coins = [Coin(0.01) for _ in range(0, 520)]
+        coins = [Coin(1) for _ in range(0, 520)]
         for c in coins:
             self.automat.insert_coin(c)
 
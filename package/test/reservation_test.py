@@ -0,0 +1,203 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from typing import Callable
+from ..automat.automat import *
+from .helpers import *
+
+class TestReservation(unittest.TestCase):
+    def test_holdsItemAndChange(self) -> None:
+        a = make_automat()
+        a.insert_coin(Coin(500))
+        result = a.reserve(30)
+
+        self.assertEqual(result.status, PurchaseStatus.OK)
+        self.assertEqual(a.lookup(30).amount, 9)
+        self.assertEqual(a.get_inserted_coins_value(), 0)
+        #the 250gr change is held, not the inserted 500gr coin
+        self.assertEqual(a.get_stored_coins_value(), 10 * sum(coin_values) - 250)
+        self.assertDictEqual(a.get_reserved_items(), { 30:1 })
+        #the held item and coins still count as automat's
+        state = a.export_state()
+        self.assertEqual(dict((n, k) for n, _, _, k in state.items)[30], 10)
+        self.assertEqual(sum(v * n for v, n in zip(state.denominations, state.coinCounts)), 10 * sum(coin_values))
+
+    def test_confirm(self) -> None:
+        a = make_automat()
+        a.insert_coin(Coin(200))
+        a.insert_coin(Coin(100))
+        reservationId = a.reserve(30).reservationId
+        result = a.confirm(reservationId)
+
+        self.assertEqual(result.status, PurchaseStatus.OK)
+        self.assertEqual(result.item.get_name(), "Water")
+        self.assertEqual(get_coins_value(result.change), 50)
+        self.assertEqual((result.provided, result.required), (300, 250))
+        self.assertEqual(a.get_stored_coins_value(), 10 * sum(coin_values) + 250)
+        self.assertDictEqual(a.get_reserved_items(), {})
+        self.assertEqual(a.confirm(reservationId).status, PurchaseStatus.RESERVATION_EXPIRED)
+
+    def test_cancel(self) -> None:
+        a = make_automat()
+        session = a.open_session()
+        a.insert_coin(Coin(500), session)
+        state = a.export_state()
+        reservationId = a.reserve(31, session).reservationId
+
+        self.assertTrue(a.cancel(reservationId))
+        self.assertFalse(a.cancel(reservationId))
+        self.assertEqual(a.export_state(), state)
+        self.assertEqual(a.get_inserted_coins_value(session), 500)
+        self.assertEqual(a.confirm(reservationId).status, PurchaseStatus.RESERVATION_EXPIRED)
+
+    def test_failuresDontReserve(self) -> None:
+        a = make_automat(amount=1)
+        self.assertEqual(a.reserve(99).status, PurchaseStatus.INVALID_ITEM_NUMBER)
+        self.assertEqual(a.reserve(30).status, PurchaseStatus.NOT_ENOUGH_MONEY)
+        a.insert_coin(Coin(500))
+        self.assertEqual(a.reserve(30).status, PurchaseStatus.OK)
+        #the last unit is held
+        a.insert_coin(Coin(500))
+        self.assertEqual(a.reserve(30).status, PurchaseStatus.NO_ITEMS_LEFT)
+        self.assertEqual(a.try_pay(30).status, PurchaseStatus.NO_ITEMS_LEFT)
+        self.assertEqual(a.get_inserted_coins_value(), 500)
+
+    def test_heldChangeIsNotGivenTwice(self) -> None:
+        a = make_automat(coins=0)
+        a.add_coins([Coin(200), Coin(50)])
+        a.insert_coin(Coin(500))
+        self.assertEqual(a.reserve(30).status, PurchaseStatus.OK)
+        a.insert_coin(Coin(500))
+
+        self.assertEqual(a.try_pay(30).status, PurchaseStatus.EXACT_CHANGE_ONLY)
+
+    def test_expiresOnNextPurchase(self) -> None:
+        a = make_automat()
+        a.insert_coin(Coin(500))
+        reservationId = a.reserve(30, timeout=0).reservationId
+        self.assertEqual(a.lookup(30).amount, 9)
+        a.try_pay(31)
+
+        self.assertEqual(a.lookup(30).amount, 10)
+        self.assertEqual(a.confirm(reservationId).status, PurchaseStatus.RESERVATION_EXPIRED)
+        with self.assertRaises(ReservationExpiredException):
+            raise_for_status(PurchaseStatus.RESERVATION_EXPIRED, 0, 0)
+
+    def test_reaperExpires(self) -> None:
+        a = make_automat(threadSafe=True)
+        a.insert_coin(Coin(500))
+        a.reserve(30, timeout=60)
+        a.insert_coin(Coin(500))
+        #an earlier deadline wakes the reaper up
+        reservationId = a.reserve(31, timeout=0.05).reservationId
+        deadline = time.monotonic() + 5
+        while a.get_reserved_items() != { 30:1 } and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertDictEqual(a.get_reserved_items(), { 30:1 })
+        self.assertEqual(a.get_inserted_coins_value(), 500)
+        self.assertEqual(a.confirm(reservationId).status, PurchaseStatus.RESERVATION_EXPIRED)
+
+    def test_journalRollsBackHeldReservations(self) -> None:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        #prices are random up to 7zl, every interval puts a snapshot on
+        #another step
+        for snapshotEvery in range(1, 8):
+            path = os.path.join(directory, str(snapshotEvery))
+            a = Automat.open_journaled(path, snapshotEvery=snapshotEvery)
+            a.insert_coin(Coin(500))
+            a.insert_coin(Coin(200))
+            first = a.reserve(30).reservationId
+            a.insert_coin(Coin(500))
+            a.insert_coin(Coin(200))
+            cancelled = a.reserve(31).reservationId
+            a.insert_coin(Coin(20))
+            a.confirm(first)
+            a.cancel(cancelled)
+            a.insert_coin(Coin(200))
+            a.insert_coin(Coin(200))
+            a.reserve(30)
+            state = a.export_state()
+            a.get_journal().close()
+
+            #the customer's coins are given back as inserted
+            self.assertEqual(sum(state.insertedCoins), 20 + 700 + 400)
+            self.assertEqual(Automat.open_journaled(path).export_state(), state)
+
+    def check_recovers_held_coins(self, buy: "Callable[[Automat], None]", insertedCoins: "list[int]") -> None:
+        """Checks that coins of a held reservation of the default session are
+        recovered as inserted after 'buy' and a restart."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for snapshotEvery in range(1, 8):
+            path = os.path.join(directory, str(snapshotEvery))
+            a = Automat.open_journaled(path, snapshotEvery=snapshotEvery)
+            a.insert_coin(Coin(500))
+            a.insert_coin(Coin(200))
+            self.assertEqual(a.reserve(30, timeout=100).status, PurchaseStatus.OK)
+            buy(a)
+            state = a.export_state()
+            a.get_journal().close()
+
+            self.assertEqual(state.insertedCoins, insertedCoins)
+            self.assertEqual(Automat.open_journaled(path).export_state(), state)
+
+    def test_journalKeepsHeldCoinsOnRefund(self) -> None:
+        def refund(a: Automat) -> None:
+            a.insert_coin(Coin(200))
+            a.return_inserted_coins()
+        self.check_recovers_held_coins(refund, [500, 200])
+
+    def test_journalKeepsHeldCoinsOnSale(self) -> None:
+        def sell(a: Automat) -> None:
+            a.insert_coin(Coin(500))
+            a.insert_coin(Coin(500))
+            self.assertEqual(a.try_pay(31).status, PurchaseStatus.OK)
+        self.check_recovers_held_coins(sell, [500, 200])
+
+    def test_confirmAfterDeadlineWithoutReaper(self) -> None:
+        a = make_automat()
+        a.insert_coin(Coin(500))
+        reservationId = a.reserve(30, timeout=0).reservationId
+        result = a.confirm(reservationId)
+
+        self.assertEqual(result.status, PurchaseStatus.RESERVATION_EXPIRED)
+        self.assertEqual(a.lookup(30).amount, 10)
+        self.assertEqual(a.get_inserted_coins_value(), 500)
+        self.assertEqual(a.get_stored_coins_value(), 10 * sum(coin_values))
+        self.assertFalse(a.cancel(reservationId))
+
+    def test_concurrentReservationsDontOversell(self) -> None:
+        a = make_automat(50, threadSafe=True)
+        start = a.get_stored_coins_value()
+        sold = []
+        def buy(seed: int) -> None:
+            session = a.open_session()
+            for i in range(0, 40):
+                #pay exactly so the change can't run out
+                a.insert_coin(Coin(200), session)
+                a.insert_coin(Coin(50), session)
+                result = a.reserve(30, session)
+                if result.status != PurchaseStatus.OK:
+                    a.return_inserted_coins(session)
+                elif (i + seed) % 3 == 0:
+                    a.cancel(result.reservationId)
+                    a.return_inserted_coins(session)
+                else:
+                    sold.append(a.confirm(result.reservationId).required)
+        threads = [threading.Thread(target=buy, args=(seed,)) for seed in range(0, 4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(sold), 50)
+        self.assertEqual(a.lookup(30).amount, 0)
+        self.assertEqual(a.get_stored_coins_value(), start + sum(sold))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import asyncio
+import contextlib
+import io
+import json
+from ..automat.automat import *
+from ..server.server import *
+from ..server.load_generator import *
+
+class TestAutomatServer(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.automat = Automat(5)
+        self.itemNumber = 30
+        self.automat._Automat__items[self.itemNumber].set_price(300)
+        self.server = AutomatServer(self.automat)
+        self.session = self.automat.open_session()
+
+    def send(self, message: dict) -> dict:
+        return self.server.handle_request(json.dumps(message).encode(), self.session)
+
+    def test_returnsItemDetails(self) -> None:
+        response = self.send({ 'op': 'details', 'item': self.itemNumber })
+
+        self.assertTrue(response['ok'])
+        self.assertEqual(response['price'], 300)
+
+    def test_buysItemWithChange(self) -> None:
+        self.send({ 'op': 'insert', 'coin': 500 })
+
+        response = self.send({ 'op': 'pay', 'item': self.itemNumber })
+
+        self.assertTrue(response['ok'])
+        self.assertEqual(sum(response['change']), 200)
+
+    def test_returnsErrorCodes(self) -> None:
+        self.assertEqual(self.send({ 'op': 'details', 'item': 55 })['error'], 'invalid_item')
+        self.assertEqual(self.send({ 'op': 'pay', 'item': self.itemNumber })['error'], 'not_enough_money')
+        self.assertEqual(self.send({ 'op': 'insert', 'coin': 3 })['error'], 'invalid_coin')
+        self.assertEqual(self.send({ 'op': 'fly' })['error'], 'bad_request')
+
+    def test_rejectsMalformedRequests(self) -> None:
+        for line in [b'{"op": "pay"', b'[1, 2]', b'{"op": "pay", "item": "30"}', b'{"op": "insert", "coin": true}', b'{"op": "details"}']:
+            self.assertEqual(self.server.handle_request(line, self.session)['error'], 'bad_request')
+
+    def test_reportsBugsAsServerErrors(self) -> None:
+        def broken() -> list:
+            return {}['items']
+        self.automat.get_items_list = broken
+        with contextlib.redirect_stderr(io.StringIO()):
+            response = self.send({ 'op': 'list' })
+
+        self.assertEqual(response['error'], 'server_error')
+
+    def test_refundsCoins(self) -> None:
+        self.send({ 'op': 'insert', 'coin': 200 })
+
+        response = self.send({ 'op': 'refund' })
+
+        self.assertListEqual(response['coins'], [200])
+        self.assertEqual(self.automat.get_inserted_coins_value(self.session), 0)
+
+    def test_servesManyClients(self) -> None:
+        report = asyncio.run(run_local(20, 100, 1000))
+
+        self.assertEqual(sum(report.outcomes.values()), 100)
+        self.assertGreater(report.get_throughput(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
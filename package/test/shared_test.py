@@ -0,0 +1,123 @@
+import multiprocessing
+import random
+import unittest
+from ..automat.automat import *
+
+def make_catalog() -> Catalog:
+    return Catalog([(30, ItemInfo(250, 0, Item("Water"))), (31, ItemInfo(370, 0, Item("Juice"))), (32, ItemInfo(520, 0, Item("Chips")))])
+
+def hammer(name: str, seed: int, purchases: int, results) -> None:
+    """Buys and restocks random items on a shared automat and reports what
+    it sold and restocked."""
+    inventory = SharedInventory.attach(name)
+    a = Automat.from_shared(inventory, make_catalog())
+    rng = random.Random(seed)
+    sold = { n:0 for n in [30, 31, 32] }
+    restocked = { n:0 for n in [30, 31, 32] }
+    revenue = 0
+    for i in range(0, purchases):
+        n = rng.choice([30, 31, 32])
+        if i % 10 == 9:
+            a.restock(n, 2)
+            restocked[n] += 2
+            continue
+        for value in rng.choice([[500], [200, 200], [500, 100]]):
+            a.insert_coin(Coin(value))
+        result = a.try_pay(n)
+        if result.status == PurchaseStatus.OK:
+            sold[n] += 1
+            revenue += result.required
+        else:
+            a.return_inserted_coins()
+    inventory.close()
+    results.put((sold, restocked, revenue))
+
+class TestSharedInventory(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        state = AutomatState(tuple(coin_values), [5] * len(coin_values), [], [(30, "Water", 250, 10), (31, "Juice", 370, 10), (32, "Chips", 520, 10)])
+        self.inventory = SharedInventory.from_state(state)
+
+    def tearDown(self) -> None:
+        self.inventory.close()
+        self.inventory.unlink()
+        super().tearDown()
+
+    def test_sharesStockAndCoins(self) -> None:
+        a = Automat.from_shared(self.inventory, make_catalog())
+        b = Automat.from_shared(SharedInventory.attach(self.inventory.get_name()), make_catalog())
+        a.insert_coin(Coin(500))
+        change, item = a.pay_for_item(30)
+
+        self.assertEqual(item.get_name(), "Water")
+        self.assertEqual(get_coins_value(change), 250)
+        self.assertEqual(b.get_item_details(30), ("Water", 250, 9))
+        self.assertEqual(b.get_stored_coins_value(), 5 * sum(coin_values) + 250)
+        b.restock(31, 5)
+        self.assertEqual(a.lookup(31).amount, 15)
+        b.get_shared_inventory().close()
+
+    def test_seesStockChangesOfOthers(self) -> None:
+        a = Automat.from_shared(self.inventory, make_catalog())
+        b = Automat.from_shared(SharedInventory.attach(self.inventory.get_name()), make_catalog())
+        self.assertListEqual(a.get_in_stock_items(), [30, 31, 32])
+        for _ in range(0, 10):
+            b.insert_coin(Coin(500))
+            b.insert_coin(Coin(20))
+            b.pay_for_item(32)
+
+        self.assertListEqual(a.get_in_stock_items(), [30, 31])
+        self.assertListEqual(a.get_affordable_items(), [])
+        b.restock(32, 1)
+        self.assertListEqual(a.get_in_stock_items(), [30, 31, 32])
+        b.get_shared_inventory().close()
+
+    def test_seesCoinChangesOfOthers(self) -> None:
+        a = Automat.from_shared(self.inventory, make_catalog())
+        b = Automat.from_shared(SharedInventory.attach(self.inventory.get_name()), make_catalog())
+        self.assertTrue(a.can_give_change(10))
+        #empty the float through the other automat
+        counts = self.inventory.get_coin_counts()
+        with self.inventory.coins_lock:
+            for i in range(0, len(counts)):
+                counts[i] = 0
+
+        self.assertFalse(a.can_give_change(10))
+        self.assertListEqual(a.get_exact_change_only_items(), [30, 31, 32])
+        b.add_coins([Coin(10)])
+        self.assertTrue(a.can_give_change(10))
+        b.get_shared_inventory().close()
+
+    def test_metrics(self) -> None:
+        a = Automat.from_shared(self.inventory, make_catalog())
+        metrics = a.enable_metrics()
+        a.insert_coin(Coin(500))
+        a.pay_for_item(30)
+        a.disable_metrics()
+
+        self.assertEqual(metrics.get_count('fetch_item', 'ok'), 1)
+        self.assertEqual(a.lookup(30).amount, 9)
+
+    def test_processesDontLoseStockOrCoins(self) -> None:
+        processes = 4
+        purchases = 200
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        workers = [context.Process(target=hammer, args=(self.inventory.get_name(), seed, purchases, results)) for seed in range(0, processes)]
+        for w in workers:
+            w.start()
+        reports = [results.get(timeout=60) for _ in workers]
+        for w in workers:
+            w.join()
+
+        a = Automat.from_shared(self.inventory, make_catalog())
+        revenue = sum(r for _, _, r in reports)
+        self.assertGreater(revenue, 0)
+        self.assertEqual(a.get_stored_coins_value(), 5 * sum(coin_values) + revenue)
+        for n in [30, 31, 32]:
+            sold = sum(s[n] for s, _, _ in reports)
+            restocked = sum(r[n] for _, r, _ in reports)
+            self.assertEqual(a.lookup(n).amount, 10 + restocked - sold)
+
+if __name__ == '__main__':
+    unittest.main()
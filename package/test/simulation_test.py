@@ -0,0 +1,37 @@
+import unittest
+from ..simulation.simulator import *
+
+class TestSimulation(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.prices = [150, 230, 370, 410, 695]
+        self.customers = make_customers(self.prices, 300, 7)
+        self.configs = [SimulationConfig([k] * len(coin_values), s, r) for k in [0, 2, 20] for s in [3, 30] for r in [0, 50]]
+
+    def test_customersTenderEnough(self) -> None:
+        for i, counts in zip(self.customers.items, self.customers.tendered):
+            self.assertGreaterEqual(sum(v * k for v, k in zip(coin_values, counts)), self.prices[i])
+
+    def test_countsEveryCustomer(self) -> None:
+        report = simulate_scalar(self.prices, self.customers, SimulationConfig([2] * len(coin_values), 3, 50))
+
+        self.assertEqual(report.sold + report.exactChangeOnly + report.noItemsLeft, 300)
+        self.assertGreater(report.sold, 0)
+
+    def test_reportsStockOut(self) -> None:
+        report = simulate_scalar(self.prices, self.customers, SimulationConfig([100] * len(coin_values), 1))
+
+        self.assertEqual(report.sold, len(self.prices))
+        self.assertEqual(report.noItemsLeft, 300 - len(self.prices))
+        self.assertGreater(report.firstStockOut, 0)
+        self.assertEqual(report.exactChangeOnly, 0)
+
+    @unittest.skipUnless(numpy is not None, "NumPy is not installed")
+    def test_vectorizedAgreesWithAutomat(self) -> None:
+        vectorized = simulate_vectorized(self.prices, self.customers, self.configs)
+        scalar = [simulate_scalar(self.prices, self.customers, c) for c in self.configs]
+
+        self.assertListEqual(vectorized, scalar)
+
+if __name__ == '__main__':
+    unittest.main()
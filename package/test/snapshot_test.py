@@ -0,0 +1,89 @@
+import gc
+import threading
+import time
+import unittest
+from ..automat.automat import *
+from .helpers import *
+
+class TestSnapshot(unittest.TestCase):
+    def test_keepsStateOfTheMoment(self) -> None:
+        a = make_automat(1000, 100)
+        a.insert_coin(Coin(200))
+        state = a.export_state()
+        s = a.snapshot()
+        a.insert_coin(Coin(500))
+        a.pay_for_item(31)
+        a.restock(30, 5)
+        a.add_coins([Coin(1)])
+        a.insert_coin(Coin(10))
+
+        self.assertEqual(s.to_state(), state)
+        self.assertEqual(s.get_item_details(31), ("Juice", 370, 1000))
+        self.assertEqual(s.get_inserted_coins_value(), 200)
+        self.assertEqual(s.get_stored_coins_value(), 100 * sum(coin_values))
+        self.assertEqual(a.snapshot().to_state(), a.export_state())
+
+    def test_keepsEveryGeneration(self) -> None:
+        a = make_automat(1000, 100)
+        first = a.snapshot()
+        same = a.snapshot()
+        a.restock(30, 1)
+        second = a.snapshot()
+        a.restock(30, 1)
+        a.add_coins([Coin(500)])
+        third = a.snapshot()
+
+        self.assertIs(first._AutomatSnapshot__generation, same._AutomatSnapshot__generation)
+        self.assertListEqual([s.get_amount(30) for s in [first, second, third]], [1000, 1001, 1002])
+        self.assertEqual(second.get_stored_coins_value(), 100 * sum(coin_values))
+        self.assertEqual(third.get_stored_coins_value(), 100 * sum(coin_values) + 500)
+
+    def test_stopsSavingWithoutSnapshots(self) -> None:
+        a = make_automat(1000, 100)
+        s = a.snapshot()
+        a.restock(30, 1)
+        del s
+        gc.collect()
+        a.restock(30, 1)
+
+        self.assertIsNone(a._Automat__generation)
+
+    def test_keepsBatchesWhole(self) -> None:
+        a = make_automat(1000, 100)
+        s = a.snapshot()
+        a.pay_for_items([(30, [Coin(500)]), (31, [Coin(500)])])
+
+        self.assertEqual(s.get_amount(30), 1000)
+        self.assertEqual(s.get_amount(31), 1000)
+        self.assertEqual(s.get_stored_coins_value(), 100 * sum(coin_values))
+
+    def test_readsConsistentStateWhileSelling(self) -> None:
+        a = make_automat(1000, 100, True)
+        start = a.get_stored_coins_value()
+        done = threading.Event()
+        def sell() -> None:
+            session = a.open_session()
+            for i in range(0, 1500):
+                #pay exactly so the change can't run out
+                for value in [200, 50] if i % 2 == 0 else [200, 100, 50, 20]:
+                    a.insert_coin(Coin(value), session)
+                a.pay_for_item(30 + i % 2, session)
+            done.set()
+        seller = threading.Thread(target=sell)
+        seller.start()
+        snapshots = 0
+        while not done.is_set() or snapshots == 0:
+            s = a.snapshot()
+            sold = (1000 - s.get_amount(30)) * 250
+            #let the seller change the automat between reads
+            time.sleep(0.0005)
+            sold += (1000 - s.get_amount(31)) * 370
+            #every sale adds its price to the coins together with taking the item
+            self.assertEqual(s.get_stored_coins_value() - start, sold)
+            snapshots += 1
+        seller.join()
+
+        self.assertEqual(a.snapshot().get_amount(30), 250)
+
+if __name__ == '__main__':
+    unittest.main()
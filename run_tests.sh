@@ -1,4 +1,25 @@
 python3 -m package.test.automat_test -v
 python3 -m package.test.item_test -v
 python3 -m package.test.coin_test -v
-python3 -m package.test.requirements_test -v
\ No newline at end of file
+python3 -m package.test.requirements_test -v
+python3 -m package.test.money_test -v
+python3 -m package.test.coin_store_test -v
+python3 -m package.test.change_test -v
+python3 -m package.test.feasibility_test -v
+python3 -m package.test.escrow_test -v
+python3 -m package.test.concurrency_test -v
+python3 -m package.test.server_test -v
+python3 -m package.test.journal_test -v
+python3 -m package.test.catalog_test -v
+python3 -m package.test.item_index_test -v
+python3 -m package.test.metrics_test -v
+python3 -m package.test.simulation_test -v
+python3 -m package.test.float_optimizer_test -v
+python3 -m package.test.fleet_test -v
+python3 -m package.test.shared_test -v
+python3 -m package.test.application_test -v
+python3 -m package.test.denominations_test -v
+python3 -m package.test.snapshot_test -v
+python3 -m package.test.reservation_test -v
+python3 -m package.test.ledger_test -v
+python3 -m package.test.benchmark_test -v
\ No newline at end of file